@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# bench_memoria.py: Informe de memoria del maestro con tipos str vs compactos
+#
+# Uso (con el paquete instalado, pip install -e .):
+#   python benchmarks/bench_memoria.py [--sites 50000]
+
+import argparse
+import os
+import tempfile
+
+from sinteticos import generar_maestro
+
+from pci_rsi_sugeridor.core import (
+    cargar_y_preprocesar_pci,
+    compactar_maestro,
+    informe_memoria,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sites", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "am_cellinfo_etldb.csv")
+        generar_maestro(path, args.sites)
+        original = cargar_y_preprocesar_pci(path)
+    compacto = compactar_maestro(original.copy())
+    print(f"sites={args.sites} filas={len(original)}")
+    print(informe_memoria(original, compacto).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# run_benchmarks.py: Mide las etapas principales a varias escalas y guarda JSON
+#
+# Uso (con el paquete instalado, pip install -e .):
+#   python benchmarks/run_benchmarks.py [--escalas pequeña mediana] [-o bench.json]
+#
+# Los JSON de dos commits se pueden comparar etapa a etapa para detectar
+# regresiones.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+from sinteticos import generar_maestro, generar_peticiones, generar_tac_areas
+
+from pci_rsi_sugeridor.core import (
+    IndiceMaestro,
+    cargar_y_preprocesar_pci,
+    masivo_OSP_VDF,
+    planificar_lnr700,
+    preprocesar_TACAreas,
+    sugerir_pci_rsi,
+)
+
+ESCALAS = {
+    # nombre: (sites, TACs, peticiones masivo)
+    "pequeña": (1_000, 50, 50),
+    "mediana": (20_000, 500, 200),
+    "grande": (200_000, 3_000, 1_000),
+}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _medir(resultados: dict, nombre: str, fn, repeticiones: int = 1):
+    """Ejecuta fn `repeticiones` veces y guarda el mejor tiempo en segundos."""
+    mejor, valor = float("inf"), None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        # Se descarta lo que imprima la función (p.ej. las tablas del masivo)
+        with contextlib.redirect_stdout(io.StringIO()):
+            valor = fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    resultados[nombre] = round(mejor, 4)
+    print(f"  {nombre:<28} {mejor:9.4f}s")
+    return valor
+
+
+def ejecutar_escala(nombre: str, tmp: str, seed: int) -> dict:
+    n_sites, n_tacs, n_pet = ESCALAS[nombre]
+    maestro = os.path.join(tmp, f"maestro_{n_sites}.csv")
+    tac_xlsx = os.path.join(tmp, f"TACAreas_{n_tacs}.xlsx")
+    peticiones = os.path.join(tmp, f"peticiones_{n_pet}.csv")
+    sites = generar_maestro(maestro, n_sites, n_tacs, seed=seed)
+    generar_tac_areas(tac_xlsx, n_tacs, seed=seed)
+    generar_peticiones(peticiones, sites, n_pet, seed=seed)
+
+    print(f"Escala {nombre}: {n_sites} sites, {n_tacs} TACs, {n_pet} peticiones")
+    r: dict = {"sites": n_sites, "tacs": n_tacs, "peticiones": n_pet}
+    df = _medir(
+        r, "cargar_y_preprocesar_pci", lambda: cargar_y_preprocesar_pci(maestro)
+    )
+    tac = _medir(r, "preprocesar_TACAreas", lambda: preprocesar_TACAreas(tac_xlsx))
+    indice = _medir(r, "IndiceMaestro", lambda: IndiceMaestro(df))
+    vacio = pd.DataFrame()
+    site = sites[len(sites) // 2]
+    _medir(
+        r,
+        "sugerir_pci_rsi",
+        lambda: sugerir_pci_rsi(
+            site, site, "4G", "800", 3, df, vacio, tac, 0, 0, False, indice=indice
+        ),
+        repeticiones=5,
+    )
+    _medir(
+        r,
+        "planificar_lnr700",
+        lambda: planificar_lnr700(site, 3, df, vacio, tac, 0, 0, False, {}, indice),
+        repeticiones=5,
+    )
+    _medir(
+        r,
+        "masivo_OSP_VDF",
+        lambda: masivo_OSP_VDF(
+            entrada_osp=peticiones,
+            correspondencia_zr="",
+            salida_resumen=os.path.join(tmp, "resumen.csv"),
+            salida_detalle=os.path.join(tmp, "detalle.csv"),
+            modo_r=False,
+            df_pci_master=df,
+            df_rsi_5g_master=vacio,
+            tac_a_vecinos=tac,
+            indice=indice,
+        ),
+    )
+    return r
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del sugeridor PCI/RSI")
+    parser.add_argument(
+        "--escalas", nargs="+", choices=list(ESCALAS), default=["pequeña", "mediana"]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--salida", default="bench_resultados.json")
+    args = parser.parse_args()
+
+    informe = {
+        "commit": _commit(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "seed": args.seed,
+        "escalas": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for nombre in args.escalas:
+            informe["escalas"][nombre] = ejecutar_escala(nombre, tmp, args.seed)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
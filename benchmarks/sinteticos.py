@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# sinteticos.py: Generadores reproducibles (con semilla) de datos de prueba
+#
+# Producen ficheros con la misma forma que los reales:
+#   - am_cellinfo_etldb.csv (maestro PCI/RSI)
+#   - TACAreas.xlsx (TAC y vecinos)
+#   - CSV de peticiones OSP para el modo masivo
+
+import random
+from typing import List
+
+import openpyxl
+
+CAPAS = [
+    # (BAND, TECH, letra de celda)
+    ("L800", "4G", "M"),
+    ("B3", "LTE", "N"),
+    ("2100", "4G", "T"),
+    ("B28", "4G", "Y"),
+    ("NR700", "5G", "Q"),
+    ("N78", "NR", "P"),
+    ("L900", "NBIOT", "X"),
+]
+VENDORS = ["ERICSSON", "HUAWEI", "Ericsson "]
+
+
+def nombre_site(i: int) -> str:
+    return f"S{i:06d}"
+
+
+def _multivalor(rnd: random.Random, base: int, tope: int, prob: float) -> str:
+    if rnd.random() < prob:
+        return ",".join(str((base + k) % tope) for k in range(rnd.randint(2, 3)))
+    return str(base)
+
+
+def generar_maestro(
+    path: str,
+    n_sites: int = 1000,
+    n_tacs: int = 100,
+    capas_por_site: int = 3,
+    sectores: int = 3,
+    prob_multivalor: float = 0.05,
+    seed: int = 0,
+) -> List[str]:
+    """Escribe un maestro sintético y devuelve la lista de sites generados."""
+    rnd = random.Random(seed)
+    sites = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("SITE;TAC;BAND;TECH;VENDOR;CELLNAME;BCCH/SC/PCI;RSQID\n")
+        for i in range(n_sites):
+            site = nombre_site(i)
+            sites.append(site)
+            tac = rnd.randrange(1, n_tacs + 1)
+            vendor = rnd.choice(VENDORS)
+            for band, tech, letra in rnd.sample(CAPAS, capas_por_site):
+                base_pci = rnd.randrange(168) * 3
+                base_rsi = rnd.randrange(838)
+                for s in range(1, sectores + 1):
+                    pci = _multivalor(rnd, base_pci + s - 1, 504, prob_multivalor)
+                    rsi = _multivalor(rnd, base_rsi + 10 * s, 838, prob_multivalor)
+                    f.write(
+                        f"{site};{tac};{band};{tech};{vendor};"
+                        f"{site}{letra}{s}A;{pci};{rsi}\n"
+                    )
+    return sites
+
+
+def generar_tac_areas(
+    path: str, n_tacs: int = 100, vecinos_por_tac: int = 4, seed: int = 0
+) -> None:
+    """Escribe un TACAreas.xlsx con `vecinos_por_tac` vecinos cercanos por TAC."""
+    rnd = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["AREA", "TAC", "TAC_VECINO"])
+    for tac in range(1, n_tacs + 1):
+        ws.append(["Z", str(tac), str(tac)])
+        for _ in range(vecinos_por_tac):
+            vecino = min(max(1, tac + rnd.randint(-3, 3)), n_tacs)
+            ws.append(["Z", str(tac), str(vecino)])
+    wb.save(path)
+
+
+def generar_peticiones(
+    path: str, sites: List[str], n: int = 100, seed: int = 0
+) -> None:
+    """Escribe un CSV de peticiones OSP sobre `n` sites del maestro."""
+    rnd = random.Random(seed)
+    opciones = [("4G", "800"), ("4G", "1800"), ("5G", "3500"), ("4G", "700")]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("SITE OSP;NODE VDF;TECH;BAND\n")
+        for site in rnd.sample(sites, min(n, len(sites))):
+            tech, band = rnd.choice(opciones)
+            f.write(f"{site};{site};{tech};{band}\n")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# auditoria.py: Auditoría de conflictos PCI/RSI de toda la red en una pasada
+#
+# Conflictos detectados:
+#   - PCI_COLISION: mismo PCI en la misma banda/tecnología en dos celdas de
+#     un mismo cluster de TAC (el TAC de la celda y sus vecinos)
+#   - PCI_MOD3: dos celdas del mismo site, banda y tecnología con el mismo
+#     PCI mod 3
+#   - RSI_SOLAPE: mismo RSI en la misma banda/tecnología dentro del cluster
+#
+# Todo se resuelve con groupby/merge sobre una tabla (celda, valor), sin
+# recorrer pares de celdas en Python.
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from pci_rsi_sugeridor.core import enteros_por_fila
+from pci_rsi_sugeridor.perf import cronometro
+
+COLUMNAS_INFORME = [
+    "TIPO",
+    "SITE",
+    "CELLNAME",
+    "TAC",
+    "BANDA",
+    "TECH",
+    "VALOR",
+    "TAC_CONFLICTO",
+    "CELDAS_CONFLICTO",
+]
+
+
+def _tabla_valores(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Una fila por (celda, valor) de `col` (las celdas multivalor se trocean)."""
+    valores = enteros_por_fila(df[col])
+    filas = df.loc[valores.index]
+    tabla = pd.DataFrame(
+        {
+            "FILA": valores.index.to_numpy(),
+            "SITE": filas["SITE_CLEAN"].astype(str).to_numpy(),
+            "CELLNAME": filas["CELLNAME"].astype(str).to_numpy(),
+            "TAC": filas["TAC"].astype(str).to_numpy(),
+            "BANDA": filas["BAND_CLEAN"].astype(str).to_numpy(),
+            "TECH": filas["TECH_GROUP"].astype(str).to_numpy(),
+            "VALOR": valores.to_numpy(),
+        }
+    )
+    return tabla[tabla["TAC"] != "nan"].reset_index(drop=True)
+
+
+def _aristas_cluster(tac_a_vecinos, tacs: np.ndarray) -> pd.DataFrame:
+    """Pares (TAC, TAC_CONFLICTO) con TAC_CONFLICTO en el cluster de TAC."""
+    origen: List[str] = []
+    destino: List[str] = []
+    for tac, vecinos in tac_a_vecinos.items():
+        origen.extend([tac] * len(vecinos))
+        destino.extend(str(v) for v in vecinos)
+    aristas = pd.DataFrame({"TAC": origen, "TAC_CONFLICTO": destino})
+    propios = pd.DataFrame({"TAC": tacs, "TAC_CONFLICTO": tacs})
+    return pd.concat([propios, aristas[aristas["TAC"] != aristas["TAC_CONFLICTO"]]])
+
+
+def _conflictos_cluster(
+    tabla: pd.DataFrame, aristas: pd.DataFrame, tipo: str
+) -> pd.DataFrame:
+    clave = ["BANDA", "TECH", "VALOR"]
+    # Se cruzan claves (TAC, banda, tech, valor) con su nº de celdas, no celdas
+    por_tac = (
+        tabla.groupby(["TAC", *clave], sort=False)["FILA"]
+        .nunique()
+        .rename("N")
+        .reset_index()
+    )
+    pares = por_tac.merge(aristas, on="TAC").merge(
+        por_tac.rename(columns={"TAC": "TAC_CONFLICTO", "N": "N_CONFLICTO"}),
+        on=["TAC_CONFLICTO", *clave],
+    )
+    pares = pares[(pares["TAC"] != pares["TAC_CONFLICTO"]) | (pares["N"] > 1)]
+    # Los nombres de celda solo se agregan para las claves en conflicto
+    en_conflicto = tabla.merge(
+        pares[["TAC_CONFLICTO", *clave]]
+        .drop_duplicates()
+        .rename(columns={"TAC_CONFLICTO": "TAC"}),
+        on=["TAC", *clave],
+    )
+    celdas = _celdas_por_clave(en_conflicto, ["TAC", *clave]).rename(
+        columns={"TAC": "TAC_CONFLICTO"}
+    )
+    informe = tabla.merge(
+        pares[["TAC", *clave, "TAC_CONFLICTO"]], on=["TAC", *clave]
+    ).merge(celdas, on=["TAC_CONFLICTO", *clave])
+    informe["TIPO"] = tipo
+    return informe
+
+
+def _conflictos_mod3(tabla: pd.DataFrame) -> pd.DataFrame:
+    tabla = tabla[tabla["TECH"] != "NBIOT"].assign(MOD3=lambda t: t["VALOR"] % 3)
+    clave = ["SITE", "BANDA", "TECH", "MOD3"]
+    grupos = tabla.groupby(clave, sort=False)
+    n = grupos["FILA"].transform("nunique")
+    tabla = tabla[n > 1]
+    informe = tabla.merge(_celdas_por_clave(tabla, clave), on=clave).drop(
+        columns="MOD3"
+    )
+    informe["TAC_CONFLICTO"] = informe["TAC"]
+    informe["TIPO"] = "PCI_MOD3"
+    return informe
+
+
+def _celdas_por_clave(tabla: pd.DataFrame, clave: list) -> pd.DataFrame:
+    """Nombres de celda (ordenados, separados por comas) de cada clave."""
+    d = tabla[[*clave, "CELLNAME"]].drop_duplicates().sort_values([*clave, "CELLNAME"])
+    # Tras ordenar, cada clave es un tramo contiguo: se une por cortes
+    inicios = np.flatnonzero(~d.duplicated(clave).to_numpy())
+    nombres = d["CELLNAME"].tolist()
+    limites = [*inicios.tolist(), len(nombres)]
+    celdas = [",".join(nombres[a:b]) for a, b in zip(limites[:-1], limites[1:])]
+    return d.iloc[inicios][clave].assign(CELDAS_CONFLICTO=celdas)
+
+
+def auditar_maestro(df_pci_master: pd.DataFrame, tac_a_vecinos) -> pd.DataFrame:
+    """
+    Informe de conflictos del maestro completo: una fila por celda, tipo de
+    conflicto y TAC del cluster donde aparece el conflicto.
+    """
+    necesarias = ["SITE_CLEAN", "CELLNAME", "TAC", "BAND_CLEAN", "TECH_GROUP"]
+    if df_pci_master.empty or any(c not in df_pci_master for c in necesarias):
+        return pd.DataFrame(columns=COLUMNAS_INFORME)
+
+    partes = []
+    tacs = df_pci_master["TAC"].dropna().astype(str).unique()
+    aristas = _aristas_cluster(tac_a_vecinos, tacs)
+    if "BCCH/SC/PCI" in df_pci_master:
+        with cronometro("auditoria.pci"):
+            pcis = _tabla_valores(df_pci_master, "BCCH/SC/PCI")
+            partes.append(_conflictos_cluster(pcis, aristas, "PCI_COLISION"))
+            partes.append(_conflictos_mod3(pcis))
+    if "RSQID" in df_pci_master:
+        with cronometro("auditoria.rsi"):
+            rsis = _tabla_valores(df_pci_master, "RSQID")
+            partes.append(_conflictos_cluster(rsis, aristas, "RSI_SOLAPE"))
+
+    informe = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+    if informe.empty:
+        return pd.DataFrame(columns=COLUMNAS_INFORME)
+    informe = informe.sort_values(["TIPO", "TAC", "SITE", "CELLNAME", "VALOR"])
+    return informe[COLUMNAS_INFORME].reset_index(drop=True)
+
+
+def resumen_auditoria(informe: pd.DataFrame) -> Dict[str, int]:
+    """Número de celdas distintas con conflicto por tipo."""
+    return (
+        informe.groupby("TIPO")["CELLNAME"].nunique().to_dict()
+        if not informe.empty
+        else {}
+    )
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# bitmaps.py: Conjuntos de enteros de ancho fijo representados como int de Python
+
+from typing import Iterable
+
+import numpy as np
+
+N_PCI = 504
+N_RSI = 838
+
+
+def mascara_rango(inicio: int, fin: int) -> int:
+    """Bitmap con los bits [inicio, fin) activos."""
+    inicio = max(inicio, 0)
+    if fin <= inicio:
+        return 0
+    return ((1 << (fin - inicio)) - 1) << inicio
+
+
+def a_bitmap(valores: Iterable[int], ancho: int) -> int:
+    """Convierte un iterable de enteros en bitmap, ignorando los fuera de [0, ancho)."""
+    bm = 0
+    for v in valores:
+        if 0 <= v < ancho:
+            bm |= 1 << v
+    return bm
+
+
+def array_a_bitmap(valores: np.ndarray, ancho: int) -> int:
+    """Versión vectorizada de a_bitmap para arrays de enteros."""
+    valores = np.asarray(valores, dtype=np.int64)
+    bits = np.zeros(ancho, dtype=bool)
+    bits[valores[(valores >= 0) & (valores < ancho)]] = True
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+def a_lista(bm: int) -> list:
+    """Devuelve los bits activos del bitmap en orden ascendente."""
+    bits = bin(bm)[:1:-1]
+    return [i for i, c in enumerate(bits) if c == "1"]
+
+
+def contar(bm: int) -> int:
+    """Número de bits activos."""
+    return bin(bm).count("1")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# cache.py: Caché binaria (Feather) de los maestros ya preprocesados
+
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Subir cuando cambie el preprocesado para invalidar cachés antiguas
+VERSION_CACHE = 1
+SUFIJO_DATOS = ".cache.feather"
+SUFIJO_META = ".cache.json"
+
+logger = logging.getLogger(__name__)
+
+
+def _modulo_feather():
+    try:
+        from pyarrow import feather
+    except ImportError:
+        return None
+    return feather
+
+
+def hash_contenido(path: str, bloque: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for trozo in iter(lambda: f.read(bloque), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def huella_fichero(path: str) -> dict:
+    """Tamaño, mtime y hash de contenido de un fichero."""
+    st = os.stat(path)
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "hash": hash_contenido(path),
+    }
+
+
+def huella_vigente(path: str, huella: dict) -> bool:
+    """
+    Comprueba si el fichero sigue coincidiendo con la huella guardada.
+    Si tamaño y mtime coinciden se evita leer el fichero; si solo cambia
+    el mtime se decide por el hash de contenido.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if st.st_size != huella.get("size"):
+        return False
+    if st.st_mtime_ns == huella.get("mtime_ns"):
+        return True
+    return hash_contenido(path) == huella.get("hash")
+
+
+def rutas_cache(path: str):
+    return path + SUFIJO_DATOS, path + SUFIJO_META
+
+
+def _leer_meta(path_meta: str) -> Optional[dict]:
+    try:
+        with open(path_meta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _version_vigente(meta: Optional[dict]) -> bool:
+    return meta is not None and meta.get("version") == VERSION_CACHE
+
+
+def _meta_vigente(meta: Optional[dict], path: str, dependencias: Sequence[str]):
+    if meta is None or not _version_vigente(meta):
+        return False
+    huellas = meta.get("ficheros", {})
+    return all(
+        p in huellas and huella_vigente(p, huellas[p]) for p in [path, *dependencias]
+    )
+
+
+def _leer_feather(feather, path_datos: str) -> pd.DataFrame:
+    df = feather.read_table(path_datos, memory_map=True).to_pandas()
+    # Arrow devuelve None para los nulos de texto; el maestro usa NaN
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def _escribir_cache(feather, df, path: str, dependencias: Sequence[str]) -> None:
+    path_datos, path_meta = rutas_cache(path)
+    meta = {
+        "version": VERSION_CACHE,
+        "ficheros": {p: huella_fichero(p) for p in [path, *dependencias]},
+    }
+    # Temporales por proceso: dos cargas simultáneas no se pisan el fichero
+    tmp_datos = f"{path_datos}.{os.getpid()}.tmp"
+    tmp_meta = f"{path_meta}.{os.getpid()}.tmp"
+    feather.write_feather(
+        df.reset_index(drop=True), tmp_datos, compression="uncompressed"
+    )
+    os.replace(tmp_datos, path_datos)
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_meta, path_meta)
+
+
+def cargar_con_cache(
+    path: str,
+    cargador: Callable[[], pd.DataFrame],
+    dependencias: Sequence[str] = (),
+    usar_cache: bool = True,
+    reconstruir: bool = False,
+    actualizador: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """
+    Devuelve el DataFrame preprocesado de `path`, leyéndolo de la caché
+    Feather contigua si sigue vigente para `path` y sus `dependencias`.
+    En caso contrario ejecuta `cargador` y regenera la caché; si se indica
+    `actualizador`, se le pasa la versión cacheada anterior para que la
+    actualice en lugar de recargar desde cero.
+    """
+    feather = _modulo_feather() if usar_cache else None
+    if feather is None:
+        if usar_cache:
+            logger.warning(
+                "pyarrow no disponible: se omite la caché de %s (instale el extra"
+                " [cache] o pyarrow; --rebuild-cache no tiene efecto).",
+                path,
+            )
+        return cargador()
+
+    path_datos, path_meta = rutas_cache(path)
+    meta = _leer_meta(path_meta)
+    if not reconstruir and _meta_vigente(meta, path, dependencias):
+        try:
+            cacheado = _leer_feather(feather, path_datos)
+            logger.debug("Caché vigente usada para %s", path)
+            return cacheado
+        except (OSError, ValueError) as e:
+            logger.warning("Caché de %s ilegible (%s); se regenera.", path, e)
+
+    df: Optional[pd.DataFrame] = None
+    if actualizador is not None and not reconstruir and _version_vigente(meta):
+        try:
+            df = actualizador(_leer_feather(feather, path_datos))
+        except (OSError, ValueError) as e:
+            logger.warning("No se pudo actualizar la caché de %s (%s).", path, e)
+    if df is None:
+        df = cargador()
+    if df.empty or not os.path.exists(path):
+        return df
+    try:
+        _escribir_cache(feather, df, path, dependencias)
+    except OSError as e:
+        logger.warning("No se pudo escribir la caché de %s: %s", path, e)
+    return df
@@ -1,119 +1,374 @@
 #!/usr/bin/env python3
 # core.py: Lógica de asignación PCI/RSI encapsulada
 
+import hashlib
+import multiprocessing
 import os
 import re
+import time
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Tuple
+from itertools import groupby
+from typing import (
+    AbstractSet,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-import openpyxl
+import numpy as np
 import pandas as pd
-import tabulate
+
+from pci_rsi_sugeridor.bitmaps import (
+    N_PCI,
+    N_RSI,
+    a_bitmap,
+    a_lista,
+    array_a_bitmap,
+    mascara_rango,
+)
+from pci_rsi_sugeridor.diferido import Diferido, materializar
+from pci_rsi_sugeridor.grafo_tac import cluster_tac
+from pci_rsi_sugeridor.huecos import (
+    menor_bit,
+    primer_libre_residuo,
+    primera_base_libre,
+    primera_secuencia_libre,
+)
+from pci_rsi_sugeridor.perf import PERFIL, contar, cronometro, muestra
+from pci_rsi_sugeridor.salidas import SalidaMasiva
+
+BANDAS_POOL = ["700", "800", "900", "1800", "2100", "2600", "1", "3500", "78"]
 
 
 class ClusterAllocator:
     """
     Encapsula el estado de asignaciones de PCI por cluster
     y los pools de PCI/RSI para cada vendor y banda.
+
+    Pools y asignaciones se guardan como bitmaps de ancho fijo (int de
+    Python), manteniendo de forma incremental el bitmap global de PCIs
+    asignados en todos los clusters. Con un `estado` (EstadoAllocator) las
+    asignaciones se reservan también en disco y las reservas de otras
+    ejecuciones cuentan como usadas.
     """
 
-    def __init__(self):
-        self._assigned_by_cluster = {}
+    def __init__(self, estado=None):
+        self.estado = estado
+        self._reservar_en_estado = True
+        self._grabaciones: List[list] = []
+        self._assigned_by_cluster: MutableMapping[frozenset, int] = {}
+        self._assigned_global = 0
+        # Bitmap global heredado del padre al bifurcar (0 si no es un fork)
+        self._global_base = 0
         self._pool_pci = {
-            "ERICSSON": {
-                b: list(range(504))
-                for b in [
-                    "700",
-                    "800",
-                    "900",
-                    "1800",
-                    "2100",
-                    "2600",
-                    "1",
-                    "3500",
-                    "78",
-                ]
-            },
-            "HUAWEI": {
-                b: list(range(504))
-                for b in [
-                    "700",
-                    "800",
-                    "900",
-                    "1800",
-                    "2100",
-                    "2600",
-                    "1",
-                    "3500",
-                    "78",
-                ]
-            },
+            v: {b: mascara_rango(0, N_PCI) for b in BANDAS_POOL}
+            for v in ["ERICSSON", "HUAWEI"]
         }
         self._pool_rsi = {
-            "ERICSSON": {
-                b: list(range(838))
-                for b in [
-                    "700",
-                    "800",
-                    "900",
-                    "1800",
-                    "2100",
-                    "2600",
-                    "1",
-                    "3500",
-                    "78",
-                ]
-            },
-            "HUAWEI": {
-                b: list(range(838))
-                for b in [
-                    "700",
-                    "800",
-                    "900",
-                    "1800",
-                    "2100",
-                    "2600",
-                    "1",
-                    "3500",
-                    "78",
-                ]
-            },
+            v: {b: mascara_rango(0, N_RSI) for b in BANDAS_POOL}
+            for v in ["ERICSSON", "HUAWEI"]
         }
 
+    def fork(self) -> "ClusterAllocator":
+        """
+        Copia copy-on-write: el hijo ve las asignaciones actuales a través
+        de un ChainMap y solo escribe en su capa propia, así que bifurcar
+        no copia nada y el padre no se entera de lo que asigne el hijo.
+        Pools y reservas persistentes se comparten en solo lectura.
+        """
+        hijo = ClusterAllocator.__new__(ClusterAllocator)
+        hijo.estado = self.estado
+        hijo._reservar_en_estado = False
+        hijo._grabaciones = []
+        hijo._assigned_by_cluster = ChainMap({}, self._assigned_by_cluster)
+        hijo._assigned_global = self._assigned_global
+        hijo._global_base = self._assigned_global
+        hijo._pool_pci = self._pool_pci
+        hijo._pool_rsi = self._pool_rsi
+        return hijo
+
     def reset(self):
         """Resetea todas las asignaciones de clusters."""
-        self._assigned_by_cluster.clear()
+        # En un fork solo se vacía su propia capa: lo heredado del padre
+        # sigue visible y cuenta en el bitmap global
+        capa = self._assigned_by_cluster
+        (capa.maps[0] if isinstance(capa, ChainMap) else capa).clear()
+        self._assigned_global = self._global_base
 
     def get_unused_pci(
-        self, vendor: str, band: str, used_set: set, min_pci: int = 0
+        self, vendor: str, band: str, used_set, min_pci: int = 0
     ) -> list:
         """Devuelve pool – usado_maestro – usado_por_clusters, filtrado por min_pci."""
-        pool = self._pool_pci.get(vendor.upper(), {}).get(band, [])
-        assigned_global = (
-            set().union(*self._assigned_by_cluster.values())
-            if self._assigned_by_cluster
-            else set()
-        )
-        forbidden = set(used_set) | assigned_global
-        return [p for p in pool if p not in forbidden and p >= min_pci]
+        return a_lista(self.get_unused_pci_bitmap(vendor, band, used_set, min_pci))
+
+    def get_unused_pci_bitmap(
+        self, vendor: str, band: str, used_set, min_pci: int = 0
+    ) -> int:
+        """Como get_unused_pci, pero devuelve el bitmap."""
+        contar("allocator.consultas_pci")
+        pool = self._pool_pci.get(vendor.upper(), {}).get(band, 0)
+        forbidden = _como_bitmap(used_set, N_PCI) | self._assigned_global
+        return pool & ~forbidden & mascara_rango(min_pci, N_PCI)
 
     def get_unused_rsi(
-        self, vendor: str, band: str, used_set: set, min_rsi: int = 0
+        self, vendor: str, band: str, used_set, min_rsi: int = 0
     ) -> list:
         """Devuelve lista de RSIs libres según el vendor/band y excluyendo used_set."""
-        pool = self._pool_rsi.get(vendor.upper(), {}).get(band, [])
-        return [r for r in pool if r not in used_set and r >= min_rsi]
+        return a_lista(self.get_unused_rsi_bitmap(vendor, band, used_set, min_rsi))
 
-    def register_assigned(self, cluster: set, pcis: list):
+    def get_unused_rsi_bitmap(
+        self, vendor: str, band: str, used_set, min_rsi: int = 0
+    ) -> int:
+        """Como get_unused_rsi, pero devuelve el bitmap."""
+        contar("allocator.consultas_rsi")
+        pool = self._pool_rsi.get(vendor.upper(), {}).get(band, 0)
+        forbidden = _como_bitmap(used_set, N_RSI)
+        return pool & ~forbidden & mascara_rango(min_rsi, N_RSI)
+
+    def register_assigned(
+        self,
+        cluster: AbstractSet[str],
+        pcis: list,
+        tac=None,
+        vendor: str = "",
+        band: str = "",
+    ):
         """Registra los PCIs asignados para un cluster dado."""
-        key = frozenset(cluster)
-        self._assigned_by_cluster.setdefault(key, set()).update(
-            [p for p in pcis if isinstance(p, int)]
-        )
+        contar("allocator.registros")
+        key = _clave_cluster(cluster)
+        bm = a_bitmap((p for p in pcis if isinstance(p, int)), N_PCI)
+        self._assigned_by_cluster[key] = self._assigned_by_cluster.get(key, 0) | bm
+        self._assigned_global |= bm
+        if self._reservar_en_estado and self.estado is not None and tac and band:
+            self.estado.reservar(tac, vendor, band, pcis)
+        for registros in self._grabaciones:
+            registros.append([tac, vendor, band, a_lista(bm)])
+
+    @contextmanager
+    def grabar(self):
+        """Recoge en una lista los registros hechos dentro del bloque."""
+        registros: list = []
+        self._grabaciones.append(registros)
+        try:
+            yield registros
+        finally:
+            self._grabaciones.remove(registros)
+
+    def huella(self) -> str:
+        """Hash de las asignaciones por cluster (y de las reservas del estado)."""
+        h = hashlib.blake2b(digest_size=16)
+        for key, bm in sorted(
+            (sorted(map(str, k)), bm) for k, bm in self._assigned_by_cluster.items()
+        ):
+            h.update(f"{','.join(key)}={bm:x};".encode())
+        if self.estado is not None:
+            h.update(self.estado.huella().encode())
+        return h.hexdigest()
 
-    def get_cluster_assigned(self, cluster: set) -> set:
+    def get_cluster_assigned(self, cluster: AbstractSet[str]) -> set:
         """Obtiene el set de PCIs ya asignados para un cluster."""
-        return self._assigned_by_cluster.get(frozenset(cluster), set())
+        return set(a_lista(self.get_cluster_assigned_bitmap(cluster)))
+
+    def get_cluster_assigned_bitmap(
+        self, cluster: AbstractSet[str], band: str = ""
+    ) -> int:
+        """
+        Como get_cluster_assigned, pero devuelve el bitmap. Con `band` se
+        añaden las reservas persistentes de la banda en el cluster.
+        """
+        bm = self._assigned_by_cluster.get(_clave_cluster(cluster), 0)
+        if self.estado is not None and band:
+            bm |= self.estado.reservados(cluster, band)
+        return bm
+
+
+def _clave_cluster(cluster) -> frozenset:
+    # Los clusters de GrafoTAC ya son frozensets (con el hash cacheado)
+    return cluster if isinstance(cluster, frozenset) else frozenset(cluster)
+
+
+def _como_bitmap(usados, ancho: int) -> int:
+    """Acepta un bitmap ya construido o un iterable de enteros."""
+    if isinstance(usados, int):
+        return usados & mascara_rango(0, ancho)
+    return a_bitmap(usados, ancho)
+
+
+class IndiceMaestro:
+    """
+    Índice precalculado sobre el maestro PCI/RSI: para cada
+    (TAC, BAND_CLEAN, TECH_GROUP) guarda los PCIs y RSIs ya usados,
+    de forma que consultar un cluster no dependa del tamaño del maestro.
+    También agrupa las filas por SITE_CLEAN y precalcula el número de
+    sectores de cada site.
+    """
+
+    def __init__(self, df_pci_master: pd.DataFrame):
+        self._construir(df_pci_master)
+
+    def _construir(self, df_pci_master: pd.DataFrame):
+        self._df = df_pci_master
+        self._usados: Dict[tuple, list] = {}
+        self._filas_site: Dict[str, np.ndarray] = {}
+        self._sectores: Dict[str, int] = {}
+        self._por_cluster: Dict[tuple, Tuple[int, int]] = {}
+        if df_pci_master.empty:
+            return
+        self._indexar_usados(df_pci_master)
+        self._indexar_sites(df_pci_master)
+
+    def _indexar_usados(self, df: pd.DataFrame):
+        claves = ["TAC", "BAND_CLEAN", "TECH_GROUP"]
+        if any(c not in df for c in claves):
+            return
+        for pos, col, ancho in [(0, "BCCH/SC/PCI", N_PCI), (1, "RSQID", N_RSI)]:
+            if col not in df:
+                continue
+            valores = enteros_por_fila(df[col])
+            filas = df.loc[valores.index, claves]
+            grupos = filas.groupby(claves, sort=False, observed=True).indices
+            arr = valores.to_numpy()
+            for clave, posiciones in grupos.items():
+                entrada = self._usados.setdefault(clave, [0, 0])
+                entrada[pos] = array_a_bitmap(arr[posiciones], ancho)
+
+    def _indexar_sites(self, df: pd.DataFrame):
+        if "SITE_CLEAN" not in df:
+            return
+        self._filas_site = df.groupby("SITE_CLEAN", sort=False, observed=True).indices
+        self._sectores = self._contar_sectores(df)
+
+    @staticmethod
+    def _contar_sectores(df: pd.DataFrame) -> Dict[str, int]:
+        if "CELLNAME" not in df:
+            return {}
+        celdas = df["CELLNAME"].dropna().astype(str).str.strip().str.upper()
+        num = celdas.str.extract(r"(\d+)[AB]$", expand=False).dropna()
+        num = pd.to_numeric(num, errors="coerce").dropna()
+        sites = df["SITE_CLEAN"].loc[num.index]
+        return num.groupby(sites, observed=True).nunique().to_dict()
+
+    def actualizar(
+        self,
+        df_pci_master: pd.DataFrame,
+        tacs: Optional[set] = None,
+        sites: Optional[set] = None,
+    ):
+        """
+        Apunta el índice a una nueva versión del maestro recalculando solo
+        las entradas de los `tacs` y `sites` tocados (todo si no se indican).
+        """
+        if tacs is None or sites is None or df_pci_master.empty:
+            self._construir(df_pci_master)
+            return
+        self._df = df_pci_master
+        self._por_cluster.clear()
+        self._usados = {k: v for k, v in self._usados.items() if k[0] not in tacs}
+        if "TAC" in df_pci_master:
+            self._indexar_usados(df_pci_master[df_pci_master["TAC"].isin(tacs)])
+        if "SITE_CLEAN" not in df_pci_master:
+            return
+        # Las posiciones de las filas cambian con cualquier alta o baja
+        self._filas_site = df_pci_master.groupby(
+            "SITE_CLEAN", sort=False, observed=True
+        ).indices
+        for site in sites:
+            self._sectores.pop(site, None)
+        self._sectores.update(
+            self._contar_sectores(
+                df_pci_master[df_pci_master["SITE_CLEAN"].isin(sites)]
+            )
+        )
+
+    def usados_cluster(
+        self, cluster: AbstractSet[str], band: str, tech: str
+    ) -> Tuple[int, int]:
+        """Bitmaps (PCIs, RSIs) usados en los TAC del cluster para banda/tecnología."""
+        return self.usados_cluster_techs(cluster, band, (tech,))[tech]
+
+    def usados_cluster_techs(
+        self, cluster: AbstractSet[str], band: str, techs: Sequence[str]
+    ) -> Dict[str, Tuple[int, int]]:
+        """usados_cluster de varias tecnologías recorriendo el cluster una vez."""
+        # Los frozensets (clusters de GrafoTAC) se memorizan por (cluster, banda, tech)
+        memorizar = isinstance(cluster, frozenset)
+        res = {}
+        for tech in techs:
+            if memorizar and (cluster, band, tech) in self._por_cluster:
+                res[tech] = self._por_cluster[(cluster, band, tech)]
+        pendientes = {tech: [0, 0] for tech in techs if tech not in res}
+        if not pendientes:
+            return res
+        for tac in cluster:
+            for tech, acum in pendientes.items():
+                entrada = self._usados.get((tac, band, tech))
+                if entrada:
+                    acum[0] |= entrada[0]
+                    acum[1] |= entrada[1]
+        for tech, (pcis, rsis) in pendientes.items():
+            res[tech] = (pcis, rsis)
+            if memorizar:
+                self._por_cluster[(cluster, band, tech)] = (pcis, rsis)
+        return res
+
+    def filas_site(self, site_clean: str) -> pd.DataFrame:
+        """Filas del maestro de un site (vacío si no existe)."""
+        return self._df.iloc[self._filas_site.get(site_clean, [])]
+
+    def sectores_site(self, site_clean: str) -> int:
+        """Número de sectores del site según CELLNAME (3 por defecto)."""
+        return self._sectores.get(site_clean, 3)
+
+
+class IndiceRSI5G:
+    """
+    Maestro RSI 5G (`df`) con el bitmap de RSIs ocupados en cada TAC, de
+    forma que consultar un cluster no obligue a recorrer el fichero.
+    """
+
+    def __init__(self, df_rsi_5g: pd.DataFrame):
+        self.df = df_rsi_5g
+        self._por_tac: Dict[str, int] = {}
+        if df_rsi_5g.empty or any(c not in df_rsi_5g for c in ("TAC", "RSQID")):
+            return
+        valores = enteros_por_fila(df_rsi_5g["RSQID"])
+        tacs = df_rsi_5g["TAC"].loc[valores.index]
+        valores, tacs = valores[tacs.notna()], tacs.dropna().astype(str)
+        arr = valores.to_numpy()
+        for tac, posiciones in tacs.groupby(tacs, sort=False).indices.items():
+            self._por_tac[tac] = array_a_bitmap(arr[posiciones], N_RSI)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def usados_cluster(self, cluster: AbstractSet[str]) -> int:
+        """Bitmap de RSIs 5G usados en los TAC del cluster."""
+        bm = 0
+        for tac in cluster:
+            bm |= self._por_tac.get(str(tac), 0)
+        return bm
+
+
+def indice_rsi_5g(rsi_5g) -> IndiceRSI5G:
+    """IndiceRSI5G de `rsi_5g`: un Diferido, un índice ya hecho o el DataFrame."""
+    rsi_5g = materializar(rsi_5g)
+    return rsi_5g if isinstance(rsi_5g, IndiceRSI5G) else IndiceRSI5G(rsi_5g)
+
+
+def preparar_rsi_5g(rsi_5g):
+    """
+    Indexa una sola vez un maestro RSI 5G recibido como DataFrame; un
+    Diferido o un índice ya hecho se devuelven tal cual (sin cargarlos).
+    """
+    return IndiceRSI5G(rsi_5g) if isinstance(rsi_5g, pd.DataFrame) else rsi_5g
 
 
 # FUNCIONES AUXILIARES
@@ -219,8 +474,12 @@ def agrupar_tech(x: str) -> str:
     return xt
 
 
-def detectar_numero_sectores(site: str, df_pci_master: pd.DataFrame) -> int:
+def detectar_numero_sectores(
+    site: str, df_pci_master: pd.DataFrame, indice: Optional[IndiceMaestro] = None
+) -> int:
     sc = site.strip().upper()
+    if indice is not None:
+        return indice.sectores_site(sc)
     df_site_local = df_pci_master[df_pci_master["SITE_CLEAN"] == sc]
     if df_site_local.empty:
         return 3
@@ -250,41 +509,75 @@ def generar_nombre_celda(
     return f"{base}{letra}{idx}{suf}"
 
 
-def serie_a_enteros_multi(s: pd.Series) -> set:
-    res = set()
-    for val in s.dropna().astype(str):
-        for part in re.split(r"[;, \s]+", val):
-            if part.isdigit():
-                res.add(int(part))
-    return res
+# Entero delimitado por separadores (;  ,  espacios) o por los extremos
+_PATRON_ENTERO = re.compile(r"(?<![^;,\s])\d+(?![^;,\s])")
 
 
-def sugerir_consecutivos_mod3(pool: list, n: int, min_pci: int = 0) -> list:
-    libres = [x for x in sorted(set(pool)) if x >= min_pci]
-    for base in libres:
-        if base % 3 == 0:
-            seq = [base + i for i in range(n)]
-            result = [x if x in libres else "" for x in seq]
-            return result
-    res = libres[:n]
-    while len(res) < n:
-        res.append("")
-    return res
+def enteros_por_fila(s: pd.Series) -> pd.Series:
+    """
+    Trocea cada celda por ';', ',' o espacios y devuelve un entero por
+    fila resultante, conservando el índice de la fila de origen.
+    """
+    textos = s.dropna().astype(str)
+    simples = textos.str.isdigit().astype(bool)
+    # La mayoría de celdas tienen un único valor: solo se trocea el resto
+    partes = textos[~simples].str.split(r"[;, \s]+").explode()
+    partes = partes[partes.str.isdigit().fillna(False).astype(bool)]
+    valores = pd.concat([textos[simples], partes])
+    try:
+        return valores.astype(np.int64)
+    except ValueError:  # dígitos no ASCII que isdigit acepta
+        return pd.to_numeric(valores, errors="coerce").dropna().astype(np.int64)
+
+
+def serie_a_enteros_multi(s: pd.Series, formato: str = "set", ancho: int = 0):
+    """
+    Enteros contenidos en la serie. `formato` puede ser "set", "array"
+    (np.ndarray ordenado y sin duplicados) o "bitmap" (int de ancho `ancho`).
+    """
+    texto = ";".join(s.dropna().astype(str).tolist())
+    valores = np.unique(np.array(_PATRON_ENTERO.findall(texto), dtype=np.int64))
+    if formato == "array":
+        return valores
+    if formato == "bitmap":
+        return array_a_bitmap(valores, ancho)
+    return set(valores.tolist())
+
+
+def sugerir_consecutivos_mod3(pool, n: int, min_pci: int = 0) -> list:
+    """
+    n PCIs consecutivos desde una base múltiplo de 3. Se prefiere el primer
+    tramo totalmente libre; si no lo hay, la primera base libre con huecos
+    ("") donde falten PCIs, y si tampoco, los primeros libres.
+    """
+    libres = _como_bitmap(pool, N_PCI) & mascara_rango(min_pci, N_PCI)
+    base = primera_base_libre(libres, n)
+    if base < 0:
+        base = primer_libre_residuo(libres, 0)
+    if base >= 0:
+        return [x if libres >> x & 1 else "" for x in range(base, base + n)]
+    res = a_lista(libres)[:n]
+    return res + [""] * (n - len(res))
 
 
-def sugerir_rsi_con_sep(libres: list, n: int, vendor: str, bc: str) -> list:
-    libres_s = sorted(set(libres))
+def sugerir_rsi_con_sep(libres, n: int, vendor: str, bc: str) -> list:
+    """
+    n RSIs libres. En Ericsson van separados 8 (3500) o 10: se busca la
+    primera secuencia con todos sus RSIs libres y, si no la hay, se parte
+    del primer libre dejando huecos ("") en los ocupados.
+    """
+    libres_bm = _como_bitmap(libres, N_RSI)
     if vendor.upper() == "ERICSSON":
         sep = 8 if bc == "3500" else 10
-        first = libres_s[0] if libres_s else None
-        if first is None:
+        first = primera_secuencia_libre(libres_bm, n, sep)
+        if first < 0:
+            first = menor_bit(libres_bm)
+        if first < 0:
             return [""] * n
-        return [first + i * sep for i in range(n)]
-    else:
-        res = libres_s[:n]
-        while len(res) < n:
-            res.append("")
-        return res
+        seq = [first + i * sep for i in range(n)]
+        return [x if libres_bm >> x & 1 else "" for x in seq]
+    res = a_lista(libres_bm)[:n]
+    return res + [""] * (n - len(res))
 
 
 # ============================================================
@@ -292,23 +585,209 @@ def sugerir_rsi_con_sep(libres: list, n: int, vendor: str, bc: str) -> list:
 # ============================================================
 
 
-def cargar_y_preprocesar_pci(csv_pci_path: str) -> pd.DataFrame:
-    sep = detect_separator(csv_pci_path)
-    df = pd.read_csv(
-        csv_pci_path, dtype=str, sep=sep, encoding="utf-8", error_bad_lines=False
+def leer_peticiones(entrada_osp: str) -> pd.DataFrame:
+    """Lee el CSV de peticiones OSP y normaliza sus columnas y banda."""
+    df_req = pd.read_csv(
+        ensure_csv(entrada_osp),
+        dtype=str,
+        sep=detect_separator(entrada_osp),
+        encoding="utf-8",
+        error_bad_lines=False,
+    )
+    return normalizar_peticiones(df_req)
+
+
+def normalizar_peticiones(df_req: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza las columnas de las peticiones y añade BAND_CLEAN."""
+    df_req = map_peticion_columns(df_req)
+    n = len(df_req)
+    pares = list(
+        zip(
+            df_req["BAND"] if "BAND" in df_req else [""] * n,
+            df_req["TECH"] if "TECH" in df_req else [""] * n,
+        )
     )
+    # normaliza_banda solo se evalúa una vez por par (banda, tecnología)
+    normalizadas = {p: normaliza_banda(*p) for p in set(pares)}
+    df_req["BAND_CLEAN"] = [normalizadas[p] for p in pares]
+    return df_req
+
+
+def grupos_peticiones(df_req: pd.DataFrame) -> List[tuple]:
+    """Grupos (site, banda, tech) a planificar, uno por site y banda."""
+    return [
+        (site, band, group["TECH"].iloc[0])
+        for (site, band), group in df_req.groupby(["SITE", "BAND_CLEAN"])
+    ]
+
+
+def sites_de_peticiones(df_req: pd.DataFrame) -> set:
+    return set(df_req["SITE"].dropna().astype(str).str.strip().str.upper())
+
+
+def leer_maestro_pci(csv_pci_path: str) -> pd.DataFrame:
+    """Lee el maestro PCI/RSI en bruto (texto, columnas estándar)."""
+    sep = detect_separator(csv_pci_path)
+    with cronometro("maestro.lectura_csv"):
+        df = pd.read_csv(
+            csv_pci_path, dtype=str, sep=sep, encoding="utf-8", error_bad_lines=False
+        )
     df = map_column_names(df)
     if "SITE" not in df.columns:
         raise ValueError("La columna 'SITE' es obligatoria en el maestro PCI/RSI.")
+    return df
+
+
+def cargar_y_preprocesar_pci(csv_pci_path: str) -> pd.DataFrame:
+    df = leer_maestro_pci(csv_pci_path)
+    with cronometro("maestro.normalizacion"):
+        return preprocesar_maestro_pci(df)
+
+
+COLUMNAS_PLANIFICADOR = [
+    "SITE",
+    "TAC",
+    "BAND",
+    "TECH",
+    "VENDOR",
+    "CELLNAME",
+    "BCCH/SC/PCI",
+    "RSQID",
+]
+
+
+def _columnas_originales(csv_path: str, sep: str, std: list) -> dict:
+    """Nombre original en el CSV de cada columna estándar de `std` presente."""
+    cabecera = pd.read_csv(csv_path, sep=sep, nrows=0, encoding="utf-8").columns
+    mapeadas = map_column_names(pd.DataFrame(columns=cabecera)).columns
+    return {nuevo: orig for orig, nuevo in zip(cabecera, mapeadas) if nuevo in std}
+
+
+def cargar_y_preprocesar_pci_lote(
+    csv_pci_path: str, sites: set, tac_a_vecinos: dict, chunksize: int = 200_000
+) -> pd.DataFrame:
+    """
+    Carga en streaming solo la parte del maestro que necesita un lote de
+    peticiones: las filas de los `sites` pedidos y las de los TAC de sus
+    clusters, leyendo por trozos y únicamente las columnas del planificador.
+    """
+    sep = detect_separator(csv_pci_path)
+    cols = _columnas_originales(csv_pci_path, sep, COLUMNAS_PLANIFICADOR)
+    if "SITE" not in cols:
+        raise ValueError("La columna 'SITE' es obligatoria en el maestro PCI/RSI.")
+
+    def trozos(usecols):
+        return pd.read_csv(
+            csv_pci_path,
+            dtype=str,
+            sep=sep,
+            encoding="utf-8",
+            usecols=usecols,
+            chunksize=chunksize,
+            error_bad_lines=False,
+        )
+
+    def es_site_pedido(chunk):
+        return chunk[cols["SITE"]].astype(str).str.strip().str.upper().isin(sites)
+
+    # 1ª pasada (SITE, TAC): TACs de los sites pedidos y sus vecinos
+    cluster_tacs: set = set()
+    if "TAC" in cols:
+        for chunk in trozos([cols["SITE"], cols["TAC"]]):
+            cluster_tacs.update(chunk.loc[es_site_pedido(chunk), cols["TAC"]].dropna())
+        for tac in list(cluster_tacs):
+            cluster_tacs.update(tac_a_vecinos.get(str(tac), []))
+
+    # 2ª pasada: solo filas de esos clusters
+    partes = []
+    for chunk in trozos(list(cols.values())):
+        keep = es_site_pedido(chunk)
+        if "TAC" in cols:
+            keep |= chunk[cols["TAC"]].isin(cluster_tacs)
+        partes.append(chunk[keep])
+    if partes:
+        df = pd.concat(partes, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=list(cols.values()), dtype=str)
+    with cronometro("maestro.normalizacion"):
+        return preprocesar_maestro_pci(map_column_names(df))
+
+
+def _columna_texto(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].astype(str)
+
+
+def _normalizar_por_valores(serie: pd.Series, fn) -> np.ndarray:
+    """Aplica fn una sola vez por valor distinto y reexpande con los códigos."""
+    codigos, unicos = pd.factorize(serie)
+    normalizados = np.array([fn(u) for u in unicos], dtype=object)
+    return normalizados.take(codigos)
+
+
+def preprocesar_maestro_pci(df: pd.DataFrame) -> pd.DataFrame:
+    """Añade SITE_CLEAN, BAND_CLEAN, TECH_GROUP y VENDOR_CLEAN al maestro."""
     df["SITE_CLEAN"] = df["SITE"].astype(str).str.strip().str.upper()
-    df["BAND_CLEAN"] = df.apply(
-        lambda r: normaliza_banda(r.get("BAND", ""), r.get("TECH", "")), axis=1
+    # normaliza_banda solo depende del texto de la banda: basta con
+    # normalizar cada valor distinto una vez.
+    df["BAND_CLEAN"] = _normalizar_por_valores(
+        _columna_texto(df, "BAND"), lambda b: normaliza_banda(b, "")
+    )
+    df["TECH_GROUP"] = _normalizar_por_valores(_columna_texto(df, "TECH"), agrupar_tech)
+    df["VENDOR_CLEAN"] = _normalizar_por_valores(
+        _columna_texto(df, "VENDOR"), lambda v: v.strip().upper()
     )
-    df["TECH_GROUP"] = df.get("TECH", "").apply(agrupar_tech)
-    df["VENDOR_CLEAN"] = df.get("VENDOR", "").astype(str).str.strip().str.upper()
     return df
 
 
+# Columnas que añade preprocesar_maestro_pci a las del export
+COLUMNAS_DERIVADAS = ["SITE_CLEAN", "BAND_CLEAN", "TECH_GROUP", "VENDOR_CLEAN"]
+COLUMNAS_CATEGORICAS = [
+    "SITE",
+    "TAC",
+    "BAND",
+    "TECH",
+    "VENDOR",
+    "SITE_CLEAN",
+    "BAND_CLEAN",
+    "TECH_GROUP",
+    "VENDOR_CLEAN",
+]
+COLUMNAS_ENTERAS = ["BCCH/SC/PCI", "RSQID"]
+
+
+def compactar_maestro(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte el maestro a una representación compacta: categóricas para
+    las columnas de baja cardinalidad y enteros (Int32) para PCI/RSI
+    cuando todas sus celdas tienen un único valor. Las columnas PCI/RSI
+    con valores múltiples se guardan como categóricas.
+    """
+    for col in COLUMNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in COLUMNAS_ENTERAS:
+        if col not in df.columns:
+            continue
+        valores = df[col].dropna().astype(str).str.strip()
+        if valores.str.fullmatch(r"\d{1,9}").all():
+            df[col] = pd.to_numeric(valores).reindex(df.index).astype("Int32")
+        else:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def informe_memoria(df_original: pd.DataFrame, df_compacto: pd.DataFrame):
+    """Compara por columna los bytes en memoria de dos versiones del maestro."""
+    antes = df_original.memory_usage(index=False, deep=True)
+    despues = df_compacto.memory_usage(index=False, deep=True)
+    informe = pd.DataFrame({"bytes_original": antes, "bytes_compacto": despues})
+    informe = pd.concat([informe, informe.sum().to_frame("TOTAL").T])
+    informe["ratio"] = (informe["bytes_original"] / informe["bytes_compacto"]).round(1)
+    return informe
+
+
 def cargar_y_preprocesar_rsi_5g(
     csv_rsi_path: str, df_pci_master: pd.DataFrame
 ) -> pd.DataFrame:
@@ -324,12 +803,27 @@ def cargar_y_preprocesar_rsi_5g(
         return pd.DataFrame()
     df["SITE_CLEAN"] = df["SITE"].astype(str).str.strip().str.upper()
     df["FECHA"] = pd.to_datetime(df["FECHA"], errors="coerce")
-    df = df.sort_values("FECHA", ascending=False).drop_duplicates("SITE_CLEAN")
-    df["TAC"] = df["SITE_CLEAN"].map(df_pci_master.set_index("SITE_CLEAN")["TAC"])
-    return df
+    # Se conserva la última fila de cada celda (o de cada site si no hay
+    # CELLNAME): todas las celdas vivas cuentan en la ocupación de RSIs
+    claves = ["SITE_CLEAN"]
+    if "CELLNAME" in df.columns:
+        df["CELLNAME"] = df["CELLNAME"].astype(str).str.strip().str.upper()
+        claves.append("CELLNAME")
+    df = df.sort_values("FECHA", ascending=False).drop_duplicates(claves)
+    # El TAC es uno por site: solo aquí se deduplica por SITE_CLEAN
+    tac_por_site = (
+        df_pci_master[["SITE_CLEAN", "TAC"]]
+        .drop_duplicates("SITE_CLEAN")
+        .astype(object)
+    )
+    return df.drop(columns="TAC", errors="ignore").merge(
+        tac_por_site, on="SITE_CLEAN", how="left"
+    )
 
 
 def preprocesar_TACAreas(xlsx_path: str = "TACAreas.xlsx") -> dict:
+    import openpyxl
+
     try:
         wb = openpyxl.load_workbook(xlsx_path, read_only=True)
     except FileNotFoundError:
@@ -351,6 +845,96 @@ def preprocesar_TACAreas(xlsx_path: str = "TACAreas.xlsx") -> dict:
 # ============================================================
 
 
+def _tacs_por_tech(df_site: pd.DataFrame, techs: Sequence[str]) -> Dict[str, list]:
+    """tacs_planificables de varias tecnologías con una sola pasada por el site."""
+    tech_arr = df_site["TECH_GROUP"].to_numpy()
+    tac_arr = df_site["TAC"].to_numpy()
+    con_nbiot = set(tac_arr[tech_arr == "NBIOT"])
+    tacs: Dict[str, list] = {tc: [] for tc in techs}
+    for tc, tac in zip(tech_arr, tac_arr):
+        if tc in tacs and not pd.isna(tac) and tac not in tacs[tc]:
+            tacs[tc].append(tac)
+    return {tc: [t for t in lista if t not in con_nbiot] for tc, lista in tacs.items()}
+
+
+def tacs_planificables(df_site: pd.DataFrame, tc: str) -> list:
+    """TACs del site para la tecnología `tc`, salvo los que tienen NBIOT."""
+    return _tacs_por_tech(df_site, (tc,))[tc]
+
+
+def _usados_cluster_df(
+    df_pci_master: pd.DataFrame,
+    cluster: AbstractSet[str],
+    band: str,
+    techs: Sequence[str],
+) -> Dict[str, Tuple[int, int]]:
+    """Como IndiceMaestro.usados_cluster_techs, filtrando el maestro sin índice."""
+    filas = df_pci_master[
+        df_pci_master["TAC"].isin(cluster)
+        & (df_pci_master["BAND_CLEAN"] == band)
+        & df_pci_master["TECH_GROUP"].isin(techs)
+    ]
+    res = {}
+    for tech in techs:
+        sub = filas[filas["TECH_GROUP"] == tech]
+        res[tech] = (
+            serie_a_enteros_multi(sub["BCCH/SC/PCI"], "bitmap", N_PCI),
+            serie_a_enteros_multi(sub["RSQID"], "bitmap", N_RSI),
+        )
+    return res
+
+
+def coordinar_mod3(libres, residuos: Sequence[Optional[int]]) -> list:
+    """
+    Un PCI por residuo: el primer libre con ese PCI % 3, sin repetir. Sin
+    residuo (None, celda 4G sin PCI) no hay nada que coordinar y queda "".
+    """
+    libres_bm = _como_bitmap(libres, N_PCI)
+    pcis = []
+    for res in residuos:
+        cand = -1 if res is None else primer_libre_residuo(libres_bm, res)
+        if cand >= 0:
+            libres_bm &= ~(1 << cand)
+        pcis.append(cand if cand >= 0 else "")
+    return pcis
+
+
+def _filas_resultado(
+    sc_upper: str,
+    nodo_vdf: str,
+    tech: str,
+    band: str,
+    bc: str,
+    n_celdas: int,
+    tac_item,
+    vecinos,
+    ap_list: list,
+    ar_list: list,
+) -> Tuple[dict, list]:
+    """Fila de resumen y filas de detalle (una por celda) de un TAC."""
+    resumen = {
+        "Elemento": sc_upper,
+        "NODO VDF": nodo_vdf,
+        "Tecnología": f"{tech}_{bc}",
+        "pci's": ";".join(str(x) for x in ap_list if x != ""),
+        "rsi's": ";".join(str(x) for x in ar_list if x != ""),
+        "TAC": tac_item,
+        "TAC_VECINOS": ",".join(vecinos),
+    }
+    detalle = [
+        {
+            "NODO VDF": nodo_vdf,
+            "Celda": generar_nombre_celda(nodo_vdf, tech, band, i + 1),
+            "PCI sugerido": ap_list[i] if i < len(ap_list) else "",
+            "RSI sugerido": ar_list[i] if i < len(ar_list) else "",
+            "TAC": tac_item,
+            "TAC_VECINOS": ",".join(vecinos),
+        }
+        for i in range(n_celdas)
+    ]
+    return resumen, detalle
+
+
 def sugerir_pci_rsi(
     site: str,
     nodo_vdf: str,
@@ -365,7 +949,10 @@ def sugerir_pci_rsi(
     modo_r: bool,
     allocator=None,
     coord_pcis=None,
+    indice: Optional[IndiceMaestro] = None,
+    pcis_fijos: Optional[dict] = None,
 ) -> Tuple[list, list]:
+    # pcis_fijos: {TAC: [PCIs]} ya decididos (p.ej. por el optimizador)
     if allocator is None:
         allocator = ClusterAllocator()
 
@@ -373,84 +960,197 @@ def sugerir_pci_rsi(
     tc = agrupar_tech(tech)
     bc = normaliza_banda(band, tech)
 
-    df_site = df_pci_master[df_pci_master["SITE_CLEAN"] == sc_upper]
+    if indice is not None:
+        df_site = indice.filas_site(sc_upper)
+    else:
+        df_site = df_pci_master[df_pci_master["SITE_CLEAN"] == sc_upper]
     if df_site.empty:
         raise ValueError(f"SITE {site} no encontrado en maestro.")
+    vendor = df_site["VENDOR_CLEAN"].iloc[0]
+    # Los RSIs de 5G no salen del maestro PCI sino del maestro RSI 5G
+    rsi_5g = indice_rsi_5g(df_rsi_5g_master) if tc == "5G" else None
 
-    df_site_tc = df_site[df_site["TECH_GROUP"] == tc]
-    tacs = df_site_tc["TAC"].dropna().unique().tolist()
-    tacs = [
-        t
-        for t in tacs
-        if df_site[(df_site["TAC"] == t) & (df_site["TECH_GROUP"] == "NBIOT")].empty
-    ]
+    tacs = tacs_planificables(df_site, tc)
 
     resumen_list, detalle_list = [], []
     for tac_item in tacs:
         vecinos = tac_a_vecinos.get(str(tac_item), [])
-        cluster = set(vecinos) | {str(tac_item)}
+        cluster = cluster_tac(tac_a_vecinos, tac_item)
 
-        usados_pci = set()
-        mask_pci = (
-            df_pci_master["TAC"].isin(cluster)
-            & (df_pci_master["BAND_CLEAN"] == bc)
-            & (df_pci_master["TECH_GROUP"] == tc)
-        )
-        usados_pci |= serie_a_enteros_multi(df_pci_master[mask_pci]["BCCH/SC/PCI"])
-        usados_pci |= allocator.get_cluster_assigned(cluster)
-        libres_pci = allocator.get_unused_pci(
-            df_site["VENDOR_CLEAN"].iloc[0], bc, usados_pci, min_pci
-        )
+        with cronometro("sugerir.usados_cluster"):
+            if indice is not None:
+                usados_pci, usados_rsi_maestro = indice.usados_cluster(cluster, bc, tc)
+            else:
+                usados_pci, usados_rsi_maestro = _usados_cluster_df(
+                    df_pci_master, cluster, bc, (tc,)
+                )[tc]
+        usados_pci |= allocator.get_cluster_assigned_bitmap(cluster, bc)
+        libres_pci = allocator.get_unused_pci_bitmap(vendor, bc, usados_pci, min_pci)
 
-        usados_rsi = (
-            serie_a_enteros_multi(df_pci_master[mask_pci]["RSQID"])
-            if tc != "5G"
-            else set()
-        )
-        libres_rsi = allocator.get_unused_rsi(
-            df_site["VENDOR_CLEAN"].iloc[0], bc, usados_rsi, min_rsi
-        )
+        if rsi_5g is not None:
+            usados_rsi = rsi_5g.usados_cluster(cluster)
+        else:
+            usados_rsi = usados_rsi_maestro
+        libres_rsi = allocator.get_unused_rsi_bitmap(vendor, bc, usados_rsi, min_rsi)
 
-        if coord_pcis:
-            ap_list = []
-            for res_4g in coord_pcis:
-                cand = next((p for p in libres_pci if p % 3 == res_4g), None)
-                ap_list.append(cand if cand is not None else "")
+        if pcis_fijos and str(tac_item) in pcis_fijos:
+            ap_list = list(pcis_fijos[str(tac_item)])
+        elif coord_pcis:
+            # Mismo residuo mod 3 que el PCI 4G de cada celda
+            ap_list = coordinar_mod3(libres_pci, coord_pcis)
         else:
             ap_list = sugerir_consecutivos_mod3(libres_pci, n_celdas, min_pci)
-        ar_list = sugerir_rsi_con_sep(
-            libres_rsi, n_celdas, df_site["VENDOR_CLEAN"].iloc[0], bc
+        ar_list = sugerir_rsi_con_sep(libres_rsi, n_celdas, vendor, bc)
+
+        allocator.register_assigned(
+            cluster, [p for p in ap_list if isinstance(p, int)], tac_item, vendor, bc
         )
 
-        allocator.register_assigned(cluster, [p for p in ap_list if isinstance(p, int)])
-
-        resumen_list.append(
-            {
-                "Elemento": sc_upper,
-                "NODO VDF": nodo_vdf,
-                "Tecnología": f"{tech}_{bc}",
-                "pci's": ";".join(str(x) for x in ap_list if x != ""),
-                "rsi's": ";".join(str(x) for x in ar_list if x != ""),
-                "TAC": tac_item,
-                "TAC_VECINOS": ",".join(vecinos),
-            }
+        resumen, detalle = _filas_resultado(
+            sc_upper,
+            nodo_vdf,
+            tech,
+            band,
+            bc,
+            n_celdas,
+            tac_item,
+            vecinos,
+            ap_list,
+            ar_list,
         )
-        for idx_det, cell_name in enumerate(
-            [generar_nombre_celda(nodo_vdf, tech, band, i + 1) for i in range(n_celdas)]
-        ):
-            detalle_list.append(
-                {
-                    "NODO VDF": nodo_vdf,
-                    "Celda": cell_name,
-                    "PCI sugerido": ap_list[idx_det] if idx_det < len(ap_list) else "",
-                    "RSI sugerido": ar_list[idx_det] if idx_det < len(ar_list) else "",
-                    "TAC": tac_item,
-                    "TAC_VECINOS": ",".join(vecinos),
-                }
-            )
+        resumen_list.append(resumen)
+        detalle_list.extend(detalle)
     return resumen_list, detalle_list
 
 
+def _planificar_lnr700_site(
+    site: str,
+    n_celdas: int,
+    df_pci_master: pd.DataFrame,
+    tac_a_vecinos: dict,
+    min_pci: int,
+    min_rsi: int,
+    indice: Optional[IndiceMaestro],
+    allocator: ClusterAllocator,
+    usados_por_cluster: dict,
+    rsi_5g,
+) -> Tuple[list, list, list, list]:
+    sc_upper = site.strip().upper()
+    if indice is not None:
+        df_site = indice.filas_site(sc_upper)
+    else:
+        df_site = df_pci_master[df_pci_master["SITE_CLEAN"] == sc_upper]
+    if df_site.empty:
+        raise ValueError(f"SITE {site} no encontrado en maestro.")
+    vendor = df_site["VENDOR_CLEAN"].iloc[0]
+
+    salida: Dict[str, Tuple[list, list]] = {"4G": ([], []), "5G": ([], [])}
+    residuos: Dict[str, list] = {}
+    for tech, tacs in _tacs_por_tech(df_site, ("4G", "5G")).items():
+        for tac_item in tacs:
+            vecinos = tac_a_vecinos.get(str(tac_item), [])
+            cluster = cluster_tac(tac_a_vecinos, tac_item)
+            clave = _clave_cluster(cluster)
+            with cronometro("lnr700.usados_cluster"):
+                # Usados de 4G y 5G de una vez, compartidos por los sites del lote
+                if clave not in usados_por_cluster:
+                    usados_por_cluster[clave] = (
+                        indice.usados_cluster_techs(cluster, "700", ("4G", "5G"))
+                        if indice is not None
+                        else _usados_cluster_df(
+                            df_pci_master, cluster, "700", ("4G", "5G")
+                        )
+                    )
+            usados_pci, usados_rsi = usados_por_cluster[clave][tech]
+            usados_pci |= allocator.get_cluster_assigned_bitmap(cluster, "700")
+            libres_pci = allocator.get_unused_pci_bitmap(
+                vendor, "700", usados_pci, min_pci
+            )
+            # El RSI de 5G no sale del maestro PCI sino del maestro RSI 5G
+            if tech == "5G":
+                usados_rsi = rsi_5g.usados_cluster(cluster)
+            libres_rsi = allocator.get_unused_rsi_bitmap(
+                vendor, "700", usados_rsi, min_rsi
+            )
+
+            if tech == "4G":
+                ap_list = sugerir_consecutivos_mod3(libres_pci, n_celdas, min_pci)
+                residuos[str(tac_item)] = [
+                    p % 3 if isinstance(p, int) else None for p in ap_list[:n_celdas]
+                ]
+            else:
+                # Se coordina con las celdas 4G del mismo TAC (o del primero)
+                coord = residuos.get(str(tac_item)) or next(iter(residuos.values()), [])
+                ap_list = (
+                    coordinar_mod3(libres_pci, coord)
+                    if coord
+                    else sugerir_consecutivos_mod3(libres_pci, n_celdas, min_pci)
+                )
+            ar_list = sugerir_rsi_con_sep(libres_rsi, n_celdas, vendor, "700")
+
+            allocator.register_assigned(
+                cluster,
+                [p for p in ap_list if isinstance(p, int)],
+                tac_item,
+                vendor,
+                "700",
+            )
+            resumen, detalle = _filas_resultado(
+                sc_upper,
+                site,
+                tech,
+                "700",
+                "700",
+                n_celdas,
+                tac_item,
+                vecinos,
+                ap_list,
+                ar_list,
+            )
+            salida[tech][0].append(resumen)
+            salida[tech][1].extend(detalle)
+    return salida["4G"] + salida["5G"]
+
+
+def planificar_lnr700_lote(
+    sitios: Iterable[Tuple[str, int]],
+    df_pci_master: pd.DataFrame,
+    df_rsi_5g_master: pd.DataFrame,
+    tac_a_vecinos: dict,
+    min_pci: int,
+    min_rsi: int,
+    modo_r: bool,
+    indice: Optional[IndiceMaestro] = None,
+    allocator: Optional[ClusterAllocator] = None,
+    estado=None,
+) -> Iterator[Tuple[list, list, list, list]]:
+    """
+    Planifica 4G y 5G de 700 para varios (site, n_celdas) y va devolviendo
+    (res4, det4, res5, det5) de cada uno en orden. Los usados de ambas
+    tecnologías se leen una sola vez por cluster para todo el lote y cada
+    PCI 5G es el primer libre con el residuo mod 3 de su celda 4G; sus
+    RSIs evitan los del maestro RSI 5G en el cluster. Sin un
+    `allocator` compartido cada site se planifica sobre uno nuevo (con las
+    reservas de `estado`, si lo hay).
+    """
+    usados_por_cluster: dict = {}
+    # El maestro RSI 5G solo se lee si algún site tiene celdas 5G
+    rsi_5g = Diferido("indice_rsi_5g", lambda: indice_rsi_5g(df_rsi_5g_master))
+    for site, n_celdas in sitios:
+        yield _planificar_lnr700_site(
+            site,
+            n_celdas,
+            df_pci_master,
+            tac_a_vecinos,
+            min_pci,
+            min_rsi,
+            indice,
+            allocator if allocator is not None else ClusterAllocator(estado),
+            usados_por_cluster,
+            rsi_5g,
+        )
+
+
 def planificar_lnr700(
     site: str,
     n_celdas: int,
@@ -461,42 +1161,257 @@ def planificar_lnr700(
     min_rsi: int,
     modo_r: bool,
     manual_cache: dict,
+    indice: Optional[IndiceMaestro] = None,
+    allocator: Optional[ClusterAllocator] = None,
 ) -> Tuple[list, list, list, list]:
-    allocator = ClusterAllocator()
-    res4, det4 = sugerir_pci_rsi(
-        site,
-        site,
-        "4G",
-        "700",
-        n_celdas,
-        df_pci_master,
-        df_rsi_5g_master,
-        tac_a_vecinos,
-        min_pci,
-        min_rsi,
-        modo_r,
-        allocator,
+    return next(
+        planificar_lnr700_lote(
+            [(site, n_celdas)],
+            df_pci_master,
+            df_rsi_5g_master,
+            tac_a_vecinos,
+            min_pci,
+            min_rsi,
+            modo_r,
+            indice,
+            allocator,
+        )
     )
-    coord = [
-        d.get("PCI sugerido") % 3 if isinstance(d.get("PCI sugerido"), int) else None
-        for d in det4
-    ]
-    res5, det5 = sugerir_pci_rsi(
-        site,
-        site,
-        "5G",
-        "700",
-        n_celdas,
+
+
+def planificar_grupo(
+    site: str,
+    band: str,
+    tech: str,
+    df_pci_master: pd.DataFrame,
+    df_rsi_5g_master: pd.DataFrame,
+    tac_a_vecinos: dict,
+    modo_r: bool,
+    indice: Optional[IndiceMaestro] = None,
+    allocator: Optional[ClusterAllocator] = None,
+    pcis_por_grupo: Optional[dict] = None,
+    estado=None,
+    min_pci: int = 0,
+    min_rsi: int = 0,
+) -> Tuple[list, list]:
+    """
+    Planifica un grupo (site, banda) del modo masivo. `pcis_por_grupo`
+    ({(site, banda): {TAC: [PCIs]}}) fija los PCIs ya optimizados y
+    `estado` aporta las reservas persistentes de ejecuciones anteriores.
+    """
+    t0 = time.perf_counter()
+    if allocator is None and estado is not None:
+        allocator = ClusterAllocator(estado)
+    n_celdas = detectar_numero_sectores(site, df_pci_master, indice)
+    if band == "700":
+        r4, d4, r5, d5 = planificar_lnr700(
+            site,
+            n_celdas,
+            df_pci_master,
+            df_rsi_5g_master,
+            tac_a_vecinos,
+            min_pci,
+            min_rsi,
+            modo_r,
+            {},
+            indice,
+            allocator,
+        )
+        resultado = (r4 + r5, d4 + d5)
+    else:
+        resultado = sugerir_pci_rsi(
+            site,
+            site,
+            tech,
+            band,
+            n_celdas,
+            df_pci_master,
+            df_rsi_5g_master,
+            tac_a_vecinos,
+            min_pci,
+            min_rsi,
+            modo_r,
+            allocator,
+            indice=indice,
+            pcis_fijos=(pcis_por_grupo or {}).get((site, band)),
+        )
+    muestra("masivo.latencia_grupo_ms", (time.perf_counter() - t0) * 1000)
+    return resultado
+
+
+def _planificar_racha_700(
+    sites: list,
+    df_pci_master: pd.DataFrame,
+    df_rsi_5g_master: pd.DataFrame,
+    tac_a_vecinos: dict,
+    modo_r: bool,
+    indice: Optional[IndiceMaestro] = None,
+    allocator: Optional[ClusterAllocator] = None,
+    pcis_por_grupo: Optional[dict] = None,
+    estado=None,
+    min_pci: int = 0,
+    min_rsi: int = 0,
+):
+    # Lo mismo que planificar_grupo sobre cada site de 700, en un solo lote
+    sitios = (
+        (site, detectar_numero_sectores(site, df_pci_master, indice)) for site in sites
+    )
+    t0 = time.perf_counter()
+    for r4, d4, r5, d5 in planificar_lnr700_lote(
+        sitios,
         df_pci_master,
         df_rsi_5g_master,
         tac_a_vecinos,
         min_pci,
         min_rsi,
         modo_r,
+        indice,
         allocator,
-        coord,
+        estado,
+    ):
+        muestra("masivo.latencia_grupo_ms", (time.perf_counter() - t0) * 1000)
+        yield r4 + r5, d4 + d5
+        t0 = time.perf_counter()
+
+
+def _planificar_en_orden(grupos: list, contexto: dict):
+    """
+    planificar_grupo sobre cada grupo, salvo las rachas de grupos de 700
+    seguidos, que se planifican juntas con planificar_lnr700_lote.
+    """
+    for es_700, racha in groupby(grupos, key=lambda g: g[1] == "700"):
+        if es_700:
+            yield from _planificar_racha_700([site for site, _, _ in racha], **contexto)
+        else:
+            for site, band, tech in racha:
+                yield planificar_grupo(site, band, tech, **contexto)
+
+
+def componentes_tac(
+    grupos: list, indice: IndiceMaestro, tac_a_vecinos: dict
+) -> List[list]:
+    """
+    Reparte los grupos (site, banda, tech) en componentes conexas del grafo
+    de TAC vecinos: dos grupos caen en la misma componente si los clusters
+    de sus TAC se solapan. Cada componente conserva el orden de `grupos`.
+    """
+    padre: Dict[str, str] = {}
+
+    def raiz(x: str) -> str:
+        padre.setdefault(x, x)
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    def unir(a: str, b: str):
+        padre[raiz(a)] = raiz(b)
+
+    tacs_grupo: List[Optional[str]] = []
+    for site, _, _ in grupos:
+        df_site = indice.filas_site(site.strip().upper())
+        tacs = [str(t) for t in df_site.get("TAC", pd.Series(dtype=object)).dropna()]
+        for tac in tacs:
+            for vecino in cluster_tac(tac_a_vecinos, tac):
+                unir(tac, vecino)
+            unir(tac, tacs[0])
+        tacs_grupo.append(tacs[0] if tacs else None)
+
+    componentes: Dict[object, list] = {}
+    for i, (grupo, tac_grupo) in enumerate(zip(grupos, tacs_grupo)):
+        clave = raiz(tac_grupo) if tac_grupo is not None else ("sin_tac", i)
+        componentes.setdefault(clave, []).append(grupo)
+    return list(componentes.values())
+
+
+_CONTEXTO_MASIVO: dict = {}
+
+
+def _iniciar_worker_masivo(contexto: dict, perfil_activo: bool):
+    # Con fork el contexto se hereda sin copiar (copy-on-write)
+    _CONTEXTO_MASIVO.update(contexto)
+    PERFIL.reset()
+    PERFIL.activo = perfil_activo
+
+
+def _planificar_componente(componente: list) -> Tuple[list, dict]:
+    resultados = [
+        ((site, band), resultado)
+        for (site, band, _), resultado in zip(
+            componente, _planificar_en_orden(componente, _CONTEXTO_MASIVO)
+        )
+    ]
+    perfil = PERFIL.exportar()
+    PERFIL.reset()
+    return resultados, perfil
+
+
+def planificar_grupos(
+    grupos: list,
+    df_pci_master: pd.DataFrame,
+    df_rsi_5g_master: pd.DataFrame,
+    tac_a_vecinos: dict,
+    modo_r: bool,
+    indice: IndiceMaestro,
+    workers: int = 1,
+    allocator: Optional[ClusterAllocator] = None,
+    pcis_por_grupo: Optional[dict] = None,
+    estado=None,
+    min_pci: int = 0,
+    min_rsi: int = 0,
+):
+    """
+    Planifica los grupos (site, banda, tech) y devuelve sus resultados en
+    el mismo orden. Con workers > 1 reparte las componentes de TAC
+    independientes en un pool de procesos. Un `allocator` compartido por
+    todo el lote, o un `estado` persistente (cuyas reservas se hacen en
+    este proceso), obligan a planificar en secuencia.
+    """
+    contexto = dict(
+        df_pci_master=df_pci_master,
+        df_rsi_5g_master=preparar_rsi_5g(df_rsi_5g_master),
+        tac_a_vecinos=tac_a_vecinos,
+        modo_r=modo_r,
+        indice=indice,
+        pcis_por_grupo=pcis_por_grupo,
+        min_pci=min_pci,
+        min_rsi=min_rsi,
     )
-    return res4, det4, res5, det5
+    if allocator is not None:
+        contexto["allocator"] = allocator
+        workers = 1
+    if estado is not None:
+        contexto["estado"] = estado
+        workers = 1
+    if workers <= 1 or len(grupos) <= 1:
+        yield from _planificar_en_orden(grupos, contexto)
+        return
+
+    componentes = componentes_tac(grupos, indice, tac_a_vecinos)
+    if any(b == "700" or agrupar_tech(t) == "5G" for _, b, t in grupos):
+        # Se carga e indexa aquí para que los workers lo hereden con el fork
+        contexto["df_rsi_5g_master"] = indice_rsi_5g(contexto["df_rsi_5g_master"])
+    metodos = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in metodos else None)
+    resultados: Dict[Tuple[str, str], Tuple[list, list]] = {}
+    pendientes = ((site, band) for site, band, _ in grupos)
+    siguiente = next(pendientes, None)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_iniciar_worker_masivo,
+        initargs=(contexto, PERFIL.activo),
+    ) as pool:
+        trozo = max(1, len(componentes) // (workers * 4))
+        for parcial, perfil in pool.map(
+            _planificar_componente, componentes, chunksize=trozo
+        ):
+            resultados.update(parcial)
+            PERFIL.fusionar(perfil)
+            # Se entrega en orden lo ya disponible para no retenerlo en memoria
+            while siguiente in resultados:
+                yield resultados.pop(siguiente)
+                siguiente = next(pendientes, None)
 
 
 def masivo_OSP_VDF(
@@ -508,73 +1423,106 @@ def masivo_OSP_VDF(
     df_pci_master: pd.DataFrame,
     df_rsi_5g_master: pd.DataFrame,
     tac_a_vecinos: dict,
+    indice: Optional[IndiceMaestro] = None,
+    workers: int = 1,
+    formatos_extra: Sequence[str] = (),
+    max_vista: int = 20,
+    optimizar: bool = False,
+    presupuesto_s: float = 10.0,
+    estado=None,
 ) -> None:
-    df_req = pd.read_csv(
-        ensure_csv(entrada_osp),
-        dtype=str,
-        sep=detect_separator(entrada_osp),
-        encoding="utf-8",
-        error_bad_lines=False,
-    )
-    df_req = map_peticion_columns(df_req)
-    df_req["BAND_CLEAN"] = df_req.apply(
-        lambda r: normaliza_banda(r.get("BAND", ""), r.get("TECH", "")), axis=1
-    )
-    resumen_all, detalle_all = [], []
-    for (site, band), group in df_req.groupby(["SITE", "BAND_CLEAN"]):
-        n_celdas = detectar_numero_sectores(site, df_pci_master)
-        if band == "700":
-            r4, d4, r5, d5 = planificar_lnr700(
-                site,
-                n_celdas,
-                df_pci_master,
-                df_rsi_5g_master,
-                tac_a_vecinos,
-                0,
-                0,
-                modo_r,
-                {},
-            )
-            resumen_all.extend(r4 + r5)
-            detalle_all.extend(d4 + d5)
-        else:
-            tech = group["TECH"].iloc[0]
-            r, d = sugerir_pci_rsi(
-                site,
-                site,
-                tech,
-                band,
-                n_celdas,
+    """
+    Planifica las peticiones de `entrada_osp` y escribe resumen y detalle
+    grupo a grupo en los CSV de salida (y en `formatos_extra`: parquet,
+    xlsx). Por consola solo se muestran las primeras `max_vista` filas.
+    Con `optimizar`, los PCIs del lote se asignan antes de forma conjunta
+    (coloreado DSATUR con `presupuesto_s` segundos). Con un `estado`
+    (EstadoAllocator) se respetan y amplían las reservas persistentes; el
+    llamador decide cuándo confirmarlas.
+    """
+    if indice is None:
+        indice = IndiceMaestro(df_pci_master)
+    df_rsi_5g_master = preparar_rsi_5g(df_rsi_5g_master)
+    grupos = grupos_peticiones(leer_peticiones(entrada_osp))
+    contar("masivo.grupos", len(grupos))
+    pcis_por_grupo = None
+    if optimizar:
+        # Import diferido: optimizador depende de este módulo
+        from pci_rsi_sugeridor.optimizador import optimizar_pcis
+
+        with cronometro("masivo.optimizador"):
+            pcis_por_grupo, stats = optimizar_pcis(
+                grupos,
                 df_pci_master,
-                df_rsi_5g_master,
                 tac_a_vecinos,
-                0,
-                0,
-                modo_r,
+                indice,
+                presupuesto_s,
+                estado=estado,
             )
+        print(
+            f"Optimizador PCI: {stats['completas_optimizador']}/{stats['peticiones']}"
+            f" peticiones con PCIs completos (greedy: {stats['completas_greedy']})"
+        )
+    with cronometro("masivo.planificacion"), SalidaMasiva(
+        salida_resumen, salida_detalle, formatos_extra, max_vista
+    ) as salida:
+        for r, d in planificar_grupos(
+            grupos,
+            df_pci_master,
+            df_rsi_5g_master,
+            tac_a_vecinos,
+            modo_r,
+            indice,
+            workers,
+            pcis_por_grupo=pcis_por_grupo,
+            estado=estado,
+        ):
+            with cronometro("masivo.escritura"):
+                salida.añadir(r, d)
+    with cronometro("masivo.vista_previa"):
+        salida.imprimir_vista()
+
+
+def planificar_lote(
+    df_req: pd.DataFrame,
+    df_pci_master: pd.DataFrame,
+    df_rsi_5g_master: pd.DataFrame,
+    tac_a_vecinos: dict,
+    modo_r: bool = False,
+    indice: Optional[IndiceMaestro] = None,
+    workers: int = 1,
+    allocator: Optional[ClusterAllocator] = None,
+    min_pci: int = 0,
+    min_rsi: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Planifica un lote de peticiones (DataFrame con SITE, TECH y BAND) sin
+    ficheros intermedios y devuelve los DataFrames (resumen, detalle).
+    El índice del maestro se construye una sola vez para todo el lote y
+    los usados de cada cluster se memorizan entre peticiones. Con un
+    `allocator` las asignaciones se acumulan a lo largo del lote.
+    """
+    if indice is None:
+        indice = IndiceMaestro(df_pci_master)
+    df_rsi_5g_master = preparar_rsi_5g(df_rsi_5g_master)
+    if "BAND_CLEAN" not in df_req:
+        df_req = normalizar_peticiones(df_req.copy())
+    grupos = grupos_peticiones(df_req)
+    contar("lote.grupos", len(grupos))
+    resumen_all, detalle_all = [], []
+    with cronometro("lote.planificacion"):
+        for r, d in planificar_grupos(
+            grupos,
+            df_pci_master,
+            df_rsi_5g_master,
+            tac_a_vecinos,
+            modo_r,
+            indice,
+            workers,
+            allocator,
+            min_pci=min_pci,
+            min_rsi=min_rsi,
+        ):
             resumen_all.extend(r)
             detalle_all.extend(d)
-    pd.DataFrame(resumen_all).to_csv(
-        salida_resumen, index=False, sep=";", encoding="utf-8-sig"
-    )
-    pd.DataFrame(detalle_all).to_csv(
-        salida_detalle, index=False, sep=";", encoding="utf-8-sig"
-    )
-    print("Resumen masivo generado:")
-    print(
-        tabulate.tabulate(
-            pd.DataFrame(resumen_all),
-            headers="keys",
-            tablefmt="github",
-            showindex=False,
-        )
-    )
-    print("\nDetalle masivo generado:")
-    print(
-        tabulate.tabulate(
-            pd.DataFrame(detalle_all),
-            headers="keys",
-            tablefmt="github",
-            showindex=False,
-        )
-    )
+    return pd.DataFrame(resumen_all), pd.DataFrame(detalle_all)
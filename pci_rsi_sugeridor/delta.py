@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# delta.py: Actualización incremental del maestro PCI/RSI desde un export nuevo
+#
+# Cada fila se identifica por (SITE, CELLNAME, nº de aparición) y se compara
+# por un hash de sus columnas originales. Solo las filas añadidas o
+# modificadas pasan por el preprocesado, y el índice se recalcula solo para
+# los TAC y sites tocados.
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pci_rsi_sugeridor.core import (
+    COLUMNAS_DERIVADAS,
+    IndiceMaestro,
+    compactar_maestro,
+    leer_maestro_pci,
+    preprocesar_maestro_pci,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ResultadoDelta:
+    """Filas añadidas/eliminadas/modificadas y TAC y sites afectados."""
+
+    def __init__(
+        self,
+        añadidas: int = 0,
+        eliminadas: int = 0,
+        modificadas: int = 0,
+        tacs: Optional[set] = None,
+        sites: Optional[set] = None,
+        completo: bool = False,
+    ):
+        self.añadidas = añadidas
+        self.eliminadas = eliminadas
+        self.modificadas = modificadas
+        self.tacs = tacs if tacs is not None else set()
+        self.sites = sites if sites is not None else set()
+        # True si no se pudo comparar fila a fila y se reprocesó todo
+        self.completo = completo
+
+    @property
+    def vacio(self) -> bool:
+        return not (
+            self.completo or self.añadidas or self.eliminadas or self.modificadas
+        )
+
+    def clusters_tocados(self, tac_a_vecinos: dict) -> set:
+        """TAC cuyo cluster (el propio TAC y sus vecinos) incluye un TAC tocado."""
+        tocados = {str(t) for t in self.tacs}
+        return tocados | {
+            tac
+            for tac, vecinos in tac_a_vecinos.items()
+            if tocados.intersection(vecinos)
+        }
+
+    def resumen(self) -> dict:
+        return {
+            "añadidas": self.añadidas,
+            "eliminadas": self.eliminadas,
+            "modificadas": self.modificadas,
+            "tacs_tocados": sorted(str(t) for t in self.tacs),
+            "sites_tocados": len(self.sites),
+            "completo": self.completo,
+        }
+
+
+def claves_fila(df: pd.DataFrame) -> np.ndarray:
+    """Clave SITE|CELLNAME|n de cada fila (n distingue celdas repetidas)."""
+    site = df["SITE"].astype(str).str.strip().str.upper()
+    celda = df["CELLNAME"].astype(str).str.strip().str.upper()
+    base = site + "|" + celda
+    return (base + "|" + base.groupby(base).cumcount().astype(str)).to_numpy()
+
+
+def huellas_filas(df: pd.DataFrame, columnas: list) -> np.ndarray:
+    """
+    Hash de las columnas originales de cada fila, comparadas como texto.
+    Los nulos se igualan antes (NaN del export, <NA> del maestro compacto).
+    """
+    valores = df[columnas].astype(object)
+    texto = valores.where(valores.notna(), "").astype(str)
+    return pd.util.hash_pandas_object(texto, index=False).to_numpy()
+
+
+def _comparar(df_prev: pd.DataFrame, df_crudo: pd.DataFrame, columnas: list):
+    prev = pd.DataFrame(
+        {
+            "clave": claves_fila(df_prev),
+            "h_prev": huellas_filas(df_prev, columnas),
+            "pos_prev": np.arange(len(df_prev)),
+        }
+    )
+    nuevo = pd.DataFrame(
+        {
+            "clave": claves_fila(df_crudo),
+            "h_nuevo": huellas_filas(df_crudo, columnas),
+            "pos_nuevo": np.arange(len(df_crudo)),
+        }
+    )
+    cruce = prev.merge(nuevo, on="clave", how="outer")
+    eliminadas = cruce["pos_nuevo"].isna()
+    añadidas = cruce["pos_prev"].isna()
+    modificadas = ~eliminadas & ~añadidas & (cruce["h_prev"] != cruce["h_nuevo"])
+    return cruce, añadidas, eliminadas, modificadas
+
+
+def _reprocesado_completo(df_crudo: pd.DataFrame, indice, motivo: str):
+    logger.info("Delta no aplicable (%s): se reprocesa el maestro completo.", motivo)
+    df = preprocesar_maestro_pci(df_crudo)
+    if indice is not None:
+        indice.actualizar(df)
+    return df, ResultadoDelta(añadidas=len(df), completo=True)
+
+
+def aplicar_delta(
+    df_prev: pd.DataFrame,
+    csv_nuevo: str,
+    indice: Optional[IndiceMaestro] = None,
+) -> Tuple[pd.DataFrame, ResultadoDelta]:
+    """
+    Actualiza el maestro preprocesado `df_prev` con el export `csv_nuevo`.
+    Devuelve el maestro nuevo (mismo orden de filas que una carga completa)
+    y el ResultadoDelta. Si se pasa `indice`, se actualiza en el sitio.
+    """
+    df_crudo = leer_maestro_pci(csv_nuevo)
+    columnas = list(df_crudo.columns)
+    if "CELLNAME" not in columnas:
+        return _reprocesado_completo(df_crudo, indice, "sin columna CELLNAME")
+    originales = set(df_prev.columns).difference(COLUMNAS_DERIVADAS)
+    if df_prev.empty or set(columnas) != originales:
+        return _reprocesado_completo(df_crudo, indice, "columnas distintas")
+
+    cruce, añadidas, eliminadas, modificadas = _comparar(df_prev, df_crudo, columnas)
+    resultado = ResultadoDelta(
+        int(añadidas.sum()), int(eliminadas.sum()), int(modificadas.sum())
+    )
+    if resultado.vacio:
+        return df_prev, resultado
+
+    salen = cruce.loc[eliminadas | modificadas, "pos_prev"].astype(int).to_numpy()
+    entran = cruce.loc[añadidas | modificadas, "pos_nuevo"].astype(int).to_numpy()
+    iguales = cruce[~(añadidas | eliminadas | modificadas)]
+
+    nuevas = preprocesar_maestro_pci(df_crudo.iloc[entran].copy())
+    conservadas = df_prev.iloc[iguales["pos_prev"].astype(int).to_numpy()]
+    df = pd.concat([conservadas, nuevas.reindex(columns=df_prev.columns)])
+    # Se recupera el orden del export nuevo
+    orden = np.concatenate([iguales["pos_nuevo"].astype(int).to_numpy(), entran])
+    df = df.iloc[np.argsort(orden, kind="stable")].reset_index(drop=True)
+    if any(isinstance(t, pd.CategoricalDtype) for t in df_prev.dtypes):
+        df = compactar_maestro(df)
+
+    for filas in (df_prev.iloc[salen], nuevas):
+        if "TAC" in filas:
+            resultado.tacs.update(filas["TAC"].dropna())
+        resultado.sites.update(filas["SITE_CLEAN"].dropna())
+    if indice is not None:
+        indice.actualizar(df, resultado.tacs, resultado.sites)
+    logger.info(
+        "Delta aplicado: %d añadidas, %d eliminadas, %d modificadas, %d TAC tocados.",
+        resultado.añadidas,
+        resultado.eliminadas,
+        resultado.modificadas,
+        len(resultado.tacs),
+    )
+    return df, resultado
+
+
+def actualizar_tac_rsi_5g(
+    df_rsi_5g: pd.DataFrame, df_pci_master: pd.DataFrame, sites: set
+) -> pd.DataFrame:
+    """Vuelve a asignar el TAC de los sites tocados en el maestro RSI 5G."""
+    if df_rsi_5g.empty or not sites:
+        return df_rsi_5g
+    mask = df_rsi_5g["SITE_CLEAN"].isin(sites)
+    if not mask.any():
+        return df_rsi_5g
+    filas = df_pci_master[df_pci_master["SITE_CLEAN"].isin(sites)]
+    tac_por_site = filas.drop_duplicates("SITE_CLEAN").set_index("SITE_CLEAN")["TAC"]
+    df_rsi_5g = df_rsi_5g.copy()
+    df_rsi_5g.loc[mask, "TAC"] = (
+        df_rsi_5g.loc[mask, "SITE_CLEAN"].map(tac_por_site).astype(object)
+    )
+    return df_rsi_5g
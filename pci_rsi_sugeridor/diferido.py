@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# diferido.py: Datos de entrada que se leen en el primer acceso
+#
+# Un Diferido envuelve la función que carga un maestro. Mientras nadie lo
+# use, el fichero no se toca; el primer acceso lo carga y lo memoriza.
+
+
+class Diferido:
+    """Dato cargado en el primer acceso; delega atributos, len e indexado."""
+
+    __slots__ = ("nombre", "_cargador", "_valor", "_cargado")
+
+    def __init__(self, nombre: str, cargador):
+        self.nombre = nombre
+        self._cargador = cargador
+        self._valor = None
+        self._cargado = False
+
+    @property
+    def cargado(self) -> bool:
+        return self._cargado
+
+    def cargar(self):
+        """Devuelve el dato, leyéndolo la primera vez."""
+        if not self._cargado:
+            self._valor = self._cargador()
+            self._cargado = True
+            self._cargador = None
+        return self._valor
+
+    def __getattr__(self, attr):
+        return getattr(self.cargar(), attr)
+
+    def __len__(self) -> int:
+        return len(self.cargar())
+
+    def __getitem__(self, clave):
+        return self.cargar()[clave]
+
+    def __iter__(self):
+        return iter(self.cargar())
+
+    def __contains__(self, clave) -> bool:
+        return clave in self.cargar()
+
+    def __reduce__(self):
+        # A otro proceso se envía el dato ya cargado, no el cargador
+        return (_identidad, (self.cargar(),))
+
+    def __repr__(self) -> str:
+        estado = "cargado" if self._cargado else "sin cargar"
+        return f"Diferido({self.nombre!r}, {estado})"
+
+
+def _identidad(valor):
+    return valor
+
+
+def materializar(dato):
+    """El dato de un Diferido (cargándolo si hace falta) o `dato` tal cual."""
+    return dato.cargar() if isinstance(dato, Diferido) else dato
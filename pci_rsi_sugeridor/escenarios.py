@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# escenarios.py: Comparación de lotes alternativos ("what-if") en un solo proceso
+#
+# Cada escenario (lote de peticiones + política de min_pci/min_rsi) se
+# planifica sobre un fork copy-on-write del allocator base, de modo que
+# todos parten del mismo estado sin copiarlo. Maestro e índice se
+# comparten tal cual: la planificación no los modifica.
+
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from pci_rsi_sugeridor.auditoria import auditar_maestro
+from pci_rsi_sugeridor.core import (
+    ClusterAllocator,
+    IndiceMaestro,
+    agrupar_tech,
+    planificar_lote,
+    preparar_rsi_5g,
+)
+from pci_rsi_sugeridor.grafo_tac import cluster_tac
+from pci_rsi_sugeridor.perf import cronometro
+
+TIPOS_CONFLICTO = ["PCI_COLISION", "PCI_MOD3", "RSI_SOLAPE"]
+
+
+class Escenario:
+    """Lote de peticiones y política de mínimos a comparar con otros."""
+
+    def __init__(
+        self, nombre: str, df_req: pd.DataFrame, min_pci: int = 0, min_rsi: int = 0
+    ):
+        self.nombre = nombre
+        self.df_req = df_req
+        self.min_pci = min_pci
+        self.min_rsi = min_rsi
+
+
+def planificar_escenarios(
+    escenarios: List[Escenario],
+    df_pci_master: pd.DataFrame,
+    df_rsi_5g_master: pd.DataFrame,
+    tac_a_vecinos: dict,
+    modo_r: bool = False,
+    indice: Optional[IndiceMaestro] = None,
+    base: Optional[ClusterAllocator] = None,
+) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame, float]]:
+    """
+    Planifica cada escenario sobre un fork de `base` y devuelve
+    {nombre: (df_resumen, df_detalle, segundos)}.
+    """
+    if indice is None:
+        indice = IndiceMaestro(df_pci_master)
+    if base is None:
+        base = ClusterAllocator()
+    df_rsi_5g_master = preparar_rsi_5g(df_rsi_5g_master)
+    resultados = {}
+    for esc in escenarios:
+        t0 = time.perf_counter()
+        with cronometro("escenarios.planificacion"):
+            res, det = planificar_lote(
+                esc.df_req,
+                df_pci_master,
+                df_rsi_5g_master,
+                tac_a_vecinos,
+                modo_r,
+                indice,
+                allocator=base.fork(),
+                min_pci=esc.min_pci,
+                min_rsi=esc.min_rsi,
+            )
+        resultados[esc.nombre] = (res, det, time.perf_counter() - t0)
+    return resultados
+
+
+def _celdas_planificadas(df_resumen: pd.DataFrame) -> pd.DataFrame:
+    """Celdas (una por PCI/RSI sugerido) con las columnas del maestro."""
+    filas = []
+    for r in df_resumen.to_dict("records"):
+        tech, _, banda = str(r["Tecnología"]).rpartition("_")
+        pcis = [p for p in str(r.get("pci's", "")).split(";") if p]
+        rsis = [x for x in str(r.get("rsi's", "")).split(";") if x]
+        for i in range(max(len(pcis), len(rsis))):
+            filas.append(
+                {
+                    "SITE_CLEAN": r["Elemento"],
+                    "CELLNAME": f"{r['Elemento']}:{r['Tecnología']}:{i + 1}",
+                    "TAC": str(r["TAC"]),
+                    "BAND_CLEAN": banda,
+                    "TECH_GROUP": agrupar_tech(tech),
+                    "BCCH/SC/PCI": pcis[i] if i < len(pcis) else None,
+                    "RSQID": rsis[i] if i < len(rsis) else None,
+                }
+            )
+    return pd.DataFrame(filas)
+
+
+def conflictos_planificacion(
+    df_resumen: pd.DataFrame, df_pci_master: pd.DataFrame, tac_a_vecinos
+) -> Dict[str, int]:
+    """
+    Conflictos (tipos de auditar_maestro) en los que entra alguna celda
+    planificada, auditando solo los clusters que toca el lote.
+    """
+    nuevas = _celdas_planificadas(df_resumen) if not df_resumen.empty else None
+    if nuevas is None or nuevas.empty:
+        return {t: 0 for t in TIPOS_CONFLICTO}
+    tacs: Set[str] = set()
+    for tac in nuevas["TAC"].unique():
+        tacs.update(cluster_tac(tac_a_vecinos, tac))
+    vecindad = df_pci_master[
+        df_pci_master["TAC"].astype(str).isin(tacs)
+        & df_pci_master["BAND_CLEAN"].isin(nuevas["BAND_CLEAN"].unique())
+    ]
+    columnas = list(nuevas.columns)
+    muestra = pd.concat([vecindad[columnas].astype(object), nuevas], ignore_index=True)
+    informe = auditar_maestro(muestra, tac_a_vecinos)
+    informe = informe[informe["CELLNAME"].isin(set(nuevas["CELLNAME"]))]
+    por_tipo = informe.groupby("TIPO")["CELLNAME"].nunique().to_dict()
+    return {t: int(por_tipo.get(t, 0)) for t in TIPOS_CONFLICTO}
+
+
+def comparar_escenarios(
+    resultados: Dict[str, Tuple[pd.DataFrame, pd.DataFrame, float]],
+    df_pci_master: pd.DataFrame,
+    tac_a_vecinos,
+) -> pd.DataFrame:
+    """Métricas por escenario (una columna por escenario, lado a lado)."""
+    columnas = {}
+    for nombre, (res, det, segundos) in resultados.items():
+        celdas = len(det)
+        pcis = int((det["PCI sugerido"] != "").sum()) if celdas else 0
+        rsis = int((det["RSI sugerido"] != "").sum()) if celdas else 0
+        columnas[nombre] = {
+            "CELDAS": celdas,
+            "PCI_ASIGNADOS": pcis,
+            "RELLENO_PCI_%": round(100 * pcis / celdas, 1) if celdas else 0.0,
+            "RSI_ASIGNADOS": rsis,
+            "RELLENO_RSI_%": round(100 * rsis / celdas, 1) if celdas else 0.0,
+            **conflictos_planificacion(res, df_pci_master, tac_a_vecinos),
+            "SEGUNDOS": round(segundos, 2),
+        }
+    comparacion = pd.DataFrame(columnas)
+    comparacion.index.name = "METRICA"
+    return comparacion
+
+
+def escribir_comparacion(comparacion: pd.DataFrame, path: str):
+    """CSV con separador ';' y BOM, como el resto de salidas."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    comparacion.to_csv(path, sep=";", encoding="utf-8-sig")
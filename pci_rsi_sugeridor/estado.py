@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# estado.py: Reservas de PCI persistentes entre ejecuciones
+#
+# Las reservas (TAC, vendor, banda) -> PCIs se guardan en un fichero binario
+# compacto (un registro de tamaño fijo más la clave por reserva) que se lee
+# con mmap. Al confirmar se toma un fichero de bloqueo, se fusiona con lo
+# que otras ejecuciones hayan confirmado entretanto y el fichero se
+# sustituye de forma atómica con os.replace. Cada reserva caduca pasadas
+# `caducidad_h` horas desde la última vez que se reservó.
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pci_rsi_sugeridor.bitmaps import N_PCI, a_bitmap
+
+MAGIA = b"PCIR"
+VERSION_ESTADO = 1
+BYTES_PCI = (N_PCI + 7) // 8
+# Cabecera: magia, versión, nº de registros
+_CABECERA = struct.Struct("<4sHI")
+# Registro: caducidad (epoch), bitmap de PCIs, longitud de la clave
+_REGISTRO = struct.Struct(f"<d{BYTES_PCI}sH")
+
+logger = logging.getLogger(__name__)
+
+Clave = Tuple[str, str, str]
+
+
+def leer_estado(path: str) -> Dict[Clave, Tuple[int, float]]:
+    """Reservas {(TAC, vendor, banda): (bitmap, caducidad)} del fichero."""
+    reservas: Dict[Clave, Tuple[int, float]] = {}
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return reservas
+    with f:
+        if os.fstat(f.fileno()).st_size < _CABECERA.size:
+            return reservas
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magia, version, n = _CABECERA.unpack_from(mm, 0)
+            if magia != MAGIA or version != VERSION_ESTADO:
+                logger.warning("Estado %s con formato desconocido: se ignora.", path)
+                return reservas
+            pos = _CABECERA.size
+            for _ in range(n):
+                caduca, pcis, largo = _REGISTRO.unpack_from(mm, pos)
+                inicio, pos = pos + _REGISTRO.size, pos + _REGISTRO.size + largo
+                tac, vendor, banda = mm[inicio:pos].decode("utf-8").split("|")
+                reservas[(tac, vendor, banda)] = (
+                    int.from_bytes(pcis, "little"),
+                    caduca,
+                )
+    return reservas
+
+
+def escribir_estado(path: str, reservas: Dict[Clave, Tuple[int, float]]):
+    """Escribe las reservas en un temporal y lo sustituye de forma atómica."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CABECERA.pack(MAGIA, VERSION_ESTADO, len(reservas)))
+        for clave, (bm, caduca) in sorted(reservas.items()):
+            texto = "|".join(clave).encode("utf-8")
+            f.write(
+                _REGISTRO.pack(caduca, bm.to_bytes(BYTES_PCI, "little"), len(texto))
+            )
+            f.write(texto)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+@contextmanager
+def bloqueo(path: str, espera_s: float = 10.0, obsoleto_s: float = 60.0):
+    """Bloqueo entre procesos con un fichero `path`.lock creado en exclusiva."""
+    path_lock = path + ".lock"
+    limite = time.monotonic() + espera_s
+    while True:
+        try:
+            fd = os.open(path_lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                # Un bloqueo abandonado (proceso muerto) se retira
+                if time.time() - os.path.getmtime(path_lock) > obsoleto_s:
+                    os.remove(path_lock)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > limite:
+                raise TimeoutError(f"No se pudo bloquear {path}")
+            time.sleep(0.05)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(path_lock)
+        except FileNotFoundError:
+            pass
+
+
+def _coincide(clave: Clave, filtro: Tuple[Optional[str], ...]) -> bool:
+    return all(f is None or f == c for c, f in zip(clave, filtro))
+
+
+class EstadoAllocator:
+    """
+    Reservas de PCI persistentes por (TAC, vendor, banda). Las reservas y
+    liberaciones se acumulan en memoria y se llevan al fichero con
+    confirmar().
+    """
+
+    def __init__(self, path: str, caducidad_h: float = 24.0):
+        self.path = path
+        self.caducidad_s = caducidad_h * 3600
+        self._reservas: Dict[Clave, Tuple[int, float]] = {}
+        self._por_tac_banda: Dict[Tuple[str, str], int] = {}
+        self._pendientes: Dict[Clave, Tuple[int, float]] = {}
+        self._liberaciones: List[Tuple[Optional[str], ...]] = []
+        self.recargar()
+
+    def recargar(self):
+        """Vuelve a leer el fichero, descartando las reservas caducadas."""
+        self._reservas = self._vigentes(leer_estado(self.path))
+        for clave, (bm, caduca) in self._pendientes.items():
+            previo = self._reservas.get(clave, (0, 0.0))
+            self._reservas[clave] = (previo[0] | bm, max(previo[1], caduca))
+        self._reindexar()
+
+    @staticmethod
+    def _vigentes(reservas: dict) -> dict:
+        ahora = time.time()
+        return {k: v for k, v in reservas.items() if v[1] > ahora}
+
+    def _reindexar(self):
+        self._por_tac_banda = {}
+        for (tac, _, banda), (bm, _) in self._reservas.items():
+            clave = (tac, banda)
+            self._por_tac_banda[clave] = self._por_tac_banda.get(clave, 0) | bm
+
+    def __len__(self) -> int:
+        return len(self._reservas)
+
+    def huella(self) -> str:
+        """Hash de las reservas vigentes (sin su caducidad)."""
+        texto = ";".join(
+            f"{'|'.join(k)}={bm:x}" for k, (bm, _) in sorted(self._reservas.items())
+        )
+        return hashlib.blake2b(texto.encode(), digest_size=16).hexdigest()
+
+    def reservados(self, cluster: Iterable[str], banda: str) -> int:
+        """
+        Bitmap de PCIs reservados en la banda en cualquier TAC del cluster
+        (de cualquier vendor, como los usados del maestro).
+        """
+        bm = 0
+        for tac in cluster:
+            bm |= self._por_tac_banda.get((str(tac), banda), 0)
+        return bm
+
+    def reservar(self, tac, vendor: str, banda: str, pcis: Iterable):
+        """Reserva los PCIs (los "" se ignoran) y renueva su caducidad."""
+        bm = a_bitmap((p for p in pcis if isinstance(p, int)), N_PCI)
+        if not bm:
+            return
+        clave = (str(tac), vendor.upper(), banda)
+        caduca = time.time() + self.caducidad_s
+        for tabla in (self._reservas, self._pendientes):
+            previo = tabla.get(clave, (0, 0.0))
+            tabla[clave] = (previo[0] | bm, caduca)
+        indice = (clave[0], banda)
+        self._por_tac_banda[indice] = self._por_tac_banda.get(indice, 0) | bm
+
+    def liberar(
+        self,
+        tac: Optional[str] = None,
+        vendor: Optional[str] = None,
+        banda: Optional[str] = None,
+    ) -> int:
+        """Libera las reservas que coinciden con el filtro (None = cualquiera)."""
+        filtro = (
+            None if tac is None else str(tac),
+            None if vendor is None else vendor.upper(),
+            banda,
+        )
+        liberadas = [k for k in self._reservas if _coincide(k, filtro)]
+        for clave in liberadas:
+            del self._reservas[clave]
+            self._pendientes.pop(clave, None)
+        self._liberaciones.append(filtro)
+        self._reindexar()
+        return len(liberadas)
+
+    def confirmar(self):
+        """
+        Lleva reservas y liberaciones al fichero bajo bloqueo, fusionando con
+        lo confirmado por otras ejecuciones desde la última lectura.
+        """
+        with bloqueo(self.path):
+            reservas = self._vigentes(leer_estado(self.path))
+            for filtro in self._liberaciones:
+                reservas = {
+                    k: v for k, v in reservas.items() if not _coincide(k, filtro)
+                }
+            for clave, (bm, caduca) in self._pendientes.items():
+                previo = reservas.get(clave, (0, 0.0))
+                reservas[clave] = (previo[0] | bm, max(previo[1], caduca))
+            escribir_estado(self.path, reservas)
+        self._pendientes.clear()
+        self._liberaciones.clear()
+        self._reservas = reservas
+        self._reindexar()
+        logger.info("Estado del allocator guardado: %d reservas.", len(reservas))
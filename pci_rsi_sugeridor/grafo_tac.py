@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# grafo_tac.py: Grafo de TAC vecinos con clusters precalculados y caché en disco
+#
+# Sustituye al dict {tac: [vecinos]} de preprocesar_TACAreas (se usa igual:
+# .get, [], in, items...). El cluster de cada TAC (el TAC y sus vecinos) se
+# construye una sola vez como frozenset reutilizable, con el hash ya
+# calculado, y sirve tal cual de clave en el allocator y en los índices.
+
+import json
+import logging
+import os
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+from pci_rsi_sugeridor.cache import VERSION_CACHE, huella_fichero, huella_vigente
+
+SUFIJO_GRAFO = ".grafo.json"
+
+logger = logging.getLogger(__name__)
+
+
+class GrafoTAC(Mapping):
+    """Vecinos por TAC (como el dict original) más clusters internados."""
+
+    def __init__(self, tac_a_vecinos: dict):
+        self._vecinos: Dict[str, List[str]] = {
+            str(tac): sorted(str(v) for v in vecinos)
+            for tac, vecinos in tac_a_vecinos.items()
+        }
+        self._clusters: Dict[str, frozenset] = {
+            tac: self._crear_cluster(tac) for tac in self._vecinos
+        }
+
+    def __getitem__(self, tac) -> List[str]:
+        return self._vecinos[tac]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._vecinos)
+
+    def __len__(self) -> int:
+        return len(self._vecinos)
+
+    def _crear_cluster(self, tac: str) -> frozenset:
+        # frozenset cachea su hash tras el primer uso como clave
+        return frozenset([tac, *self._vecinos.get(tac, [])])
+
+    def cluster(self, tac) -> frozenset:
+        """Cluster del TAC, siempre el mismo objeto para el mismo TAC."""
+        tac = str(tac)
+        cluster = self._clusters.get(tac)
+        if cluster is None:
+            cluster = self._clusters[tac] = self._crear_cluster(tac)
+        return cluster
+
+
+def cluster_tac(tac_a_vecinos, tac) -> frozenset:
+    """Cluster (TAC y vecinos) de `tac` para un GrafoTAC o un dict de vecinos."""
+    if isinstance(tac_a_vecinos, GrafoTAC):
+        return tac_a_vecinos.cluster(tac)
+    return frozenset(tac_a_vecinos.get(str(tac), [])) | {str(tac)}
+
+
+def _leer_cache(xlsx_path: str) -> Optional[GrafoTAC]:
+    try:
+        with open(xlsx_path + SUFIJO_GRAFO, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if meta.get("version") != VERSION_CACHE or not huella_vigente(
+        xlsx_path, meta.get("huella", {})
+    ):
+        return None
+    return GrafoTAC(meta["vecinos"])
+
+
+def _escribir_cache(xlsx_path: str, grafo: GrafoTAC):
+    path_cache = xlsx_path + SUFIJO_GRAFO
+    meta = {
+        "version": VERSION_CACHE,
+        "huella": huella_fichero(xlsx_path),
+        "vecinos": dict(grafo.items()),
+    }
+    tmp = f"{path_cache}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path_cache)
+
+
+def cargar_grafo_tac(
+    xlsx_path: str = "TACAreas.xlsx",
+    usar_cache: bool = True,
+    reconstruir: bool = False,
+) -> GrafoTAC:
+    """
+    GrafoTAC del libro de TAC vecinos. Se cachea en un JSON contiguo al
+    libro, válido mientras la huella del libro no cambie.
+    """
+    if usar_cache and not reconstruir:
+        grafo = _leer_cache(xlsx_path)
+        if grafo is not None:
+            logger.debug("Caché vigente usada para %s", xlsx_path)
+            return grafo
+
+    # Import diferido: core usa cluster_tac de este módulo
+    from pci_rsi_sugeridor.core import preprocesar_TACAreas
+
+    grafo = GrafoTAC(preprocesar_TACAreas(xlsx_path))
+    if usar_cache and len(grafo) and os.path.exists(xlsx_path):
+        try:
+            _escribir_cache(xlsx_path, grafo)
+        except OSError as e:
+            logger.warning("No se pudo escribir la caché de %s: %s", xlsx_path, e)
+    return grafo
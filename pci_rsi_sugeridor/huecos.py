@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# huecos.py: Búsqueda de huecos libres sobre bitmaps de PCIs/RSIs
+#
+# Cada consulta se resuelve con unas pocas operaciones sobre el bitmap de
+# libres (desplazamientos y AND de int de Python) en vez de recorrer la
+# lista de candidatos comprobando `x in libres` uno a uno.
+
+from pci_rsi_sugeridor.bitmaps import N_PCI, a_bitmap
+
+
+def menor_bit(bm: int) -> int:
+    """Índice del bit activo más bajo, o -1 si el bitmap está vacío."""
+    return (bm & -bm).bit_length() - 1
+
+
+def mascara_residuo(residuo: int, modulo: int = 3, ancho: int = N_PCI) -> int:
+    """Bits v de [0, ancho) con v % modulo == residuo."""
+    return a_bitmap(range(residuo % modulo, ancho, modulo), ancho)
+
+
+_RESIDUOS_PCI = [mascara_residuo(r) for r in range(3)]
+
+
+def inicios_con_paso(libres: int, n: int, paso: int = 1) -> int:
+    """Inicios b tales que b, b+paso, ..., b+(n-1)*paso están libres, como bitmap."""
+    inicios = libres
+    for i in range(1, n):
+        inicios &= libres >> (i * paso)
+    return inicios
+
+
+def bases_validas(libres: int, n: int) -> int:
+    """Bases b (b % 3 == 0) con b..b+n-1 libres, como bitmap."""
+    return inicios_con_paso(libres, n) & _RESIDUOS_PCI[0]
+
+
+def primera_base_libre(libres: int, n: int) -> int:
+    """Primera base múltiplo de 3 con n PCIs consecutivos libres, o -1."""
+    return menor_bit(bases_validas(libres, n))
+
+
+def primer_libre_residuo(libres: int, residuo: int) -> int:
+    """Primer PCI libre con PCI % 3 == residuo, o -1."""
+    return menor_bit(libres & _RESIDUOS_PCI[residuo % 3])
+
+
+def primera_secuencia_libre(libres: int, n: int, sep: int) -> int:
+    """Primer inicio b con b + i*sep libre para i en [0, n), o -1."""
+    return menor_bit(inicios_con_paso(libres, n, sep))
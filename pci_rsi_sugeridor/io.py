@@ -1,28 +1,25 @@
 #!/usr/bin/env python3
 # io.py: Módulo de I/O y CLI
+#
+# pandas, el núcleo y los maestros se importan/cargan solo en los caminos
+# que los usan, para que --help y --version respondan al instante.
 
 import argparse
 import logging
 import os
 import sys
 from datetime import datetime
+from typing import Optional
 
-import pandas as pd
-from core import (
-    agrupar_tech,
-    cargar_y_preprocesar_pci,
-    cargar_y_preprocesar_rsi_5g,
-    detectar_numero_sectores,
-    ensure_csv,
-    masivo_OSP_VDF,
-    normaliza_banda,
-    planificar_lnr700,
-    preprocesar_TACAreas,
-    sugerir_pci_rsi,
-)
+from pci_rsi_sugeridor.diferido import Diferido
+from pci_rsi_sugeridor.salidas import FORMATOS_EXTRA
 
 VERSION = "3.9"
 
+MAESTRO_PCI = "am_cellinfo_etldb.csv"
+MAESTRO_RSI_5G = "gnodebfunctionmodule_nrducell.csv"
+TAC_AREAS = "TACAreas.xlsx"
+
 
 def setup_logging(verbose: bool):
     level = logging.DEBUG if verbose else logging.INFO
@@ -31,6 +28,130 @@ def setup_logging(verbose: bool):
     logging.getLogger("urllib3").setLevel(logging.WARNING)
 
 
+def _actualizador_delta(tac_vecinos: Diferido):
+    from pci_rsi_sugeridor.delta import aplicar_delta
+
+    def actualizar(df_prev):
+        df, delta = aplicar_delta(df_prev, MAESTRO_PCI)
+        clusters = delta.clusters_tocados(tac_vecinos)
+        logging.getLogger(__name__).info(
+            f"Delta del maestro: {len(delta.tacs)} TAC y "
+            f"{len(clusters)} clusters de TAC tocados."
+        )
+        return df
+
+    return actualizar
+
+
+def cargar_maestros(
+    usar_cache: bool = True,
+    reconstruir: bool = False,
+    compacto: bool = False,
+    sites: Optional[set] = None,
+    chunksize: int = 200_000,
+    incremental: bool = False,
+):
+    """
+    Devuelve maestro PCI/RSI, su índice, RSI 5G (IndiceRSI5G) y TAC
+    vecinos como handles Diferido: cada fichero se lee en el primer acceso
+    y los que no se usan no se tocan. Si se indican `sites`, el maestro se
+    lee en streaming recortado a ese lote. Con `incremental`, un maestro
+    que ha cambiado se actualiza aplicando el delta sobre la versión
+    cacheada.
+    """
+    from pci_rsi_sugeridor.cache import cargar_con_cache
+    from pci_rsi_sugeridor.core import (
+        IndiceMaestro,
+        IndiceRSI5G,
+        cargar_y_preprocesar_pci,
+        cargar_y_preprocesar_pci_lote,
+        cargar_y_preprocesar_rsi_5g,
+        compactar_maestro,
+    )
+    from pci_rsi_sugeridor.grafo_tac import cargar_grafo_tac
+    from pci_rsi_sugeridor.perf import cronometro
+
+    logger = logging.getLogger(__name__)
+    cache_kw = dict(usar_cache=usar_cache, reconstruir=reconstruir)
+
+    def cargar_tac():
+        logger.debug("Cargando información de TAC vecinos...")
+        with cronometro("carga.tac_vecinos"):
+            grafo = cargar_grafo_tac(TAC_AREAS, **cache_kw)
+        logger.info(f"{len(grafo)} entradas de TAC vecinos cargadas.")
+        return grafo
+
+    def cargar_pci():
+        logger.debug("Cargando archivo maestro de PCI/RSI...")
+        with cronometro("carga.maestro_pci"):
+            if sites is not None:
+                # El maestro recortado al lote no se cachea (ni lo que deriva de él)
+                logger.info(f"Carga en streaming del maestro para {len(sites)} sites.")
+                df = cargar_y_preprocesar_pci_lote(
+                    MAESTRO_PCI, sites, tac_vecinos.cargar(), chunksize
+                )
+                cache_kw["usar_cache"] = False
+            else:
+                df = cargar_con_cache(
+                    MAESTRO_PCI,
+                    lambda: cargar_y_preprocesar_pci(MAESTRO_PCI),
+                    actualizador=(
+                        _actualizador_delta(tac_vecinos) if incremental else None
+                    ),
+                    **cache_kw,
+                )
+        if compacto:
+            with cronometro("carga.compactar"):
+                df = compactar_maestro(df)
+            mb = df.memory_usage(deep=True).sum() / 2**20
+            logger.debug(f"Maestro compactado: {mb:.1f} MB en memoria.")
+        logger.info("Maestro PCI/RSI cargado correctamente.")
+        return df
+
+    def cargar_indice():
+        df = df_pci_master.cargar()
+        with cronometro("carga.indice"):
+            indice = IndiceMaestro(df)
+        logger.debug("Índice (TAC, banda, tecnología) del maestro construido.")
+        return indice
+
+    def cargar_rsi_5g():
+        df = df_pci_master.cargar()
+        logger.debug("Cargando fichero RSI 5G...")
+        with cronometro("carga.rsi_5g"):
+            df_rsi_5g = cargar_con_cache(
+                MAESTRO_RSI_5G,
+                lambda: cargar_y_preprocesar_rsi_5g(MAESTRO_RSI_5G, df),
+                dependencias=[MAESTRO_PCI],
+                **cache_kw,
+            )
+        with cronometro("carga.indice_rsi_5g"):
+            indice_rsi_5g = IndiceRSI5G(df_rsi_5g)
+        logger.info("RSI 5G cargado.")
+        return indice_rsi_5g
+
+    tac_vecinos = Diferido("tac_vecinos", cargar_tac)
+    df_pci_master = Diferido("maestro_pci", cargar_pci)
+    indice = Diferido("indice", cargar_indice)
+    df_rsi_5g = Diferido("rsi_5g", cargar_rsi_5g)
+    return df_pci_master, indice, df_rsi_5g, tac_vecinos
+
+
+def _leer_escenario(opcion: str, min_pci: int, min_rsi: int):
+    """Escenario de la opción --escenario PETICIONES[:MIN_PCI]."""
+    from pci_rsi_sugeridor.core import leer_peticiones
+    from pci_rsi_sugeridor.escenarios import Escenario
+
+    path, _, sufijo = opcion.rpartition(":")
+    if not (path and sufijo.isdigit()):
+        path, sufijo = opcion, ""
+    nombre = os.path.splitext(os.path.basename(path))[0]
+    if sufijo:
+        min_pci = int(sufijo)
+        nombre = f"{nombre}@{min_pci}"
+    return Escenario(nombre, leer_peticiones(path), min_pci, min_rsi)
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Sugeridor PCI/RSI ZN-ZR con pool virtual"
@@ -39,7 +160,6 @@ def parse_args():
         "-m",
         "--mode",
         choices=["ZN", "ZR"],
-        required=True,
         help="Modo de operación: ZN (N) o ZR (R)",
     )
     parser.add_argument(
@@ -48,6 +168,12 @@ def parse_args():
         action="store_true",
         help="Ejecutar en modo masivo (CSV entrada)",
     )
+    parser.add_argument(
+        "-A",
+        "--auditoria",
+        action="store_true",
+        help="Auditar conflictos PCI/RSI de todo el maestro (no requiere -m ni -b)",
+    )
     parser.add_argument(
         "-i", "--entrada", help="CSV de entrada (modo masivo) o SITE (modo individual)"
     )
@@ -60,9 +186,7 @@ def parse_args():
         choices=["4G", "5G", "2600R", "LTE", "NR"],
         help="Tecnología (solo en modo individual y banda ≠ 700)",
     )
-    parser.add_argument(
-        "-b", "--band", required=True, help="Banda (700,800,1800,2100,2600,3500,78,1)"
-    )
+    parser.add_argument("-b", "--band", help="Banda (700,800,1800,2100,2600,3500,78,1)")
     parser.add_argument("--min-pci", type=int, default=0, help="Valor mínimo de PCI")
     parser.add_argument("--min-rsi", type=int, default=0, help="Valor mínimo de RSI")
     parser.add_argument(
@@ -74,40 +198,215 @@ def parse_args():
         action="store_true",
         help="Habilitar salida verbose (debug logs)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Modo masivo: procesos para planificar componentes de TAC en paralelo",
+    )
+    parser.add_argument(
+        "--formato-extra",
+        nargs="+",
+        choices=FORMATOS_EXTRA,
+        default=[],
+        help="Modo masivo: escribir también resumen y detalle en estos formatos",
+    )
+    parser.add_argument(
+        "--vista",
+        type=int,
+        default=20,
+        help="Modo masivo: filas de resumen y detalle mostradas por consola",
+    )
+    parser.add_argument(
+        "--optimizar",
+        action="store_true",
+        help="Modo masivo: asignar los PCIs del lote de forma conjunta (DSATUR)",
+    )
+    parser.add_argument(
+        "--presupuesto",
+        type=float,
+        default=10.0,
+        help="Segundos máximos del optimizador de PCIs",
+    )
+    parser.add_argument(
+        "--estado",
+        help="Fichero de reservas de PCI persistentes entre ejecuciones",
+    )
+    parser.add_argument(
+        "--caducidad",
+        type=float,
+        default=24.0,
+        help="Horas que dura una reserva del fichero de estado",
+    )
+    parser.add_argument(
+        "--escenario",
+        action="append",
+        metavar="PETICIONES[:MIN_PCI]",
+        help=(
+            "Comparar escenarios: CSV de peticiones, opcionalmente con su min_pci "
+            "(repetible)"
+        ),
+    )
+    parser.add_argument(
+        "--no-memo",
+        action="store_true",
+        help="Modo individual: no reutilizar ni guardar resultados memorizados",
+    )
+    parser.add_argument(
+        "--memo-mb",
+        type=float,
+        default=64.0,
+        help="Tamaño máximo en MB de la caché de resultados",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Modo masivo: leer por trozos solo la parte del maestro del lote",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=200_000,
+        help="Filas por trozo en la carga en streaming",
+    )
+    parser.add_argument(
+        "--compacto",
+        action="store_true",
+        help="Mantener el maestro en memoria con tipos compactos (categóricas)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No leer ni escribir la caché binaria de los maestros",
+    )
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Regenerar la caché binaria de los maestros aunque siga vigente",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Si el maestro cambió, aplicar solo el delta sobre la caché anterior",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Medir tiempos por etapa y guardar un informe perfil_*.json",
+    )
     parser.add_argument("--version", action="version", version=f"%(prog)s {VERSION}")
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not (args.auditoria or args.escenario):
+        faltan = [
+            o for o, v in (("-m/--mode", args.mode), ("-b/--band", args.band)) if not v
+        ]
+        if faltan:
+            parser.error(f"argumentos obligatorios: {', '.join(faltan)}")
+    return args
 
 
 def main():
     args = parse_args()
+    # Import diferido: lo pesado solo tras validar los argumentos
+    import pandas as pd
+
+    from pci_rsi_sugeridor.core import (
+        ClusterAllocator,
+        detectar_numero_sectores,
+        ensure_csv,
+        leer_peticiones,
+        masivo_OSP_VDF,
+        normaliza_banda,
+        planificar_lnr700,
+        sites_de_peticiones,
+        sugerir_pci_rsi,
+    )
+    from pci_rsi_sugeridor.estado import EstadoAllocator
+    from pci_rsi_sugeridor.memo import (
+        MEMO_DIR,
+        MemoResultados,
+        huella_ficheros,
+        memorizar,
+    )
+    from pci_rsi_sugeridor.perf import PERFIL, cronometro
+
     setup_logging(args.verbose)
     logger = logging.getLogger(__name__)
+    PERFIL.activo = args.profile
 
     logger.info(f"Iniciando Sugeridor PCI/RSI v{VERSION}")
     os.makedirs(args.output_dir, exist_ok=True)
 
-    # Carga de datos maestros
-    logger.debug("Cargando archivo maestro de PCI/RSI...")
-    df_pci_master = cargar_y_preprocesar_pci("am_cellinfo_etldb.csv")
-    if df_pci_master.empty:
-        logger.error("No se pudo cargar el fichero maestro PCI/RSI. Abortando.")
-        sys.exit(1)
-    logger.info("Maestro PCI/RSI cargado correctamente.")
-
-    logger.debug("Cargando fichero RSI 5G...")
-    df_rsi_5g = cargar_y_preprocesar_rsi_5g(
-        "gnodebfunctionmodule_nrducell.csv", df_pci_master
+    sites = None
+    if args.streaming and args.masivo and args.entrada:
+        sites = sites_de_peticiones(leer_peticiones(args.entrada))
+    maestro, indice_diferido, df_rsi_5g, grafo = cargar_maestros(
+        usar_cache=not args.no_cache,
+        reconstruir=args.rebuild_cache,
+        compacto=args.compacto,
+        sites=sites,
+        chunksize=args.chunksize,
+        incremental=args.incremental,
     )
-    logger.info("RSI 5G cargado.")
 
-    logger.debug("Cargando información de TAC vecinos...")
-    tac_vecinos = preprocesar_TACAreas("TACAreas.xlsx")
-    logger.info(f"{len(tac_vecinos)} entradas de TAC vecinos cargadas.")
+    # Los maestros son diferidos: cada modo carga solo lo que usa (el RSI 5G,
+    # solo si se planifica alguna celda 5G)
+    def cargar_maestro_pci():
+        df = maestro.cargar()
+        if df.empty:
+            logger.error("No se pudo cargar el fichero maestro PCI/RSI. Abortando.")
+            sys.exit(1)
+        return df
+
+    estado = EstadoAllocator(args.estado, args.caducidad) if args.estado else None
+    allocator = ClusterAllocator(estado)
+
+    if args.auditoria:
+        from pci_rsi_sugeridor.auditoria import auditar_maestro, resumen_auditoria
+
+        df_pci_master, tac_vecinos = cargar_maestro_pci(), grafo.cargar()
+        with cronometro("auditoria.total"):
+            informe = auditar_maestro(df_pci_master, tac_vecinos)
+        auditoria_csv = os.path.join(
+            args.output_dir, f"auditoria_{datetime.now().strftime('%Y%m%d')}.csv"
+        )
+        informe.to_csv(auditoria_csv, index=False, sep=";", encoding="utf-8-sig")
+        for tipo, n in resumen_auditoria(informe).items():
+            logger.info(f"{tipo}: {n} celdas con conflicto.")
+        logger.info(f"Informe de auditoría guardado en {auditoria_csv}")
+    elif args.escenario:
+        from pci_rsi_sugeridor.escenarios import (
+            comparar_escenarios,
+            escribir_comparacion,
+            planificar_escenarios,
+        )
 
-    if args.masivo:
+        df_pci_master, tac_vecinos = cargar_maestro_pci(), grafo.cargar()
+        escenarios = [
+            _leer_escenario(e, args.min_pci, args.min_rsi) for e in args.escenario
+        ]
+        resultados = planificar_escenarios(
+            escenarios,
+            df_pci_master,
+            df_rsi_5g,
+            tac_vecinos,
+            args.mode == "ZR",
+            indice_diferido.cargar(),
+            allocator,
+        )
+        comparacion = comparar_escenarios(resultados, df_pci_master, tac_vecinos)
+        comparacion_csv = os.path.join(
+            args.output_dir,
+            f"comparacion_escenarios_{datetime.now().strftime('%Y%m%d')}.csv",
+        )
+        escribir_comparacion(comparacion, comparacion_csv)
+        print(comparacion.to_markdown())
+        logger.info(f"Comparación de escenarios guardada en {comparacion_csv}")
+    elif args.masivo:
         if not args.entrada:
             logger.error("En modo masivo, --entrada <archivo.csv> es obligatorio.")
             sys.exit(1)
+        df_pci_master, tac_vecinos = cargar_maestro_pci(), grafo.cargar()
         resumen_csv = os.path.join(
             args.output_dir, f"resumen_masivo_{datetime.now().strftime('%Y%m%d')}.csv"
         )
@@ -124,6 +423,13 @@ def main():
             df_pci_master,
             df_rsi_5g,
             tac_vecinos,
+            indice_diferido.cargar(),
+            args.workers,
+            args.formato_extra,
+            args.vista,
+            args.optimizar,
+            args.presupuesto,
+            estado,
         )
     else:
         if not args.entrada:
@@ -131,53 +437,100 @@ def main():
             sys.exit(1)
         site = args.entrada.strip()
         band_norm = normaliza_banda(args.band, args.tech or "")
-        n_sectores = detectar_numero_sectores(site, df_pci_master)
-        logger.info(f"Procesando SITE={site}, banda={band_norm}, sectores={n_sectores}")
+        if band_norm != "700" and not args.tech:
+            logger.error("Debe indicar --tech cuando la banda no es 700.")
+            sys.exit(1)
 
-        if band_norm == "700":
-            logger.info("Banda 700 detectada: aplicando planificar_lnr700.")
-            resumen4, detalle4, resumen5, detalle5 = planificar_lnr700(
-                site,
-                n_sectores,
-                df_pci_master,
-                df_rsi_5g,
-                tac_vecinos,
-                args.min_pci,
-                args.min_rsi,
-                args.mode == "ZR",
-                {},
+        def planificar():
+            df_pci_master, indice = cargar_maestro_pci(), indice_diferido.cargar()
+            n_sectores = detectar_numero_sectores(site, df_pci_master, indice)
+            logger.info(
+                f"Procesando SITE={site}, banda={band_norm}, sectores={n_sectores}"
             )
+            if band_norm == "700":
+                logger.info("Banda 700 detectada: aplicando planificar_lnr700.")
+                with cronometro("individual.planificacion"):
+                    return planificar_lnr700(
+                        site,
+                        n_sectores,
+                        df_pci_master,
+                        df_rsi_5g,
+                        grafo.cargar(),
+                        args.min_pci,
+                        args.min_rsi,
+                        args.mode == "ZR",
+                        {},
+                        indice,
+                        allocator,
+                    )
+            with cronometro("individual.planificacion"):
+                return sugerir_pci_rsi(
+                    site,
+                    site,
+                    args.tech,
+                    args.band,
+                    n_sectores,
+                    df_pci_master,
+                    df_rsi_5g,
+                    grafo.cargar(),
+                    args.min_pci,
+                    args.min_rsi,
+                    args.mode == "ZR",
+                    allocator,
+                    indice=indice,
+                )
+
+        # Una petición ya resuelta con las mismas entradas no carga los maestros
+        memo = None if args.no_memo else MemoResultados(MEMO_DIR, args.memo_mb)
+        # Con los valores tal cual llegan a planificar(): el resultado los
+        # copia (NODO VDF, Tecnología), así que no se pueden normalizar
+        parametros = {
+            "site": site,
+            "tech": args.tech,
+            "band": args.band,
+            "min_pci": args.min_pci,
+            "min_rsi": args.min_rsi,
+            "modo": args.mode,
+        }
+        resultado = memorizar(
+            memo,
+            "planificar_lnr700" if band_norm == "700" else "sugerir_pci_rsi",
+            parametros,
+            huella_ficheros([MAESTRO_PCI, MAESTRO_RSI_5G, TAC_AREAS]),
+            allocator,
+            planificar,
+            grafo,
+        )
+        if band_norm == "700":
+            resumen4, detalle4, resumen5, detalle5 = resultado
             resumen = resumen4 + resumen5
             detalle = detalle4 + detalle5
         else:
-            if not args.tech:
-                logger.error("Debe indicar --tech cuando la banda no es 700.")
-                sys.exit(1)
-            resumen, detalle = sugerir_pci_rsi(
-                site,
-                site,
-                args.tech,
-                args.band,
-                n_sectores,
-                df_pci_master,
-                df_rsi_5g,
-                tac_vecinos,
-                args.min_pci,
-                args.min_rsi,
-                args.mode == "ZR",
-            )
+            resumen, detalle = resultado
 
-        if resumen:
-            df_res = pd.DataFrame(resumen)
-            print(df_res.to_markdown(index=False))
-        else:
-            logger.warning("No se generó resumen para los criterios dados.")
+        with cronometro("salida.impresion"):
+            if resumen:
+                df_res = pd.DataFrame(resumen)
+                print(df_res.to_markdown(index=False))
+            else:
+                logger.warning("No se generó resumen para los criterios dados.")
 
-        if detalle:
-            df_det = pd.DataFrame(detalle)
-            print(df_det.to_markdown(index=False))
-        else:
-            logger.warning("No se generó detalle para los criterios dados.")
+            if detalle:
+                df_det = pd.DataFrame(detalle)
+                print(df_det.to_markdown(index=False))
+            else:
+                logger.warning("No se generó detalle para los criterios dados.")
+
+    if estado is not None and not args.auditoria:
+        estado.confirmar()
+        logger.info(f"Reservas de PCI guardadas en {args.estado}")
+
+    if args.profile:
+        perfil_json = os.path.join(
+            args.output_dir, f"perfil_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        PERFIL.guardar(perfil_json)
+        logger.info(f"Informe de perfilado guardado en {perfil_json}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# memo.py: Caché en disco de resultados de sugerir_pci_rsi y planificar_lnr700
+#
+# La clave combina los parámetros de la petición con las huellas de las
+# entradas (maestro, TAC vecinos) y del estado del allocator, así que
+# cualquier cambio en ellas invalida la entrada sin más. Cada resultado es
+# un JSON en el directorio de la caché; al superar `max_mb` se borran los
+# menos usados (el acceso renueva el mtime del fichero).
+
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from pci_rsi_sugeridor.grafo_tac import cluster_tac
+from pci_rsi_sugeridor.perf import contar
+
+VERSION_MEMO = 1
+MEMO_DIR = ".memo_resultados"
+
+logger = logging.getLogger(__name__)
+
+
+def huella_ficheros(paths: Iterable[str]) -> str:
+    """Huella barata (tamaño y mtime) de un conjunto de ficheros de entrada."""
+    partes = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            partes.append(f"{path}:{st.st_size}:{st.st_mtime_ns}")
+        except FileNotFoundError:
+            partes.append(f"{path}:-")
+    return hashlib.blake2b("|".join(partes).encode(), digest_size=16).hexdigest()
+
+
+class MemoResultados:
+    """Resultados memorizados en `directorio`, acotados a `max_mb` (LRU)."""
+
+    def __init__(self, directorio: str = MEMO_DIR, max_mb: float = 64.0):
+        self.directorio = directorio
+        self.max_bytes = int(max_mb * 2**20)
+        os.makedirs(directorio, exist_ok=True)
+
+    @staticmethod
+    def clave(nombre: str, parametros: Union[dict, Sequence], huellas: dict) -> str:
+        texto = json.dumps(
+            [VERSION_MEMO, nombre, parametros, huellas], sort_keys=True, default=str
+        )
+        return hashlib.blake2b(texto.encode(), digest_size=20).hexdigest()
+
+    def _path(self, clave: str) -> str:
+        return os.path.join(self.directorio, clave + ".json")
+
+    def leer(self, clave: str) -> Optional[dict]:
+        path = self._path(clave)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entrada = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return entrada
+
+    def escribir(self, clave: str, entrada: dict):
+        path = self._path(clave)
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(entrada, f, default=str)
+            os.replace(path + ".tmp", path)
+            self._recortar()
+        except OSError as e:
+            logger.warning("No se pudo guardar el resultado memorizado: %s", e)
+
+    def _recortar(self):
+        ficheros = []
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith(".json"):
+                st = entrada.stat()
+                ficheros.append((st.st_mtime_ns, st.st_size, entrada.path))
+        total = sum(tam for _, tam, _ in ficheros)
+        for _, tam, path in sorted(ficheros):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= tam
+            except FileNotFoundError:
+                pass
+
+
+def memorizar(
+    memo: Optional[MemoResultados],
+    nombre: str,
+    parametros: Union[dict, Sequence],
+    huella_datos: str,
+    allocator,
+    calcular: Callable[[], tuple],
+    tac_a_vecinos,
+) -> tuple:
+    """
+    Resultado de `calcular()` (que debe asignar sobre `allocator`) tomado
+    de la caché si la petición ya se resolvió con las mismas entradas. En
+    un acierto se reaplican al allocator los PCIs que registró el cálculo
+    (`tac_a_vecinos` puede ser un Diferido: solo se lee en ese caso).
+    """
+    if memo is None:
+        return calcular()
+    clave = memo.clave(
+        nombre, parametros, {"datos": huella_datos, "allocator": allocator.huella()}
+    )
+    entrada = memo.leer(clave)
+    if entrada is not None:
+        contar("memo.aciertos")
+        for tac, vendor, banda, pcis in entrada["registros"]:
+            cluster = cluster_tac(tac_a_vecinos, tac)
+            allocator.register_assigned(cluster, pcis, tac, vendor, banda)
+        return tuple(entrada["resultado"])
+    contar("memo.fallos")
+    with allocator.grabar() as registros:
+        resultado = calcular()
+    memo.escribir(clave, {"resultado": list(resultado), "registros": registros})
+    return resultado
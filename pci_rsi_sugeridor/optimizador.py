@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# optimizador.py: Asignación conjunta de PCIs de un lote por coloreado de grafo
+#
+# Cada petición (site, banda, TAC) es un nodo que necesita una base de PCI
+# alineada a mod 3 con sus n PCIs consecutivos libres en el maestro. Dos
+# nodos de la misma banda/tecnología están en conflicto si el TAC de uno
+# pertenece al cluster del otro, y entonces no pueden compartir base. Se
+# colorea con DSATUR (los "colores" son las bases) bajo un presupuesto de
+# tiempo y se compara con el reparto greedy en orden de petición.
+
+import heapq
+import logging
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from pci_rsi_sugeridor.bitmaps import N_PCI, a_bitmap, a_lista
+from pci_rsi_sugeridor.bitmaps import contar as contar_bits
+from pci_rsi_sugeridor.bitmaps import mascara_rango
+from pci_rsi_sugeridor.core import (
+    ClusterAllocator,
+    IndiceMaestro,
+    agrupar_tech,
+    detectar_numero_sectores,
+    normaliza_banda,
+    sugerir_consecutivos_mod3,
+    tacs_planificables,
+)
+from pci_rsi_sugeridor.grafo_tac import cluster_tac
+from pci_rsi_sugeridor.huecos import bases_validas, menor_bit
+
+logger = logging.getLogger(__name__)
+
+
+class NodoPCI:
+    """Petición (site, banda) en un TAC con su dominio de bases posibles."""
+
+    __slots__ = ("grupo", "tac", "n", "libres", "dominio", "vecinos")
+
+    def __init__(self, grupo: tuple, tac: str, n: int, libres: int):
+        self.grupo = grupo
+        self.tac = tac
+        self.n = n
+        self.libres = libres
+        self.dominio = bases_validas(libres, n)
+        self.vecinos: List[int] = []
+
+
+def _pcis_de_base(base: int, n: int) -> list:
+    return [base + i for i in range(n)]
+
+
+def construir_nodos(
+    grupos: list,
+    df_pci_master,
+    tac_a_vecinos,
+    indice: IndiceMaestro,
+    min_pci: int = 0,
+    estado=None,
+) -> List[NodoPCI]:
+    """Nodos del grafo de conflictos para los grupos (site, banda, tech)."""
+    pools = ClusterAllocator(estado)
+    nodos: List[NodoPCI] = []
+    capas: Dict[tuple, Dict[str, List[int]]] = {}
+    for site, band, tech in grupos:
+        df_site = indice.filas_site(site.strip().upper())
+        if df_site.empty:
+            continue
+        tc, bc = agrupar_tech(tech), normaliza_banda(band, tech)
+        n = detectar_numero_sectores(site, df_pci_master, indice)
+        vendor = df_site["VENDOR_CLEAN"].iloc[0]
+        for tac in tacs_planificables(df_site, tc):
+            cluster = cluster_tac(tac_a_vecinos, tac)
+            usados, _ = indice.usados_cluster(cluster, bc, tc)
+            usados |= pools.get_cluster_assigned_bitmap(cluster, bc)
+            libres = pools.get_unused_pci_bitmap(vendor, bc, usados, min_pci)
+            capas.setdefault((bc, tc), {}).setdefault(str(tac), []).append(len(nodos))
+            nodos.append(NodoPCI((site, band), str(tac), n, libres))
+
+    # Aristas: mismo (banda, tech) y TAC de uno dentro del cluster del otro
+    for por_tac in capas.values():
+        for tac, indices in por_tac.items():
+            for t in cluster_tac(tac_a_vecinos, tac):
+                for j in por_tac.get(t, []):
+                    for i in indices:
+                        if i != j:
+                            nodos[i].vecinos.append(j)
+                            nodos[j].vecinos.append(i)
+    for nodo in nodos:
+        nodo.vecinos = sorted(set(nodo.vecinos))
+    return nodos
+
+
+def _factibles(nodo: NodoPCI, ocupados: int) -> int:
+    return bases_validas(nodo.libres & ~ocupados, nodo.n)
+
+
+def _fijar(nodos, i: int, base: int, bases: Dict[int, int], ocupados: Dict[int, int]):
+    bases[i] = base
+    bm = mascara_rango(base, base + nodos[i].n)
+    for j in nodos[i].vecinos:
+        ocupados[j] = ocupados.get(j, 0) | bm
+
+
+def colorear_dsatur(
+    nodos: List[NodoPCI], presupuesto_s: float = 10.0
+) -> Dict[int, int]:
+    """
+    Base asignada a cada nodo coloreable. Al agotar el presupuesto, los
+    nodos pendientes se asignan en orden de petición.
+    """
+    limite = time.perf_counter() + presupuesto_s
+    bases: Dict[int, int] = {}
+    ocupados: Dict[int, int] = {}  # PCIs ya tomados por vecinos coloreados
+    # Montículo de (-saturación, nº de bases factibles, -grado, i); las
+    # entradas obsoletas se descartan al sacarlas
+    monticulo = [
+        (0, contar_bits(n.dominio), -len(n.vecinos), i)
+        for i, n in enumerate(nodos)
+        if n.dominio
+    ]
+    heapq.heapify(monticulo)
+    while monticulo:
+        if time.perf_counter() > limite:
+            logger.warning("Presupuesto del optimizador agotado: resto en orden.")
+            break
+        sat, _, _, i = heapq.heappop(monticulo)
+        if i in bases or -sat != contar_bits(ocupados.get(i, 0)):
+            continue
+        factibles = _factibles(nodos[i], ocupados.get(i, 0))
+        if factibles:
+            _fijar(nodos, i, menor_bit(factibles), bases, ocupados)
+        else:
+            bases[i] = -1
+            continue
+        for j in nodos[i].vecinos:
+            if j not in bases and nodos[j].dominio:
+                heapq.heappush(
+                    monticulo,
+                    (
+                        -contar_bits(ocupados[j]),
+                        contar_bits(_factibles(nodos[j], ocupados[j])),
+                        -len(nodos[j].vecinos),
+                        j,
+                    ),
+                )
+    bases = {i: b for i, b in bases.items() if b >= 0}
+    for i, nodo in enumerate(nodos):
+        if i not in bases:
+            factibles = _factibles(nodo, ocupados.get(i, 0))
+            if factibles:
+                _fijar(nodos, i, menor_bit(factibles), bases, ocupados)
+    return bases
+
+
+def _completar(nodos, bases: Dict[int, int], min_pci: int) -> List[list]:
+    """PCIs de cada nodo; los no coloreados caen en sugerir_consecutivos_mod3."""
+    ocupados: Dict[int, int] = {}
+    for i, base in bases.items():
+        bm = mascara_rango(base, base + nodos[i].n)
+        for j in nodos[i].vecinos:
+            ocupados[j] = ocupados.get(j, 0) | bm
+    pcis = []
+    for i, nodo in enumerate(nodos):
+        if i in bases:
+            pcis.append(_pcis_de_base(bases[i], nodo.n))
+        else:
+            libres = a_lista(nodo.libres & ~ocupados.get(i, 0))
+            pcis.append(sugerir_consecutivos_mod3(libres, nodo.n, min_pci))
+            # Lo que toma el nodo sin base también lo ven sus vecinos
+            bm = a_bitmap((p for p in pcis[-1] if isinstance(p, int)), N_PCI)
+            for j in nodo.vecinos:
+                ocupados[j] = ocupados.get(j, 0) | bm
+    return pcis
+
+
+def greedy_en_orden(nodos: List[NodoPCI], min_pci: int = 0) -> List[list]:
+    """Reparto de referencia: sugerir_consecutivos_mod3 en orden de petición."""
+    asignados: Dict[int, int] = {}
+    pcis = []
+    for i, nodo in enumerate(nodos):
+        libres = a_lista(nodo.libres & ~asignados.get(i, 0))
+        res = sugerir_consecutivos_mod3(libres, nodo.n, min_pci)
+        bm = a_bitmap((p for p in res if isinstance(p, int)), N_PCI)
+        for j in nodo.vecinos:
+            asignados[j] = asignados.get(j, 0) | bm
+        pcis.append(res)
+    return pcis
+
+
+def _completas(pcis: List[list]) -> int:
+    return sum(all(isinstance(p, int) for p in lista) for lista in pcis)
+
+
+def optimizar_pcis(
+    grupos: list,
+    df_pci_master,
+    tac_a_vecinos,
+    indice: Optional[IndiceMaestro] = None,
+    presupuesto_s: float = 10.0,
+    min_pci: int = 0,
+    estado=None,
+) -> Tuple[dict, dict]:
+    """
+    Asigna los PCIs de todos los grupos a la vez. Devuelve
+    ({(site, banda): {TAC: [PCIs]}}, estadísticas frente al greedy). Los
+    grupos de 700 se dejan a planificar_lnr700 (coordinación 4G/5G). Las
+    reservas de `estado` cuentan como PCIs usados.
+    """
+    if indice is None:
+        indice = IndiceMaestro(df_pci_master)
+    grupos = [g for g in grupos if normaliza_banda(g[1], g[2]) != "700"]
+    nodos = construir_nodos(
+        grupos, df_pci_master, tac_a_vecinos, indice, min_pci, estado
+    )
+    t0 = time.perf_counter()
+    pcis = _completar(nodos, colorear_dsatur(nodos, presupuesto_s), min_pci)
+    greedy = greedy_en_orden(nodos, min_pci)
+    completas, completas_greedy = _completas(pcis), _completas(greedy)
+    # DSATUR es heurístico: si el greedy completa más peticiones, se usa ese
+    if completas_greedy > completas:
+        pcis = greedy
+    stats: Dict[str, Union[int, float, str]] = {
+        "peticiones": len(nodos),
+        "completas_optimizador": completas,
+        "completas_greedy": completas_greedy,
+        "segundos": round(time.perf_counter() - t0, 3),
+        "usado": "greedy" if pcis is greedy else "dsatur",
+    }
+    asignacion: Dict[tuple, dict] = {}
+    for nodo, lista in zip(nodos, pcis):
+        asignacion.setdefault(nodo.grupo, {})[nodo.tac] = lista
+    return asignacion, stats
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# perf.py: Temporizadores, contadores e histogramas por etapa
+#
+# Desactivado por defecto: cada llamada se reduce a comprobar un booleano.
+# Se activa desde la CLI con --profile.
+
+import json
+import time
+from contextlib import nullcontext
+from typing import Dict, List
+
+import numpy as np
+
+_NULO = nullcontext()
+
+# Límites superiores (ms) de las cubetas de los histogramas de latencia
+CUBETAS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000]
+
+
+class _Cronometro:
+    __slots__ = ("_perfil", "_nombre", "_t0")
+
+    def __init__(self, perfil: "Perfil", nombre: str):
+        self._perfil = perfil
+        self._nombre = nombre
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._perfil.sumar_tiempo(self._nombre, time.perf_counter() - self._t0)
+        return False
+
+
+class Perfil:
+    """Registro de tiempos, contadores y muestras de latencia por nombre."""
+
+    def __init__(self):
+        self.activo = False
+        self.reset()
+
+    def reset(self):
+        self._tiempos: Dict[str, list] = {}
+        self._contadores: Dict[str, int] = {}
+        self._muestras: Dict[str, List[float]] = {}
+
+    def cronometro(self, nombre: str):
+        """Context manager que acumula el tiempo de la etapa `nombre`."""
+        if not self.activo:
+            return _NULO
+        return _Cronometro(self, nombre)
+
+    def sumar_tiempo(self, nombre: str, segundos: float):
+        acumulado = self._tiempos.setdefault(nombre, [0.0, 0])
+        acumulado[0] += segundos
+        acumulado[1] += 1
+
+    def contar(self, nombre: str, n: int = 1):
+        if self.activo:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + n
+
+    def muestra(self, nombre: str, valor: float):
+        """Añade una muestra (p.ej. latencia en ms) al histograma `nombre`."""
+        if self.activo:
+            self._muestras.setdefault(nombre, []).append(valor)
+
+    def exportar(self) -> dict:
+        """Estado bruto, para fusionarlo desde otro proceso."""
+        return {
+            "tiempos": self._tiempos,
+            "contadores": self._contadores,
+            "muestras": self._muestras,
+        }
+
+    def fusionar(self, datos: dict):
+        for nombre, (segundos, llamadas) in datos["tiempos"].items():
+            acumulado = self._tiempos.setdefault(nombre, [0.0, 0])
+            acumulado[0] += segundos
+            acumulado[1] += llamadas
+        for nombre, n in datos["contadores"].items():
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + n
+        for nombre, valores in datos["muestras"].items():
+            self._muestras.setdefault(nombre, []).extend(valores)
+
+    @staticmethod
+    def _histograma(valores: List[float]) -> dict:
+        arr = np.asarray(valores, dtype=float)
+        limites = CUBETAS_MS + [float("inf")]
+        cuenta = np.histogram(arr, bins=[0.0] + limites)[0]
+        return {
+            "n": int(arr.size),
+            "media": float(arr.mean()),
+            "p50": float(np.percentile(arr, 50)),
+            "p90": float(np.percentile(arr, 90)),
+            "p99": float(np.percentile(arr, 99)),
+            "max": float(arr.max()),
+            "cubetas": {f"<={lim}": int(c) for lim, c in zip(limites, cuenta)},
+        }
+
+    def informe(self) -> dict:
+        return {
+            "tiempos": {
+                nombre: {"total_s": round(seg, 6), "llamadas": n}
+                for nombre, (seg, n) in sorted(self._tiempos.items())
+            },
+            "contadores": dict(sorted(self._contadores.items())),
+            "histogramas": {
+                nombre: self._histograma(valores)
+                for nombre, valores in sorted(self._muestras.items())
+                if valores
+            },
+        }
+
+    def guardar(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.informe(), f, indent=2, ensure_ascii=False)
+
+
+PERFIL = Perfil()
+
+
+def cronometro(nombre: str):
+    return PERFIL.cronometro(nombre)
+
+
+def contar(nombre: str, n: int = 1):
+    PERFIL.contar(nombre, n)
+
+
+def muestra(nombre: str, valor: float):
+    PERFIL.muestra(nombre, valor)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# salidas.py: Escritura incremental de los resultados del modo masivo
+#
+# Cada grupo planificado se vuelca al disco en cuanto termina, de modo que
+# la memoria no crece con el tamaño del lote. Por consola solo se muestra
+# una vista previa acotada.
+
+import csv
+import logging
+import os
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_EXTRA = ("parquet", "xlsx")
+
+
+class EscritorCSV:
+    """CSV con separador ';' y BOM (igual que DataFrame.to_csv del original)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer: Optional[csv.DictWriter] = None
+
+    def escribir(self, filas: List[dict]):
+        if not filas:
+            return
+        if self._writer is None:
+            # La cabecera se toma de la primera fila
+            self._writer = csv.DictWriter(
+                self._f,
+                fieldnames=list(filas[0]),
+                delimiter=";",
+                restval="",
+                extrasaction="ignore",
+                lineterminator="\n",
+            )
+            self._writer.writeheader()
+        self._writer.writerows(filas)
+
+    def cerrar(self):
+        self._f.close()
+
+
+class EscritorParquet:
+    """
+    Parquet por grupos de filas de tamaño `lote`. Todas las columnas se
+    guardan como texto porque las sugerencias mezclan enteros y huecos ("").
+    """
+
+    def __init__(self, path: str, lote: int = 50_000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa, self._pq = pa, pq
+        self.path = path
+        self._lote = lote
+        self._buffer: List[dict] = []
+        self._columnas: Optional[List[str]] = None
+        self._writer = None
+
+    def escribir(self, filas: List[dict]):
+        self._buffer.extend(filas)
+        if len(self._buffer) >= self._lote:
+            self._volcar()
+
+    def _volcar(self):
+        if not self._buffer:
+            return
+        if self._columnas is None:
+            self._columnas = list(self._buffer[0])
+            esquema = self._pa.schema([(c, self._pa.string()) for c in self._columnas])
+            self._writer = self._pq.ParquetWriter(self.path, esquema)
+        tabla = self._pa.table(
+            {
+                c: [str(fila.get(c, "")) for fila in self._buffer]
+                for c in self._columnas
+            },
+            schema=self._writer.schema,
+        )
+        self._writer.write_table(tabla)
+        self._buffer = []
+
+    def cerrar(self):
+        self._volcar()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class EscritorXLSX:
+    """XLSX en modo write-only de openpyxl (las filas no quedan en memoria)."""
+
+    def __init__(self, path: str):
+        import openpyxl
+
+        self.path = path
+        self._wb = openpyxl.Workbook(write_only=True)
+        self._ws = self._wb.create_sheet()
+        self._columnas: Optional[List[str]] = None
+
+    def escribir(self, filas: List[dict]):
+        for fila in filas:
+            if self._columnas is None:
+                self._columnas = list(fila)
+                self._ws.append(self._columnas)
+            self._ws.append([fila.get(c, "") for c in self._columnas])
+
+    def cerrar(self):
+        self._wb.save(self.path)
+
+
+_ESCRITORES = {"parquet": EscritorParquet, "xlsx": EscritorXLSX}
+
+
+def _crear_escritores(path_csv: str, formatos_extra: Sequence[str]) -> list:
+    escritores = [EscritorCSV(path_csv)]
+    base = os.path.splitext(path_csv)[0]
+    for formato in formatos_extra:
+        try:
+            escritores.append(_ESCRITORES[formato](f"{base}.{formato}"))
+        except ImportError as e:
+            logger.warning("Se omite la salida %s (%s).", formato, e)
+    return escritores
+
+
+class SalidaMasiva:
+    """
+    Destino de los resultados del modo masivo: escribe resumen y detalle de
+    cada grupo según llegan y guarda solo las primeras `max_vista` filas
+    para la vista previa por consola.
+    """
+
+    def __init__(
+        self,
+        salida_resumen: str,
+        salida_detalle: str,
+        formatos_extra: Sequence[str] = (),
+        max_vista: int = 20,
+    ):
+        self._max_vista = max_vista
+        self._tablas = {
+            "resumen": _crear_escritores(salida_resumen, formatos_extra),
+            "detalle": _crear_escritores(salida_detalle, formatos_extra),
+        }
+        self.filas: Dict[str, int] = {"resumen": 0, "detalle": 0}
+        self._vista: Dict[str, List[dict]] = {"resumen": [], "detalle": []}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+    def añadir(self, resumen: List[dict], detalle: List[dict]):
+        for nombre, filas in (("resumen", resumen), ("detalle", detalle)):
+            for escritor in self._tablas[nombre]:
+                escritor.escribir(filas)
+            self.filas[nombre] += len(filas)
+            hueco = self._max_vista - len(self._vista[nombre])
+            if hueco > 0:
+                self._vista[nombre].extend(filas[:hueco])
+
+    def cerrar(self):
+        for escritores in self._tablas.values():
+            for escritor in escritores:
+                escritor.cerrar()
+
+    def imprimir_vista(self):
+        import tabulate
+
+        for nombre, titulo in (("resumen", "Resumen"), ("detalle", "Detalle")):
+            path = self._tablas[nombre][0].path
+            print(f"\n{titulo} masivo generado: {self.filas[nombre]} filas en {path}")
+            if self._vista[nombre]:
+                print(
+                    tabulate.tabulate(
+                        self._vista[nombre],
+                        headers="keys",
+                        tablefmt="github",
+                        showindex=False,
+                    )
+                )
+            if self.filas[nombre] > len(self._vista[nombre]):
+                print(f"... (mostradas {len(self._vista[nombre])} filas)")
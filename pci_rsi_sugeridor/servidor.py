@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# servidor.py: Servidor local con maestros en memoria y API JSON sobre HTTP
+#
+# Endpoints:
+#   GET  /estado     -> resumen de los datos cargados
+#   POST /sugerir    -> {"site", "tech", "band", "min_pci", "min_rsi", "modo", ...}
+#   POST /lnr700     -> {"site", "min_pci", "min_rsi", "modo", ...}
+#   POST /recargar   -> vuelve a cargar los maestros (usa la caché si sigue vigente);
+#                       con {"incremental": true} aplica solo el delta del maestro
+#   POST /reset      -> limpia las asignaciones acumuladas del allocator
+
+import argparse
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from pci_rsi_sugeridor.core import (
+    ClusterAllocator,
+    IndiceRSI5G,
+    detectar_numero_sectores,
+    indice_rsi_5g,
+    normaliza_banda,
+    planificar_lnr700,
+    sugerir_pci_rsi,
+)
+from pci_rsi_sugeridor.delta import (
+    ResultadoDelta,
+    actualizar_tac_rsi_5g,
+    aplicar_delta,
+)
+from pci_rsi_sugeridor.diferido import materializar
+from pci_rsi_sugeridor.io import (
+    MAESTRO_PCI,
+    MAESTRO_RSI_5G,
+    TAC_AREAS,
+    VERSION,
+    cargar_maestros,
+    setup_logging,
+)
+from pci_rsi_sugeridor.memo import MEMO_DIR, MemoResultados, huella_ficheros, memorizar
+
+logger = logging.getLogger(__name__)
+
+
+class EstadoServidor:
+    """
+    Maestros, índice y allocator compartidos entre peticiones. Las
+    planificaciones se serializan con un lock porque modifican el allocator.
+    """
+
+    def __init__(self, memo: Optional[MemoResultados] = None, **opciones_carga):
+        self._opciones_carga = opciones_carga
+        self._lock = threading.Lock()
+        self.allocator = ClusterAllocator()
+        self.memo = memo
+        self.recargar()
+
+    def recargar(self):
+        # El servidor informa de todos los datos en /estado: se cargan ya
+        huella_otros = huella_ficheros([MAESTRO_RSI_5G, TAC_AREAS])
+        huella = huella_ficheros([MAESTRO_PCI, MAESTRO_RSI_5G, TAC_AREAS])
+        datos = [materializar(d) for d in cargar_maestros(**self._opciones_carga)]
+        with self._lock:
+            self.df_pci_master, self.indice, rsi_5g, self.tac_vecinos = datos
+            self.rsi_5g = indice_rsi_5g(rsi_5g)
+            self.huella_datos = huella
+            self._huella_otros = huella_otros
+
+    def recargar_incremental(self) -> dict:
+        """
+        Aplica el delta del maestro PCI/RSI sobre los datos en memoria. TAC
+        vecinos y RSI 5G no admiten delta: si han cambiado se recarga todo,
+        para que la huella de los resultados memorizados sea la de lo cargado.
+        """
+        if huella_ficheros([MAESTRO_RSI_5G, TAC_AREAS]) != self._huella_otros:
+            self.recargar()
+            return ResultadoDelta(completo=True).resumen()
+        huella = huella_ficheros([MAESTRO_PCI, MAESTRO_RSI_5G, TAC_AREAS])
+        # aplicar_delta actualiza el índice en el sitio: se hace bajo el lock
+        with self._lock:
+            df, delta = aplicar_delta(self.df_pci_master, MAESTRO_PCI, self.indice)
+            if not delta.vacio:
+                # Un reprocesado completo no dice qué sites cambiaron: todos
+                sites = (
+                    set(df["SITE_CLEAN"].dropna()) if delta.completo else delta.sites
+                )
+                self.rsi_5g = IndiceRSI5G(
+                    actualizar_tac_rsi_5g(self.rsi_5g.df, df, sites)
+                )
+                self.df_pci_master = df
+                self.huella_datos = huella
+        return delta.resumen()
+
+    def reset(self):
+        with self._lock:
+            self.allocator.reset()
+
+    def estado(self) -> dict:
+        return {
+            "version": VERSION,
+            "filas_maestro": len(self.df_pci_master),
+            "filas_rsi_5g": len(self.rsi_5g),
+            "tacs": len(self.tac_vecinos),
+        }
+
+    def _argumentos(self, peticion: dict):
+        site = str(peticion["site"]).strip()
+        n_celdas = peticion.get("n_celdas") or detectar_numero_sectores(
+            site, self.df_pci_master, self.indice
+        )
+        return (
+            site,
+            int(n_celdas),
+            int(peticion.get("min_pci", 0)),
+            int(peticion.get("min_rsi", 0)),
+            peticion.get("modo", "ZN") == "ZR",
+        )
+
+    def _memorizar(self, nombre: str, parametros: tuple, calcular):
+        return memorizar(
+            self.memo,
+            nombre,
+            list(parametros),
+            self.huella_datos,
+            self.allocator,
+            calcular,
+            self.tac_vecinos,
+        )
+
+    def sugerir(self, peticion: dict) -> dict:
+        site, n_celdas, min_pci, min_rsi, modo_r = self._argumentos(peticion)
+        nodo, tech, band = (
+            peticion.get("nodo", site),
+            peticion["tech"],
+            peticion["band"],
+        )
+        with self._lock:
+            resumen, detalle = self._memorizar(
+                "sugerir_pci_rsi",
+                (site, nodo, tech, band, n_celdas, min_pci, min_rsi, modo_r),
+                lambda: sugerir_pci_rsi(
+                    site,
+                    nodo,
+                    tech,
+                    band,
+                    n_celdas,
+                    self.df_pci_master,
+                    self.rsi_5g,
+                    self.tac_vecinos,
+                    min_pci,
+                    min_rsi,
+                    modo_r,
+                    self.allocator,
+                    indice=self.indice,
+                ),
+            )
+        return {"resumen": resumen, "detalle": detalle}
+
+    def lnr700(self, peticion: dict) -> dict:
+        args = self._argumentos(peticion)
+        site, n_celdas, min_pci, min_rsi, modo_r = args
+        with self._lock:
+            r4, d4, r5, d5 = self._memorizar(
+                "planificar_lnr700",
+                args,
+                lambda: planificar_lnr700(
+                    site,
+                    n_celdas,
+                    self.df_pci_master,
+                    self.rsi_5g,
+                    self.tac_vecinos,
+                    min_pci,
+                    min_rsi,
+                    modo_r,
+                    {},
+                    self.indice,
+                    self.allocator,
+                ),
+            )
+        return {"resumen": r4 + r5, "detalle": d4 + d5}
+
+
+def crear_manejador(estado: EstadoServidor):
+    def _recargar(peticion: dict) -> dict:
+        if peticion.get("incremental"):
+            return {**estado.estado(), "delta": estado.recargar_incremental()}
+        estado.recargar()
+        return estado.estado()
+
+    class Manejador(BaseHTTPRequestHandler):
+        def _responder(self, codigo: int, cuerpo: dict):
+            datos = json.dumps(cuerpo, default=str).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            if self.path == "/estado":
+                self._responder(200, estado.estado())
+            else:
+                self._responder(404, {"error": f"Ruta desconocida: {self.path}"})
+
+        def do_POST(self):
+            acciones = {
+                "/sugerir": estado.sugerir,
+                "/lnr700": estado.lnr700,
+                "/recargar": _recargar,
+                "/reset": lambda _: (estado.reset(), {"ok": True})[1],
+            }
+            accion = acciones.get(self.path)
+            if accion is None:
+                self._responder(404, {"error": f"Ruta desconocida: {self.path}"})
+                return
+            try:
+                largo = int(self.headers.get("Content-Length") or 0)
+                peticion = json.loads(self.rfile.read(largo) or b"{}")
+                self._responder(200, accion(peticion))
+            except KeyError as e:
+                self._responder(400, {"error": f"Falta el campo {e}"})
+            except ValueError as e:
+                self._responder(400, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return Manejador
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Servidor local del sugeridor PCI/RSI (API JSON)"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección de escucha")
+    parser.add_argument("--port", type=int, default=8765, help="Puerto de escucha")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="No usar la caché de los maestros"
+    )
+    parser.add_argument(
+        "--compacto", action="store_true", help="Maestro con tipos compactos"
+    )
+    parser.add_argument(
+        "--memo",
+        action="store_true",
+        help=f"Memorizar resultados en disco ({MEMO_DIR})",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Habilitar debug logs"
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {VERSION}")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging(args.verbose)
+    estado = EstadoServidor(
+        MemoResultados() if args.memo else None,
+        usar_cache=not args.no_cache,
+        compacto=args.compacto,
+    )
+    servidor = ThreadingHTTPServer((args.host, args.port), crear_manejador(estado))
+    logger.info(f"Servidor PCI/RSI escuchando en http://{args.host}:{args.port}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
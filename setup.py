@@ -13,6 +13,8 @@ setup(
     ],
     # ...dentro del fichero setup.py...
     extras_require={
+        # Caché Feather de los maestros y salida parquet
+        "cache": ["pyarrow>=7.0"],
         "dev": [
             "pytest",
             "coverage",
@@ -33,6 +35,7 @@ setup(
         "console_scripts": [
             # Asume que pci_rsi_sugeridor/io.py define una función main()
             "pci-rsi=pci_rsi_sugeridor.io:main",
+            "pci-rsi-servidor=pci_rsi_sugeridor.servidor:main",
         ],
     },
     classifiers=[
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def df_maestro():
+    """Maestro PCI/RSI mínimo ya preprocesado (dos TAC vecinos y uno aislado)."""
+    filas = [
+        # SITE, TAC, BAND, TECH, VENDOR, CELLNAME, PCI, RSI
+        ("S1", "100", "800", "4G", "ERICSSON", "S1M1A", "0", "0"),
+        ("S1", "100", "800", "4G", "ERICSSON", "S1M2A", "1", "10"),
+        ("S1", "100", "800", "4G", "ERICSSON", "S1M3A", "2", "20"),
+        ("S2", "200", "800", "4G", "ERICSSON", "S2M1A", "3;4", "30"),
+        ("S2", "200", "700", "5G", "ERICSSON", "S2Q1A", "6", None),
+        ("S3", "300", "800", "4G", "HUAWEI", "S3M1A", "9", "90"),
+        ("S3", "300", "800", "4G", "HUAWEI", "S3M2B", "10", "91"),
+    ]
+    df = pd.DataFrame(
+        filas,
+        columns=[
+            "SITE",
+            "TAC",
+            "BAND",
+            "TECH",
+            "VENDOR",
+            "CELLNAME",
+            "BCCH/SC/PCI",
+            "RSQID",
+        ],
+    )
+    df["SITE_CLEAN"] = df["SITE"].str.strip().str.upper()
+    df["BAND_CLEAN"] = df["BAND"]
+    df["TECH_GROUP"] = df["TECH"]
+    df["VENDOR_CLEAN"] = df["VENDOR"]
+    return df
+
+
+@pytest.fixture
+def tac_vecinos():
+    return {"100": ["200"], "200": ["100"], "300": []}
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from pci_rsi_sugeridor.auditoria import auditar_maestro, resumen_auditoria
+
+
+def _maestro(filas):
+    df = pd.DataFrame(
+        filas, columns=["SITE", "TAC", "CELLNAME", "BCCH/SC/PCI", "RSQID"]
+    )
+    df["SITE_CLEAN"] = df["SITE"]
+    df["BAND_CLEAN"] = "800"
+    df["TECH_GROUP"] = "4G"
+    return df
+
+
+def test_auditoria_detecta_los_tres_tipos(tac_vecinos):
+    df = _maestro(
+        [
+            ("S1", "100", "S1M1A", "0", "0"),
+            ("S1", "100", "S1M2A", "1", "10"),
+            ("S1", "100", "S1M3A", "2", "20"),
+            ("S2", "200", "S2M1A", "1;5", "10"),  # PCI y RSI repetidos en TAC vecino
+            ("S3", "300", "S3M1A", "9", "90"),
+            ("S3", "300", "S3M2A", "12", "100"),  # mod 3 igual que S3M1A
+            ("S4", "300", "S4M1A", "9", "110"),  # mismo PCI en el mismo TAC
+        ]
+    )
+    informe = auditar_maestro(df, tac_vecinos)
+
+    def celdas(tipo):
+        return sorted(informe.loc[informe["TIPO"] == tipo, "CELLNAME"])
+
+    assert celdas("PCI_COLISION") == ["S1M2A", "S2M1A", "S3M1A", "S4M1A"]
+    assert celdas("PCI_MOD3") == ["S3M1A", "S3M2A"]
+    assert celdas("RSI_SOLAPE") == ["S1M2A", "S2M1A"]
+    fila = informe[(informe["TIPO"] == "PCI_COLISION") & (informe["SITE"] == "S1")]
+    assert fila[["VALOR", "TAC_CONFLICTO", "CELDAS_CONFLICTO"]].values.tolist() == [
+        [1, "200", "S2M1A"]
+    ]
+    assert resumen_auditoria(informe) == {
+        "PCI_COLISION": 4,
+        "PCI_MOD3": 2,
+        "RSI_SOLAPE": 2,
+    }
+
+
+def test_auditoria_sin_conflictos(df_maestro, tac_vecinos):
+    assert auditar_maestro(df_maestro, tac_vecinos).empty
@@ -0,0 +1,22 @@
+from pci_rsi_sugeridor.bitmaps import a_bitmap, a_lista, contar, mascara_rango
+from pci_rsi_sugeridor.core import ClusterAllocator
+
+
+def test_bitmap_ida_y_vuelta():
+    bm = a_bitmap([0, 5, 503, 504, -1], 504)
+    assert a_lista(bm) == [0, 5, 503]
+    assert contar(bm) == 3
+    assert a_lista(mascara_rango(3, 6)) == [3, 4, 5]
+    assert mascara_rango(10, 5) == 0
+
+
+def test_allocator_min_pci_y_asignado_global():
+    alloc = ClusterAllocator()
+    alloc.register_assigned({"A"}, [6, 7, ""])
+    alloc.register_assigned({"B"}, [9])
+    libres = alloc.get_unused_pci("huawei", "800", a_bitmap([5], 504), min_pci=5)
+    assert libres[:3] == [8, 10, 11]
+    assert alloc.get_unused_pci("ZTE", "800", set()) == []
+    assert alloc.get_unused_rsi("ERICSSON", "800", {0}, 836) == [836, 837]
+    alloc.reset()
+    assert alloc.get_cluster_assigned({"A"}) == set()
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from pci_rsi_sugeridor.cache import cargar_con_cache, rutas_cache
+from pci_rsi_sugeridor.core import cargar_y_preprocesar_pci
+
+pytest.importorskip("pyarrow")
+
+
+def _maestro(tmp_path, contenido="SITE;TAC;BAND;TECH;VENDOR\nS1;1;B28;LTE;\n"):
+    csv = tmp_path / "maestro.csv"
+    csv.write_text(contenido, encoding="utf-8")
+    return str(csv)
+
+
+def test_cache_se_reutiliza_y_se_invalida(tmp_path):
+    path = _maestro(tmp_path)
+    llamadas = []
+
+    def cargador():
+        llamadas.append(1)
+        return cargar_y_preprocesar_pci(path)
+
+    df1 = cargar_con_cache(path, cargador)
+    assert os.path.exists(rutas_cache(path)[0])
+    df2 = cargar_con_cache(path, cargador)
+    assert len(llamadas) == 1
+    assert df2.equals(df1)
+
+    # Mismo contenido con otro mtime: se valida por hash y no se recarga
+    os.utime(path, ns=(0, 0))
+    cargar_con_cache(path, cargador)
+    assert len(llamadas) == 1
+
+    _maestro(tmp_path, "SITE;TAC;BAND;TECH;VENDOR\nS2;1;N78;NR;HUAWEI\n")
+    df3 = cargar_con_cache(path, cargador)
+    assert len(llamadas) == 2
+    assert df3["SITE_CLEAN"].tolist() == ["S2"]
+
+    cargar_con_cache(path, cargador, reconstruir=True)
+    cargar_con_cache(path, cargador, usar_cache=False)
+    assert len(llamadas) == 4
+
+
+def test_cache_caducada_se_actualiza_con_el_actualizador(tmp_path):
+    path = _maestro(tmp_path)
+    cargar_con_cache(path, lambda: cargar_y_preprocesar_pci(path))
+    _maestro(tmp_path, "SITE;TAC;BAND;TECH;VENDOR\nS2;1;N78;NR;HUAWEI\n")
+
+    previos = []
+
+    def actualizador(df_prev):
+        previos.append(df_prev["SITE_CLEAN"].tolist())
+        return cargar_y_preprocesar_pci(path)
+
+    df = cargar_con_cache(path, pytest.fail, actualizador=actualizador)
+    assert previos == [["S1"]]
+    assert df["SITE_CLEAN"].tolist() == ["S2"]
+    # La versión actualizada queda cacheada
+    assert cargar_con_cache(path, pytest.fail).equals(df)
+
+
+def test_sin_pyarrow_se_avisa(tmp_path, monkeypatch, caplog):
+    from pci_rsi_sugeridor import cache
+
+    monkeypatch.setattr(cache, "_modulo_feather", lambda: None)
+    path = _maestro(tmp_path)
+    df = cargar_con_cache(path, lambda: cargar_y_preprocesar_pci(path))
+    assert len(df) == 1 and not os.path.exists(rutas_cache(path)[0])
+    assert any(r.levelname == "WARNING" for r in caplog.records)
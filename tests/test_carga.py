@@ -0,0 +1,132 @@
+import pandas as pd
+
+from pci_rsi_sugeridor.core import (
+    IndiceMaestro,
+    IndiceRSI5G,
+    agrupar_tech,
+    cargar_y_preprocesar_pci,
+    cargar_y_preprocesar_pci_lote,
+    cargar_y_preprocesar_rsi_5g,
+    compactar_maestro,
+    detectar_numero_sectores,
+    informe_memoria,
+    normaliza_banda,
+    planificar_lnr700,
+    sugerir_pci_rsi,
+)
+
+
+def test_preprocesado_vectorizado_igual_que_fila_a_fila(tmp_path):
+    csv = tmp_path / "maestro.csv"
+    csv.write_text(
+        "SITE;TAC;BAND;TECH;VENDOR\n"
+        " s1 ;1;B28;LTE;ericsson \n"
+        "S2;1;;NR;Huawei\n"
+        "S3;2;N78;;\n"
+        "S4;2;L900;NBIOT;HUAWEI\n"
+        "S5;3;B28;5G-NSA;ericsson \n",
+        encoding="utf-8",
+    )
+    df = cargar_y_preprocesar_pci(str(csv))
+    esperado_banda = [normaliza_banda(b, t) for b, t in zip(df["BAND"], df["TECH"])]
+    assert df["BAND_CLEAN"].tolist() == esperado_banda
+    assert df["TECH_GROUP"].tolist() == [agrupar_tech(t) for t in df["TECH"]]
+    assert df["VENDOR_CLEAN"].tolist() == [
+        "ERICSSON",
+        "HUAWEI",
+        "NAN",
+        "HUAWEI",
+        "ERICSSON",
+    ]
+    assert df["SITE_CLEAN"].tolist() == ["S1", "S2", "S3", "S4", "S5"]
+
+
+def test_maestro_compacto_da_los_mismos_resultados(df_maestro, tac_vecinos):
+    compacto = compactar_maestro(df_maestro.copy())
+    assert compacto["TAC"].dtype == "category"
+    assert str(compacto["RSQID"].dtype) == "Int32"
+    assert compacto["BCCH/SC/PCI"].dtype == "category"  # "3;4" es multivalor
+
+    for df in (df_maestro, compacto):
+        args = ("S1", "S1", "4G", "800", 3, df, pd.DataFrame(), tac_vecinos, 0, 0)
+        res = sugerir_pci_rsi(*args, False)
+        assert res == sugerir_pci_rsi(*args, False, indice=IndiceMaestro(df))
+        assert res[0][0]["pci's"] == "6;7;8"
+        assert res[0][0]["rsi's"] == "1;11;21"
+        assert detectar_numero_sectores("s3", df) == 2
+
+    informe = informe_memoria(df_maestro, compacto)
+    assert (
+        informe.loc["TOTAL", "bytes_compacto"] < informe.loc["TOTAL", "bytes_original"]
+    )
+
+
+def test_rsi_5g_toma_el_tac_del_maestro(tmp_path, df_maestro):
+    csv = tmp_path / "rsi.csv"
+    csv.write_text(
+        "NEID;FECHA;LOGICALROOTSEQUENCEINDEX\n"
+        "S2;2024-01-01;5\nS2;2024-02-01;7\nS9;2024-01-01;9\n",
+        encoding="utf-8",
+    )
+    for df in (df_maestro, compactar_maestro(df_maestro.copy())):
+        rsi = cargar_y_preprocesar_rsi_5g(str(csv), df).set_index("SITE_CLEAN")
+        assert rsi.loc["S2", "RSQID"] == "7"
+        assert rsi.loc["S2", "TAC"] == "200"
+        assert pd.isna(rsi.loc["S9", "TAC"])
+    indice = IndiceRSI5G(cargar_y_preprocesar_rsi_5g(str(csv), df_maestro))
+    assert indice.usados_cluster({"100", "200"}) == 1 << 7
+    assert indice.usados_cluster({"999"}) == 0
+
+
+def test_rsi_5g_indexa_todas_las_celdas(tmp_path, df_maestro, tac_vecinos):
+    csv = tmp_path / "rsi.csv"
+    csv.write_text(
+        "NEID;CELLID;FECHA;LOGICALROOTSEQUENCEINDEX\n"
+        "S2;S2Q1A;2024-01-01;5\nS2;S2Q1A;2024-02-01;0\n"
+        "S2;S2Q2A;2024-01-01;10\nS2;S2Q3A;2024-01-01;20\n",
+        encoding="utf-8",
+    )
+    df_rsi = cargar_y_preprocesar_rsi_5g(str(csv), df_maestro)
+    assert (df_rsi["TAC"] == "200").all()
+    # Una entrada por celda (la más reciente): el 5 ya no está en uso
+    indice = IndiceRSI5G(df_rsi)
+    assert indice.usados_cluster({"200"}) == (1 << 0) | (1 << 10) | (1 << 20)
+    _, det = sugerir_pci_rsi(
+        "S2", "S2", "5G", "700", 2, df_maestro, df_rsi, tac_vecinos, 0, 0, False
+    )
+    assert [d["RSI sugerido"] for d in det] == [1, 11]
+
+
+def test_rsi_5g_evita_los_del_cluster(df_maestro, tac_vecinos):
+    rsi_5g = pd.DataFrame(
+        {"SITE_CLEAN": ["S1", "S3"], "TAC": ["100", "300"], "RSQID": ["0;10", "1"]}
+    )
+    args = ("S2", "S2", "5G", "700", 2, df_maestro)
+    # Sin maestro RSI 5G, Ericsson parte del 0 con separación 10
+    _, det = sugerir_pci_rsi(*args, pd.DataFrame(), tac_vecinos, 0, 0, False)
+    assert [d["RSI sugerido"] for d in det] == [0, 10]
+    # TAC 100 es vecino de 200 y usa 0 y 10; el 1 está en el TAC 300, aislado
+    for datos in (rsi_5g, IndiceRSI5G(rsi_5g)):
+        _, det = sugerir_pci_rsi(*args, datos, tac_vecinos, 0, 0, False)
+        assert [d["RSI sugerido"] for d in det] == [1, 11]
+    *_, det5 = planificar_lnr700(
+        "S2", 2, df_maestro, rsi_5g, tac_vecinos, 0, 0, False, {}
+    )
+    assert [d["RSI sugerido"] for d in det5] == [1, 11]
+
+
+def test_carga_en_streaming_solo_el_lote(tmp_path, df_maestro, tac_vecinos):
+    csv = tmp_path / "maestro.csv"
+    df_maestro.assign(EXTRA="x").drop(
+        columns=["SITE_CLEAN", "BAND_CLEAN", "TECH_GROUP", "VENDOR_CLEAN"]
+    ).to_csv(csv, sep=";", index=False)
+
+    df = cargar_y_preprocesar_pci_lote(str(csv), {"S1"}, tac_vecinos, chunksize=2)
+    assert sorted(df["SITE_CLEAN"].unique()) == ["S1", "S2"]  # TAC 100 + vecino 200
+    assert "EXTRA" not in df.columns
+
+    completo = cargar_y_preprocesar_pci(str(csv))
+    args = ("S1", "S1", "4G", "800", 3)
+    assert sugerir_pci_rsi(
+        *args, df, pd.DataFrame(), tac_vecinos, 0, 0, False
+    ) == sugerir_pci_rsi(*args, completo, pd.DataFrame(), tac_vecinos, 0, 0, False)
@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from pci_rsi_sugeridor.core import (
+    IndiceMaestro,
+    cargar_y_preprocesar_pci,
+    compactar_maestro,
+)
+from pci_rsi_sugeridor.delta import aplicar_delta
+
+CABECERA = "SITE;TAC;BAND;TECH;VENDOR;CELLNAME;BCCH/SC/PCI;RSQID\n"
+V1 = [
+    "S1;100;800;4G;ERICSSON;S1M1A;0;0",
+    "S1;100;800;4G;ERICSSON;S1M2A;1;10",
+    "S2;200;800;4G;ERICSSON;S2M1A;3;30",
+    "S3;300;800;4G;HUAWEI;S3M1A;9;90",
+    "S3;300;800;4G;HUAWEI;S3M2A;10;91",
+]
+V2 = [
+    "S1;100;800;4G;ERICSSON;S1M1A;0;0",
+    "S1;100;800;4G;ERICSSON;S1M2A;5;10",  # modificada
+    "S2;200;800;4G;ERICSSON;S2M1A;3;30",
+    "S3;300;800;4G;HUAWEI;S3M1A;9;90",  # S3M2A eliminada
+    "S4;300;800;4G;HUAWEI;S4M1A;12;95",  # añadida
+]
+
+
+def _csv(path, filas):
+    path.write_text(CABECERA + "\n".join(filas) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("compacto", [False, True])
+def test_delta_igual_que_carga_completa(tmp_path, compacto):
+    prev = cargar_y_preprocesar_pci(_csv(tmp_path / "v1.csv", V1))
+    if compacto:
+        prev = compactar_maestro(prev)
+    indice = IndiceMaestro(prev)
+    nuevo_csv = _csv(tmp_path / "v2.csv", V2)
+
+    df, delta = aplicar_delta(prev, nuevo_csv, indice)
+
+    completo = cargar_y_preprocesar_pci(nuevo_csv)
+    if compacto:
+        completo = compactar_maestro(completo)
+    pd.testing.assert_frame_equal(df, completo, check_categorical=False)
+    assert (delta.añadidas, delta.eliminadas, delta.modificadas) == (1, 1, 1)
+    assert {str(t) for t in delta.tacs} == {"100", "300"}
+    assert delta.sites == {"S1", "S3", "S4"}
+    assert delta.clusters_tocados({"100": ["200"], "200": ["100"]}) == {
+        "100",
+        "200",
+        "300",
+    }
+
+    fresco = IndiceMaestro(completo)
+    for tac in ("100", "200", "300"):
+        assert indice.usados_cluster({tac}, "800", "4G") == fresco.usados_cluster(
+            {tac}, "800", "4G"
+        )
+    assert indice.filas_site("S4")["CELLNAME"].tolist() == ["S4M1A"]
+    assert indice.sectores_site("S3") == 1
+
+
+def test_delta_sin_cambios_devuelve_el_mismo_maestro(tmp_path):
+    csv = _csv(tmp_path / "v1.csv", V1)
+    prev = cargar_y_preprocesar_pci(csv)
+    df, delta = aplicar_delta(prev, csv)
+    assert df is prev and delta.vacio
+
+
+def test_delta_compacto_con_nulos_sin_cambios(tmp_path):
+    csv = _csv(tmp_path / "v1.csv", V1[:-1] + ["S3;300;800;4G;HUAWEI;S3M2A;10;"])
+    prev = compactar_maestro(cargar_y_preprocesar_pci(csv))
+    assert prev["RSQID"].dtype == "Int32"
+    df, delta = aplicar_delta(prev, csv)
+    assert df is prev and delta.vacio
+
+
+def test_delta_con_columna_quitada_reprocesa_todo(tmp_path):
+    prev = cargar_y_preprocesar_pci(_csv(tmp_path / "v1.csv", V1))
+    sin_vendor = tmp_path / "v2.csv"
+    sin_vendor.write_text(
+        CABECERA.replace("VENDOR;", "")
+        + "\n".join(f.replace(";ERICSSON", "").replace(";HUAWEI", "") for f in V1)
+        + "\n",
+        encoding="utf-8",
+    )
+    df, delta = aplicar_delta(prev, str(sin_vendor))
+    assert delta.completo and "VENDOR" not in df
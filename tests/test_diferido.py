@@ -0,0 +1,43 @@
+import pickle
+import subprocess
+import sys
+
+from pci_rsi_sugeridor import core
+from pci_rsi_sugeridor.diferido import Diferido, materializar
+from pci_rsi_sugeridor.io import cargar_maestros
+
+
+def test_diferido_carga_una_vez():
+    llamadas = []
+    dato = Diferido("x", lambda: llamadas.append(1) or [3, 4])
+    assert not dato.cargado and llamadas == []
+    assert len(dato) == 2 and dato[0] == 3 and 4 in dato
+    assert materializar(dato) == [3, 4] and materializar(5) == 5
+    assert llamadas == [1]
+    assert pickle.loads(pickle.dumps(dato)) == [3, 4]
+
+
+def test_cargar_maestros_no_toca_lo_que_no_se_usa(
+    tmp_path, monkeypatch, df_maestro, tac_vecinos
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(core, "cargar_y_preprocesar_pci", lambda _: df_maestro)
+
+    def rsi_5g(*_):
+        raise AssertionError("no debería leerse el RSI 5G")
+
+    monkeypatch.setattr(core, "cargar_y_preprocesar_rsi_5g", rsi_5g)
+    maestro, indice, df_rsi_5g, grafo = cargar_maestros(usar_cache=False)
+    assert not any(d.cargado for d in (maestro, indice, df_rsi_5g, grafo))
+    assert indice.filas_site("S1")["CELLNAME"].tolist() == ["S1M1A", "S1M2A", "S1M3A"]
+    assert maestro.cargado and not df_rsi_5g.cargado and not grafo.cargado
+
+
+def test_version_no_importa_pandas():
+    codigo = (
+        "import sys; sys.argv = ['pci-rsi', '--version']\n"
+        "from pci_rsi_sugeridor import io\n"
+        "try:\n    io.main()\nexcept SystemExit:\n    pass\n"
+        "assert 'pandas' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", codigo], check=True, capture_output=True)
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from pci_rsi_sugeridor.core import ClusterAllocator
+from pci_rsi_sugeridor.escenarios import (
+    Escenario,
+    comparar_escenarios,
+    conflictos_planificacion,
+    planificar_escenarios,
+)
+from pci_rsi_sugeridor.io import _leer_escenario
+
+
+def test_fork_copy_on_write():
+    base = ClusterAllocator()
+    base.register_assigned({"100"}, [1, 2])
+    hijo = base.fork()
+    nieto = hijo.fork()
+    nieto.register_assigned({"100"}, [5])
+    hijo.register_assigned({"300"}, [7])
+    assert nieto.get_cluster_assigned({"100"}) == {1, 2, 5}
+    assert hijo.get_cluster_assigned({"100"}) == {1, 2}
+    assert base.get_cluster_assigned({"300"}) == set()
+    assert base.get_unused_pci("ERICSSON", "800", set(), 0)[:3] == [0, 3, 4]
+    nieto.reset()
+    assert nieto.get_cluster_assigned({"100"}) == {1, 2}
+    # Lo heredado sigue contando como asignado tras el reset del fork
+    assert nieto.get_unused_pci("ERICSSON", "800", set(), 0)[:3] == [0, 3, 4]
+
+
+def test_escenarios_lado_a_lado(df_maestro, tac_vecinos):
+    peticiones = pd.DataFrame({"SITE": ["S1"], "TECH": ["4G"], "BAND": ["800"]})
+    base = ClusterAllocator()
+    base.register_assigned(frozenset({"100", "200"}), [6, 7, 8])
+    resultados = planificar_escenarios(
+        [Escenario("A", peticiones), Escenario("B", peticiones, min_pci=30)],
+        df_maestro,
+        pd.DataFrame(),
+        tac_vecinos,
+        base=base,
+    )
+    assert resultados["A"][0]["pci's"].tolist() == ["9;10;11"]
+    assert resultados["B"][0]["pci's"].tolist() == ["30;31;32"]
+    # Los forks no tocan el allocator base
+    assert base.get_cluster_assigned(frozenset({"100", "200"})) == {6, 7, 8}
+
+    comparacion = comparar_escenarios(resultados, df_maestro, tac_vecinos)
+    assert list(comparacion.columns) == ["A", "B"]
+    assert comparacion.loc["RELLENO_PCI_%"].tolist() == [100.0, 100.0]
+    assert comparacion.loc["PCI_COLISION"].tolist() == [0, 0]
+
+
+def test_conflictos_planificacion(df_maestro, tac_vecinos):
+    # El PCI 3 ya lo usa S2 en el TAC 200, vecino del 100
+    resumen = pd.DataFrame(
+        [
+            {
+                "Elemento": "S1",
+                "Tecnología": "4G_800",
+                "pci's": "3",
+                "rsi's": "",
+                "TAC": "100",
+            }
+        ]
+    )
+    conflictos = conflictos_planificacion(resumen, df_maestro, tac_vecinos)
+    assert conflictos["PCI_COLISION"] == 1
+    assert conflictos["RSI_SOLAPE"] == 0
+
+
+def test_leer_escenario_usa_min_rsi(tmp_path):
+    path = tmp_path / "lote.csv"
+    path.write_text("SITE;TECH;BAND\nS1;4G;800\n", encoding="utf-8")
+    esc = _leer_escenario(f"{path}:20", min_pci=0, min_rsi=50)
+    assert (esc.nombre, esc.min_pci, esc.min_rsi) == ("lote@20", 20, 50)
@@ -0,0 +1,57 @@
+import time
+
+import pandas as pd
+
+from pci_rsi_sugeridor.core import ClusterAllocator, IndiceMaestro, planificar_grupos
+from pci_rsi_sugeridor.estado import EstadoAllocator, leer_estado
+
+
+def test_reservas_persisten_y_se_fusionan(tmp_path):
+    path = str(tmp_path / "estado.bin")
+    a, b = EstadoAllocator(path), EstadoAllocator(path)
+    a.reservar("100", "ericsson", "800", [0, 1, 2])
+    b.reservar("200", "HUAWEI", "800", [3, ""])
+    a.confirmar()
+    b.confirmar()  # no pisa lo que confirmó `a`
+
+    c = EstadoAllocator(path)
+    assert len(c) == 2
+    assert c.reservados({"100", "200"}, "800") == 0b1111
+    assert c.reservados({"100"}, "1800") == 0
+    assert not (tmp_path / "estado.bin.lock").exists()
+
+
+def test_liberar_y_caducidad(tmp_path):
+    path = str(tmp_path / "estado.bin")
+    estado = EstadoAllocator(path)
+    estado.reservar("100", "ERICSSON", "800", [0])
+    estado.reservar("100", "ERICSSON", "1800", [5])
+    estado.confirmar()
+
+    otra = EstadoAllocator(path)
+    assert otra.liberar(banda="800") == 1
+    otra.confirmar()
+    assert list(leer_estado(path)) == [("100", "ERICSSON", "1800")]
+
+    caduca = EstadoAllocator(path, caducidad_h=-1)
+    caduca.reservar("300", "HUAWEI", "800", [7])
+    caduca.confirmar()
+    assert ("300", "HUAWEI", "800") not in EstadoAllocator(path)._reservas
+    assert time.time() < leer_estado(path)[("100", "ERICSSON", "1800")][1]
+
+
+def test_ejecuciones_sucesivas_no_repiten_pcis(tmp_path, df_maestro, tac_vecinos):
+    path = str(tmp_path / "estado.bin")
+    indice = IndiceMaestro(df_maestro)
+    args = ([("S1", "800", "4G")], df_maestro, pd.DataFrame(), tac_vecinos, False)
+
+    estado = EstadoAllocator(path)
+    ((primera, _),) = planificar_grupos(*args, indice, estado=estado)
+    estado.confirmar()
+    ((segunda, _),) = planificar_grupos(*args, indice, estado=EstadoAllocator(path))
+    assert primera[0]["pci's"] == "6;7;8"
+    assert segunda[0]["pci's"] == "9;10;11"
+
+    alloc = ClusterAllocator(EstadoAllocator(path))
+    assert alloc.get_cluster_assigned_bitmap({"200"}, "800") == 0
+    assert alloc.get_cluster_assigned_bitmap({"100"}, "800") == 0b111 << 6
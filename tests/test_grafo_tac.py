@@ -0,0 +1,54 @@
+import openpyxl
+import pandas as pd
+
+from pci_rsi_sugeridor import core
+from pci_rsi_sugeridor.core import ClusterAllocator, IndiceMaestro, sugerir_pci_rsi
+from pci_rsi_sugeridor.grafo_tac import GrafoTAC, cargar_grafo_tac
+
+
+def test_grafo_se_usa_como_el_dict(tac_vecinos):
+    grafo = GrafoTAC(tac_vecinos)
+    assert dict(grafo.items()) == tac_vecinos
+    assert grafo.get("100") == ["200"] and grafo.get("999", []) == []
+    assert "300" in grafo and len(grafo) == 3
+
+    c100 = grafo.cluster("100")
+    assert c100 == frozenset({"100", "200"}) and grafo.cluster(100) is c100
+    assert c100 & grafo.cluster("200")
+    assert not c100 & grafo.cluster("300")
+    assert grafo.cluster("999") == frozenset({"999"})
+
+
+def test_allocator_con_clusters_del_grafo(tac_vecinos):
+    grafo = GrafoTAC(tac_vecinos)
+    allocator = ClusterAllocator()
+    allocator.register_assigned(grafo.cluster("100"), [1, 2])
+    assert allocator.get_cluster_assigned({"100", "200"}) == {1, 2}
+
+
+def test_sugerir_igual_con_grafo_y_con_dict(df_maestro, tac_vecinos):
+    indice = IndiceMaestro(df_maestro)
+    for site in ("S1", "S3"):
+        args = (site, site, "4G", "800", 3, df_maestro, pd.DataFrame())
+        con_dict = sugerir_pci_rsi(*args, tac_vecinos, 0, 0, False, indice=indice)
+        con_grafo = sugerir_pci_rsi(
+            *args, GrafoTAC(tac_vecinos), 0, 0, False, indice=indice
+        )
+        assert con_grafo == con_dict
+
+
+def test_cargar_grafo_tac_usa_la_cache(tmp_path, monkeypatch):
+    xlsx = str(tmp_path / "TACAreas.xlsx")
+    wb = openpyxl.Workbook()
+    for fila in (["AREA", "TAC", "TAC_VECINO"], ["Z", "1", "2"], ["Z", "2", "1"]):
+        wb.active.append(fila)
+    wb.save(xlsx)
+
+    grafo = cargar_grafo_tac(xlsx)
+    assert dict(grafo.items()) == {"1": ["2"], "2": ["1"]}
+
+    def no_leer(_):
+        raise AssertionError("el libro no debería volver a leerse")
+
+    monkeypatch.setattr(core, "preprocesar_TACAreas", no_leer)
+    assert dict(cargar_grafo_tac(xlsx).items()) == {"1": ["2"], "2": ["1"]}
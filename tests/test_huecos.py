@@ -0,0 +1,27 @@
+from pci_rsi_sugeridor.bitmaps import a_bitmap
+from pci_rsi_sugeridor.huecos import (
+    menor_bit,
+    primer_libre_residuo,
+    primera_base_libre,
+    primera_secuencia_libre,
+)
+
+
+def test_primera_base_libre():
+    libres = a_bitmap([1, 2, 3, 4, 6, 7, 9, 10, 11, 12], 504)
+    assert primera_base_libre(libres, 2) == 3
+    assert primera_base_libre(libres, 4) == 9
+    assert primera_base_libre(libres, 5) == -1
+
+
+def test_primer_libre_residuo():
+    libres = a_bitmap([3, 4, 8], 504)
+    assert [primer_libre_residuo(libres, r) for r in range(3)] == [3, 4, 8]
+    assert primer_libre_residuo(a_bitmap([3, 6], 504), 1) == -1
+
+
+def test_primera_secuencia_libre():
+    libres = a_bitmap([0, 10, 15, 25, 30, 35], 838)
+    assert primera_secuencia_libre(libres, 3, 10) == 15
+    assert primera_secuencia_libre(libres, 4, 10) == -1
+    assert menor_bit(0) == -1
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from pci_rsi_sugeridor.bitmaps import a_lista
+from pci_rsi_sugeridor.core import (
+    IndiceMaestro,
+    detectar_numero_sectores,
+    sugerir_pci_rsi,
+)
+
+
+def test_indice_usados_cluster(df_maestro):
+    indice = IndiceMaestro(df_maestro)
+    pcis, rsis = indice.usados_cluster({"100", "200"}, "800", "4G")
+    assert a_lista(pcis) == [0, 1, 2, 3, 4]
+    assert a_lista(rsis) == [0, 10, 20, 30]
+    assert indice.usados_cluster({"999"}, "800", "4G") == (0, 0)
+
+
+def test_sugerir_con_indice_igual_que_sin_indice(df_maestro, tac_vecinos):
+    args = ("S1", "S1", "4G", "800", 3, df_maestro, pd.DataFrame(), tac_vecinos)
+    sin = sugerir_pci_rsi(*args, 0, 0, False)
+    con = sugerir_pci_rsi(*args, 0, 0, False, indice=IndiceMaestro(df_maestro))
+    assert sin == con
+    assert sin[0][0]["pci's"] == "6;7;8"
+
+
+def test_indice_por_site(df_maestro):
+    df = df_maestro.copy()
+    df.loc[len(df)] = df.iloc[0]
+    df.loc[len(df) - 1, "CELLNAME"] = "S1M01A"  # mismo sector 1
+    indice = IndiceMaestro(df)
+    assert indice.filas_site("S2")["CELLNAME"].tolist() == ["S2M1A", "S2Q1A"]
+    assert indice.filas_site("NOPE").empty
+    for site in ["S1", "s2", "S3", "NOPE"]:
+        assert detectar_numero_sectores(site, df, indice) == detectar_numero_sectores(
+            site, df
+        )
+    assert indice.sectores_site("S1") == 3
+    assert indice.sectores_site("S3") == 2
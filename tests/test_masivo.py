@@ -0,0 +1,178 @@
+import pandas as pd
+
+from pci_rsi_sugeridor import core
+from pci_rsi_sugeridor.core import (
+    ClusterAllocator,
+    IndiceMaestro,
+    componentes_tac,
+    masivo_OSP_VDF,
+    planificar_grupo,
+    planificar_grupos,
+    planificar_lnr700_lote,
+    planificar_lote,
+)
+from pci_rsi_sugeridor.diferido import Diferido
+
+GRUPOS = [("S1", "800", "4G"), ("S3", "800", "4G"), ("S2", "700", "5G")]
+
+
+def test_componentes_tac(df_maestro, tac_vecinos):
+    indice = IndiceMaestro(df_maestro)
+    componentes = componentes_tac(GRUPOS + [("NOPE", "800", "4G")], indice, tac_vecinos)
+    assert componentes == [
+        [("S1", "800", "4G"), ("S2", "700", "5G")],  # TAC 100 y 200 son vecinos
+        [("S3", "800", "4G")],
+        [("NOPE", "800", "4G")],
+    ]
+
+
+def test_paralelo_igual_que_secuencial(df_maestro, tac_vecinos):
+    indice = IndiceMaestro(df_maestro)
+    args = (GRUPOS, df_maestro, pd.DataFrame(), tac_vecinos, False, indice)
+    secuencial = list(planificar_grupos(*args))
+    assert list(planificar_grupos(*args, workers=2)) == secuencial
+
+
+def test_masivo_escribe_salidas(tmp_path, df_maestro, tac_vecinos):
+    entrada = tmp_path / "peticion.csv"
+    entrada.write_text("SITE;TECH;BAND\nS1;4G;800\nS3;4G;L800\n", encoding="utf-8")
+    resumen, detalle = tmp_path / "resumen.csv", tmp_path / "detalle.csv"
+    masivo_OSP_VDF(
+        str(entrada),
+        "",
+        str(resumen),
+        str(detalle),
+        False,
+        df_maestro,
+        pd.DataFrame(),
+        tac_vecinos,
+        workers=2,
+    )
+    df_res = pd.read_csv(resumen, sep=";", dtype=str, encoding="utf-8-sig")
+    assert df_res["Elemento"].tolist() == ["S1", "S3"]
+    assert len(pd.read_csv(detalle, sep=";", encoding="utf-8-sig")) == 5
+
+
+def _leer(path):
+    return pd.read_csv(path, sep=";", dtype=str, encoding="utf-8-sig").fillna("")
+
+
+def test_planificar_lote_igual_que_masivo(tmp_path, df_maestro, tac_vecinos):
+    peticiones = pd.DataFrame(
+        {
+            "SITE OSP": ["S1", "S3", "S2"],
+            "TECH": ["4G", "4G", "5G"],
+            "BANDA": ["800", "L800", "700"],
+        }
+    )
+    res, det = planificar_lote(peticiones, df_maestro, pd.DataFrame(), tac_vecinos)
+
+    entrada = tmp_path / "peticion.csv"
+    peticiones.to_csv(entrada, sep=";", index=False)
+    resumen, detalle = tmp_path / "resumen.csv", tmp_path / "detalle.csv"
+    masivo_OSP_VDF(
+        str(entrada),
+        "",
+        str(resumen),
+        str(detalle),
+        False,
+        df_maestro,
+        pd.DataFrame(),
+        tac_vecinos,
+    )
+    pd.testing.assert_frame_equal(res.astype(str), _leer(resumen))
+    pd.testing.assert_frame_equal(det.astype(str), _leer(detalle))
+
+
+def test_planificar_lote_con_allocator_compartido(df_maestro, tac_vecinos):
+    peticiones = pd.DataFrame(
+        {"SITE": ["S1", "S1"], "TECH": "4G", "BAND": ["800", "L800"]}
+    )
+    # Dos peticiones del mismo site y banda forman un único grupo
+    res, _ = planificar_lote(peticiones, df_maestro, pd.DataFrame(), tac_vecinos)
+    assert len(res) == 1
+
+    allocator = ClusterAllocator()
+    dos = pd.DataFrame({"SITE": ["S1", "S2"], "TECH": "4G", "BAND": "800"})
+    res, _ = planificar_lote(
+        dos, df_maestro, pd.DataFrame(), tac_vecinos, allocator=allocator
+    )
+    # S2 comparte cluster con S1 y no repite los PCIs que se acaban de asignar
+    assert res["pci's"].tolist() == ["6;7;8", "9"]
+
+
+def _con_4g_700(df_maestro):
+    fila = df_maestro.iloc[[4]].assign(
+        TECH="4G", TECH_GROUP="4G", CELLNAME="S2L1A", **{"BCCH/SC/PCI": "1"}
+    )
+    return pd.concat([df_maestro, fila], ignore_index=True)
+
+
+def test_lnr700_lote_coordina_mod3(df_maestro, tac_vecinos):
+    df = _con_4g_700(df_maestro)
+    sitios = [("S2", 2), ("S2", 2)]
+    args = (df, pd.DataFrame(), tac_vecinos, 0, 0, False)
+    (r4, d4, r5, d5), _ = planificar_lnr700_lote(sitios, *args, IndiceMaestro(df))
+    pcis_4g = [d["PCI sugerido"] for d in d4]
+    pcis_5g = [d["PCI sugerido"] for d in d5]
+    assert pcis_4g == [3, 4]  # la base 0 no vale: el 1 lo usa la 4G del maestro
+    assert pcis_5g == [0, 1]
+    assert [p % 3 for p in pcis_5g] == [p % 3 for p in pcis_4g]
+    # Sin índice (filtrando el maestro) sale lo mismo
+    assert list(planificar_lnr700_lote(sitios, *args)) == list(
+        planificar_lnr700_lote(sitios, *args, IndiceMaestro(df))
+    )
+    # Con un allocator compartido el segundo site no repite PCIs
+    _, (_, d4b, _, d5b) = planificar_lnr700_lote(
+        sitios, *args, allocator=ClusterAllocator()
+    )
+    # (el 6 ya lo usa la 5G del maestro)
+    assert [d["PCI sugerido"] for d in d4b + d5b] == [6, 7, 9, 10]
+
+
+def test_rachas_700_igual_que_por_grupo(df_maestro, tac_vecinos):
+    df = _con_4g_700(df_maestro)
+    indice = IndiceMaestro(df)
+    grupos = [("S2", "700", "5G"), ("S2", "700", "4G"), ("S1", "800", "4G")]
+    args = (df, pd.DataFrame(), tac_vecinos, False, indice)
+    assert list(planificar_grupos(grupos, *args)) == [
+        planificar_grupo(site, band, tech, *args) for site, band, tech in grupos
+    ]
+
+
+def test_lote_indexa_el_rsi_5g_una_vez(monkeypatch, df_maestro, tac_vecinos):
+    construidos = []
+
+    class Contado(core.IndiceRSI5G):
+        def __init__(self, df):
+            construidos.append(1)
+            super().__init__(df)
+
+    monkeypatch.setattr(core, "IndiceRSI5G", Contado)
+    rsi_5g = pd.DataFrame({"SITE_CLEAN": ["S1"], "TAC": ["100"], "RSQID": ["0"]})
+    peticiones = pd.DataFrame(
+        {"SITE": ["S2", "S2"], "TECH": "5G", "BAND": ["78", "700"]}
+    )
+    planificar_lote(peticiones, df_maestro, rsi_5g, tac_vecinos)
+    assert len(construidos) == 1  # un grupo 78 y uno de 700 con celdas 5G
+
+
+def test_paralelo_indexa_el_rsi_5g_diferido_en_el_padre(
+    monkeypatch, df_maestro, tac_vecinos
+):
+    construidos = []
+
+    class Contado(core.IndiceRSI5G):
+        def __init__(self, df):
+            construidos.append(1)
+            super().__init__(df)
+
+    monkeypatch.setattr(core, "IndiceRSI5G", Contado)
+    rsi_5g = Diferido(
+        "rsi_5g",
+        lambda: pd.DataFrame({"SITE_CLEAN": ["S1"], "TAC": ["100"], "RSQID": ["0"]}),
+    )
+    indice = IndiceMaestro(df_maestro)
+    args = (GRUPOS, df_maestro, rsi_5g, tac_vecinos, False, indice)
+    list(planificar_grupos(*args, workers=2))
+    assert rsi_5g.cargado and len(construidos) == 1  # los workers lo heredan
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pandas as pd
+
+from pci_rsi_sugeridor import io
+from pci_rsi_sugeridor.core import ClusterAllocator, IndiceMaestro, sugerir_pci_rsi
+from pci_rsi_sugeridor.memo import MemoResultados, huella_ficheros, memorizar
+
+
+def test_memo_lru_acotada(tmp_path):
+    memo = MemoResultados(str(tmp_path), max_mb=250 / 2**20)
+    for i, clave in enumerate(["a", "b"]):
+        memo.escribir(clave, {"x": "." * 90})
+        os.utime(memo._path(clave), ns=(i, i))
+    # Leer "a" la renueva: al no caber la tercera se descarta "b"
+    assert memo.leer("a") is not None
+    memo.escribir("c", {"x": "." * 90})
+    assert [memo.leer(c) is not None for c in "abc"] == [True, False, True]
+
+
+def test_memorizar_reaplica_el_allocator(tmp_path, df_maestro, tac_vecinos):
+    memo = MemoResultados(str(tmp_path / "memo"))
+    indice = IndiceMaestro(df_maestro)
+    llamadas = []
+
+    def consulta(allocator, huella="h1"):
+        def calcular():
+            llamadas.append(1)
+            return sugerir_pci_rsi(
+                "S1",
+                "S1",
+                "4G",
+                "800",
+                3,
+                df_maestro,
+                pd.DataFrame(),
+                tac_vecinos,
+                0,
+                0,
+                False,
+                allocator,
+                indice=indice,
+            )
+
+        return memorizar(
+            memo, "sugerir_pci_rsi", ["S1"], huella, allocator, calcular, tac_vecinos
+        )
+
+    primero, nuevo = ClusterAllocator(), ClusterAllocator()
+    resumen, _ = consulta(primero)
+    assert consulta(nuevo) == (resumen, consulta(ClusterAllocator())[1])
+    assert len(llamadas) == 1
+    # El acierto deja el allocator igual que el cálculo
+    assert nuevo.huella() == primero.huella()
+    assert resumen[0]["pci's"] == "6;7;8"
+
+    # Otro estado del allocator u otras entradas no reutilizan el resultado
+    assert consulta(nuevo)[0][0]["pci's"] == "9;10;11"
+    consulta(ClusterAllocator(), huella="h2")
+    assert len(llamadas) == 3
+
+
+def test_huella_ficheros(tmp_path):
+    f = tmp_path / "m.csv"
+    antes = huella_ficheros([str(f)])
+    f.write_text("x")
+    assert huella_ficheros([str(f)]) != antes
+
+
+def test_cli_memo_no_mezcla_valores_sin_normalizar(
+    tmp_path, monkeypatch, capsys, df_maestro
+):
+    monkeypatch.chdir(tmp_path)
+    columnas = ["SITE", "TAC", "BAND", "TECH", "VENDOR", "CELLNAME"]
+    df_maestro[columnas + ["BCCH/SC/PCI", "RSQID"]].to_csv(
+        "am_cellinfo_etldb.csv", sep=";", index=False
+    )
+
+    def ejecutar(site, tech):
+        argv = ["pci-rsi", "-m", "ZN", "-i", site, "-t", tech, "-b", "800"]
+        monkeypatch.setattr(sys, "argv", argv + ["--no-cache"])
+        io.main()
+        return capsys.readouterr().out
+
+    assert "LTE_800" in ejecutar("s1", "LTE")
+    # Misma petición normalizada: no debe devolver la salida memorizada de antes
+    salida = ejecutar("S1", "4G")
+    assert "4G_800" in salida and "LTE_800" not in salida
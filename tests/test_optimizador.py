@@ -0,0 +1,62 @@
+import pandas as pd
+
+from pci_rsi_sugeridor.bitmaps import a_bitmap
+from pci_rsi_sugeridor.core import IndiceMaestro, planificar_grupos
+from pci_rsi_sugeridor.optimizador import (
+    NodoPCI,
+    _completar,
+    bases_validas,
+    colorear_dsatur,
+    greedy_en_orden,
+    optimizar_pcis,
+)
+
+
+def _nodo(libres, vecinos):
+    nodo = NodoPCI(("S", "800"), "1", 3, a_bitmap(libres, 504))
+    nodo.vecinos = vecinos
+    return nodo
+
+
+def test_bases_validas():
+    libres = a_bitmap([0, 1, 2, 4, 5, 6, 7, 8, 9], 504)
+    assert bases_validas(libres, 3) == a_bitmap([0, 6], 504)
+    assert bases_validas(libres, 4) == a_bitmap([6], 504)
+
+
+def test_dsatur_rellena_lo_que_el_greedy_deja_a_medias():
+    # A puede usar las bases 0 y 3; B, vecino de A, solo la 0
+    nodos = [_nodo(range(6), [1]), _nodo(range(3), [0])]
+    greedy = greedy_en_orden(nodos)
+    assert greedy == [[0, 1, 2], ["", "", ""]]
+    bases = colorear_dsatur(nodos)
+    assert _completar(nodos, bases, 0) == [[3, 4, 5], [0, 1, 2]]
+
+
+def test_dsatur_con_presupuesto_agotado_asigna_en_orden():
+    nodos = [_nodo(range(6), [1]), _nodo(range(6), [0])]
+    assert colorear_dsatur(nodos, presupuesto_s=-1) == {0: 0, 1: 3}
+
+
+def test_optimizar_pcis_fija_los_pcis_del_masivo(df_maestro, tac_vecinos):
+    indice = IndiceMaestro(df_maestro)
+    grupos = [("S1", "800", "4G"), ("S2", "800", "4G"), ("S2", "700", "5G")]
+    asignacion, stats = optimizar_pcis(grupos, df_maestro, tac_vecinos, indice)
+    assert stats["peticiones"] == 2  # la banda 700 sigue su planificación propia
+    assert stats["completas_optimizador"] >= stats["completas_greedy"]
+    # S1 y S2 son vecinos: no comparten base
+    assert asignacion[("S1", "800")]["100"] != asignacion[("S2", "800")]["200"]
+
+    resultados = list(
+        planificar_grupos(
+            grupos,
+            df_maestro,
+            pd.DataFrame(),
+            tac_vecinos,
+            False,
+            indice,
+            pcis_por_grupo=asignacion,
+        )
+    )
+    resumen_s1 = resultados[0][0][0]
+    assert resumen_s1["pci's"] == ";".join(map(str, asignacion[("S1", "800")]["100"]))
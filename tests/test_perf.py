@@ -0,0 +1,41 @@
+from pci_rsi_sugeridor.perf import Perfil
+
+
+def test_perfil_inactivo_no_registra():
+    perfil = Perfil()
+    with perfil.cronometro("etapa"):
+        pass
+    perfil.contar("eventos")
+    perfil.muestra("latencia", 1.0)
+    assert perfil.informe() == {"tiempos": {}, "contadores": {}, "histogramas": {}}
+
+
+def test_perfil_tiempos_contadores_e_histograma():
+    perfil = Perfil()
+    perfil.activo = True
+    for _ in range(2):
+        with perfil.cronometro("etapa"):
+            pass
+    perfil.contar("eventos", 3)
+    for v in (0.05, 2.0, 20.0):
+        perfil.muestra("latencia", v)
+    informe = perfil.informe()
+    assert informe["tiempos"]["etapa"]["llamadas"] == 2
+    assert informe["contadores"] == {"eventos": 3}
+    hist = informe["histogramas"]["latencia"]
+    assert hist["n"] == 3 and hist["max"] == 20.0
+    assert hist["cubetas"]["<=0.1"] == 1 and hist["cubetas"]["<=50"] == 1
+
+
+def test_perfil_fusionar():
+    a, b = Perfil(), Perfil()
+    a.activo = b.activo = True
+    a.contar("grupos")
+    b.contar("grupos", 2)
+    b.sumar_tiempo("etapa", 0.5)
+    b.muestra("latencia", 1.0)
+    a.fusionar(b.exportar())
+    informe = a.informe()
+    assert informe["contadores"]["grupos"] == 3
+    assert informe["tiempos"]["etapa"] == {"total_s": 0.5, "llamadas": 1}
+    assert informe["histogramas"]["latencia"]["n"] == 1
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from pci_rsi_sugeridor.salidas import SalidaMasiva
+
+RESUMEN = [{"Elemento": "S1", "pci's": "0;1;2"}]
+DETALLE = [
+    {"NODO VDF": "S1", "Celda": f"S1M{i}A", "PCI sugerido": i} for i in range(3)
+] + [{"NODO VDF": "S1", "Celda": "S1M4A", "PCI sugerido": ""}]
+
+
+def test_salida_masiva_escribe_por_grupos(tmp_path, capsys):
+    resumen, detalle = tmp_path / "resumen.csv", tmp_path / "detalle.csv"
+    with SalidaMasiva(
+        str(resumen), str(detalle), ["parquet", "xlsx"], max_vista=2
+    ) as salida:
+        salida.añadir(RESUMEN, DETALLE[:2])
+        salida.añadir([], [])
+        salida.añadir(RESUMEN, DETALLE[2:])
+    salida.imprimir_vista()
+
+    df_det = pd.read_csv(detalle, sep=";", dtype=str, encoding="utf-8-sig")
+    assert df_det["Celda"].tolist() == [d["Celda"] for d in DETALLE]
+    assert df_det["PCI sugerido"].fillna("").tolist() == ["0", "1", "2", ""]
+    assert len(pd.read_csv(resumen, sep=";", encoding="utf-8-sig")) == 2
+    assert len(pd.read_parquet(tmp_path / "detalle.parquet")) == 4
+    assert len(pd.read_excel(tmp_path / "resumen.xlsx")) == 2
+
+    salida_consola = capsys.readouterr().out
+    assert "4 filas" in salida_consola and "mostradas 2 filas" in salida_consola
+    assert "S1M4A" not in salida_consola
@@ -0,0 +1,102 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from pci_rsi_sugeridor import servidor
+from pci_rsi_sugeridor.core import IndiceMaestro
+
+
+@pytest.fixture
+def url(monkeypatch, df_maestro, tac_vecinos):
+    datos = (df_maestro, IndiceMaestro(df_maestro), pd.DataFrame(), tac_vecinos)
+    monkeypatch.setattr(servidor, "cargar_maestros", lambda **_: datos)
+    estado = servidor.EstadoServidor()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), servidor.crear_manejador(estado))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def _post(url, ruta, cuerpo):
+    req = urllib.request.Request(url + ruta, data=json.dumps(cuerpo).encode())
+    with urllib.request.urlopen(req) as r:
+        return json.load(r)
+
+
+def test_sugerir_mantiene_el_allocator(url):
+    peticion = {"site": "S1", "tech": "4G", "band": "800"}
+    primera = _post(url, "/sugerir", peticion)
+    assert primera["resumen"][0]["pci's"] == "6;7;8"
+    # La segunda petición ve los PCIs ya asignados por la primera
+    assert _post(url, "/sugerir", peticion)["resumen"][0]["pci's"] == "9;10;11"
+    _post(url, "/reset", {})
+    assert _post(url, "/sugerir", peticion)["resumen"][0]["pci's"] == "6;7;8"
+
+
+def test_estado_recarga_y_errores(url):
+    with urllib.request.urlopen(url + "/estado") as r:
+        assert json.load(r)["filas_maestro"] == 7
+    assert _post(url, "/recargar", {})["tacs"] == 3
+    assert len(_post(url, "/lnr700", {"site": "S2"})["detalle"]) == 2  # 4G + 5G
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _post(url, "/sugerir", {"site": "NOPE", "tech": "4G", "band": "800"})
+    assert e.value.code == 400
+
+
+def test_recargar_incremental(url, monkeypatch, tmp_path, df_maestro):
+    filas = df_maestro[
+        ["SITE", "TAC", "BAND", "TECH", "VENDOR", "CELLNAME", "BCCH/SC/PCI", "RSQID"]
+    ].fillna("")
+    nuevas = [
+        ("S4", "100", "800", "4G", "ERICSSON", f"S4M{i}A", str(5 + i), "")
+        for i in (1, 2, 3)
+    ]
+    csv = tmp_path / "maestro.csv"
+    pd.concat([filas, pd.DataFrame(nuevas, columns=filas.columns)]).to_csv(
+        csv, sep=";", index=False
+    )
+    monkeypatch.setattr(servidor, "MAESTRO_PCI", str(csv))
+
+    delta = _post(url, "/recargar", {"incremental": True})["delta"]
+    assert delta["añadidas"] == 3 and "100" in delta["tacs_tocados"]
+    peticion = {"site": "S1", "tech": "4G", "band": "800"}
+    assert _post(url, "/sugerir", peticion)["resumen"][0]["pci's"] == "9;10;11"
+
+
+def test_recargar_incremental_con_tac_cambiado(url, monkeypatch, tmp_path):
+    cargas = []
+    cargar = servidor.cargar_maestros
+    monkeypatch.setattr(
+        servidor, "cargar_maestros", lambda **kw: cargas.append(1) or cargar(**kw)
+    )
+    tac_areas = tmp_path / "TACAreas.xlsx"
+    tac_areas.write_bytes(b"nuevo")
+    monkeypatch.setattr(servidor, "TAC_AREAS", str(tac_areas))
+    # El grafo de TAC no admite delta: se recarga todo en lugar de sellar
+    # la huella nueva sobre el grafo viejo
+    delta = _post(url, "/recargar", {"incremental": True})["delta"]
+    assert delta["completo"] and cargas == [1]
+
+
+def test_recargar_incremental_reprocesado_completo(
+    url, monkeypatch, tmp_path, df_maestro
+):
+    filas = df_maestro[
+        ["SITE", "TAC", "BAND", "TECH", "VENDOR", "CELLNAME", "BCCH/SC/PCI", "RSQID"]
+    ].fillna("")
+    # Una columna nueva obliga a reprocesar todo; S2 pasa de los PCIs 3;4 al 6
+    filas = filas.assign(EXTRA="x")
+    filas.loc[filas["CELLNAME"] == "S2M1A", "BCCH/SC/PCI"] = "6"
+    csv = tmp_path / "maestro.csv"
+    filas.to_csv(csv, sep=";", index=False)
+    monkeypatch.setattr(servidor, "MAESTRO_PCI", str(csv))
+
+    assert _post(url, "/recargar", {"incremental": True})["delta"]["completo"]
+    peticion = {"site": "S1", "tech": "4G", "band": "800"}
+    assert _post(url, "/sugerir", peticion)["resumen"][0]["pci's"] == "3;4;5"
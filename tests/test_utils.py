@@ -20,6 +20,8 @@ from pci_rsi_sugeridor.core import (
         ([1, 2, 3, 4, 5, 6], 2, 3, [3, 4]),
         ([5, 6, 7, 8], 4, 0, [6, 7, 8, ""]),
         ([4, 5, 7, 8], 2, 0, [4, 5]),
+        # Se prefiere el tramo completo 6-8 a la base 0 con huecos
+        ([0, 2, 6, 7, 8], 3, 0, [6, 7, 8]),
         ([], 2, 0, ["", ""]),
     ],
 )
@@ -31,9 +33,9 @@ def test_sugerir_consecutivos_mod3(input_list, n, min_pci, expected):
     "libres, n, vendor, bc, expected",
     [
         ([0, 10, 20, 30], 3, "ERICSSON", "1800", [0, 10, 20]),
-        # ↓↓↓ ESTA ES LA LÍNEA CORREGIDA ↓↓↓
-        ([5, 15, 25], 2, "ERICSSON", "3500", [5, 13]),  # min_sep 8 for bc==3500
-        # ↑↑↑ El valor esperado ahora es [5, 13] en lugar de [5, 15] ↑↑↑
+        # sep 8 en 3500: 13 no está libre y no hay secuencia completa
+        ([5, 15, 25], 2, "ERICSSON", "3500", [5, ""]),
+        ([5, 15, 23, 25], 2, "ERICSSON", "3500", [15, 23]),
         ([1, 2, 3], 3, "HUAWEI", "1800", [1, 2, 3]),
         ([], 2, "ERICSSON", "2100", ["", ""]),
     ],
@@ -49,6 +51,13 @@ def test_serie_a_enteros_multi():
     assert out == {100, 110, 120, 130, 140, 150, 160}
 
 
+def test_serie_a_enteros_multi_formatos():
+    s = pd.Series(["5;3", "3, 600", "x1", None])
+    assert serie_a_enteros_multi(s, "array").tolist() == [3, 5, 600]
+    assert serie_a_enteros_multi(s, "bitmap", 504) == (1 << 3) | (1 << 5)
+    assert serie_a_enteros_multi(pd.Series([], dtype=object)) == set()
+
+
 def test_cluster_allocator_basic():
     alloc = ClusterAllocator()
     # initial unused has full range